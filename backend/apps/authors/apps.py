@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class AuthorsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.authors'
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+
+        from apps.poems.models import Poem
+        from .models import Author
+        from .stats import author_created, poem_written
+
+        post_save.connect(author_created, sender=Author, dispatch_uid='authors.stats_author_created')
+        post_save.connect(poem_written, sender=Poem, dispatch_uid='authors.stats_poem_saved')
+        post_delete.connect(poem_written, sender=Poem, dispatch_uid='authors.stats_poem_deleted')
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from apps.authors.models import Author
+from apps.authors.stats import refresh_author_stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute denormalized author stats in chunks to repair drift.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500, help='Authors recomputed per statement')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        last_id = 0
+        total = 0
+        while True:
+            ids = list(Author.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:chunk_size])
+            if not ids:
+                break
+            refresh_author_stats(ids)
+            total += len(ids)
+            last_id = ids[-1]
+        self.stdout.write(self.style.SUCCESS(f'Reconciled stats for {total} authors.'))
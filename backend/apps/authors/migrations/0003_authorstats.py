@@ -0,0 +1,43 @@
+# Generated by Django 5.0.8 on 2026-10-17 11:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authors', '0002_author_avatar_crop_author_deleted_at_and_more'),
+        ('poems', '0003_poem_is_public'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('author', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='authors.author')),
+                ('poems_count', models.PositiveIntegerField(default=0)),
+                ('popularity', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [
+                    models.Index(fields=['-popularity', 'author'], name='author_stats_popularity_idx'),
+                    models.Index(fields=['-poems_count', 'author'], name='author_stats_poems_idx'),
+                ],
+            },
+        ),
+        migrations.RunSQL(
+            sql="""
+                INSERT INTO authors_authorstats (author_id, poems_count, popularity, updated_at)
+                SELECT a.id,
+                       COUNT(p.id) FILTER (WHERE p.is_public),
+                       COALESCE(SUM(p.views) FILTER (WHERE p.is_public), 0),
+                       now()
+                FROM authors_author AS a
+                LEFT JOIN poems_poem AS p ON p.author_id = a.id
+                GROUP BY a.id
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
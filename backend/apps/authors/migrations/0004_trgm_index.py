@@ -0,0 +1,26 @@
+# Generated by Django 5.0.8 on 2026-10-17 13:10
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('authors', '0003_authorstats'),
+        ('search', '0001_enable_trgm'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='author',
+            index=django.contrib.postgres.indexes.GinIndex(
+                condition=models.Q(('deleted_at__isnull', True), ('is_published', True)),
+                fields=['full_name'],
+                name='authors_name_trgm',
+                opclasses=['gin_trgm_ops'],
+            ),
+        ),
+    ]
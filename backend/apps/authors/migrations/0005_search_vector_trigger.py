@@ -0,0 +1,37 @@
+# Generated by Django 5.0.8 on 2026-10-17 13:40
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authors', '0004_trgm_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='author',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunSQL(
+            sql="""
+            CREATE FUNCTION authors_author_search_vector() RETURNS trigger AS $$
+            BEGIN
+                NEW.search_vector := setweight(to_tsvector('simple'::regconfig, COALESCE(NEW.full_name, '')), 'A');
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql;
+
+            CREATE TRIGGER authors_author_search_vector
+            BEFORE INSERT OR UPDATE OF full_name ON authors_author
+            FOR EACH ROW EXECUTE FUNCTION authors_author_search_vector();
+            """,
+            reverse_sql="""
+            DROP TRIGGER IF EXISTS authors_author_search_vector ON authors_author;
+            DROP FUNCTION IF EXISTS authors_author_search_vector();
+            """,
+        ),
+    ]
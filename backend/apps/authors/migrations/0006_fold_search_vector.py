@@ -0,0 +1,38 @@
+# Generated by Django 5.0.8 on 2026-10-17 15:20
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authors', '0005_search_vector_trigger'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="""
+            CREATE OR REPLACE FUNCTION authors_author_search_vector() RETURNS trigger AS $$
+            BEGIN
+                NEW.search_vector := setweight(to_tsvector('simple'::regconfig, translate(
+                    COALESCE(NEW.full_name, ''), 'ӢӮҲҚҒҶЁӣӯҳқғҷё', 'ИУХКГЧЕиухкгче'
+                )), 'A');
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql;
+
+            -- Fires the trigger for every row.
+            UPDATE authors_author SET full_name = full_name;
+            """,
+            reverse_sql="""
+            CREATE OR REPLACE FUNCTION authors_author_search_vector() RETURNS trigger AS $$
+            BEGIN
+                NEW.search_vector := setweight(to_tsvector('simple'::regconfig, COALESCE(NEW.full_name, '')), 'A');
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql;
+
+            UPDATE authors_author SET full_name = full_name;
+            """,
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.0.8 on 2026-10-17 15:30
+
+import django.contrib.postgres.indexes
+import django.db.models.expressions
+from django.contrib.postgres.operations import AddIndexConcurrently, RemoveIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('authors', '0006_fold_search_vector'),
+    ]
+
+    operations = [
+        RemoveIndexConcurrently(
+            model_name='author',
+            name='authors_name_trgm',
+        ),
+        AddIndexConcurrently(
+            model_name='author',
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.expressions.Func(
+                        django.db.models.expressions.F('full_name'),
+                        django.db.models.expressions.Value('ӢӮҲҚҒҶЁӣӯҳқғҷё'),
+                        django.db.models.expressions.Value('ИУХКГЧЕиухкгче'),
+                        function='TRANSLATE',
+                    ),
+                    name='gin_trgm_ops',
+                ),
+                condition=models.Q(('deleted_at__isnull', True), ('is_published', True)),
+                name='authors_name_trgm',
+            ),
+        ),
+    ]
@@ -1,7 +1,29 @@
 from django.conf import settings
-from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
+from django.db.models import F, Q
+
+from apps.search.text import folded
+
+
+# Same expression as the ``authors_author_search_vector`` trigger (migration 0006).
+AUTHOR_SEARCH_VECTOR = SearchVector(folded('full_name'), weight='A', config='simple')
+
+
+class AuthorQuerySet(models.QuerySet):
+    def with_stats(self):
+        # Every author gets a stats row on creation (and from the 0003 backfill), so an inner join
+        # loses nothing and lets orderings use the ``author_stats_*_idx`` indexes.
+        return self.filter(stats__isnull=False).annotate(
+            poems_count=F('stats__poems_count'),
+            popularity=F('stats__popularity'),
+        )
+
+
+class PublicAuthorManager(models.Manager.from_queryset(AuthorQuerySet)):
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True, is_published=True)
 
 
 class Author(models.Model):
@@ -21,22 +43,39 @@ class Author(models.Model):
         blank=True,
         related_name='deleted_authors',
     )
-    search_vector = SearchVectorField(null=True)
+    search_vector = SearchVectorField(null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = AuthorQuerySet.as_manager()
+    public = PublicAuthorManager()
+
     class Meta:
         ordering = ['full_name']
-        indexes = [GinIndex(fields=['search_vector'], name='authors_search_gin')]
+        indexes = [
+            GinIndex(fields=['search_vector'], name='authors_search_gin'),
+            GinIndex(
+                OpClass(folded('full_name'), name='gin_trgm_ops'),
+                name='authors_name_trgm',
+                condition=Q(deleted_at__isnull=True, is_published=True),
+            ),
+        ]
 
     def __str__(self):
         return self.full_name
 
-    def update_search_vector(self):
-        self.__class__.objects.filter(pk=self.pk).update(
-            search_vector=SearchVector('full_name', config='simple')
-        )
 
-    def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        self.update_search_vector()
+class AuthorStats(models.Model):
+    author = models.OneToOneField(Author, related_name='stats', on_delete=models.CASCADE, primary_key=True)
+    poems_count = models.PositiveIntegerField(default=0)
+    popularity = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-popularity', 'author'], name='author_stats_popularity_idx'),
+            models.Index(fields=['-poems_count', 'author'], name='author_stats_poems_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.author_id}: {self.poems_count} poems, {self.popularity} views'
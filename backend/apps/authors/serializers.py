@@ -45,3 +45,60 @@ class AuthorSerializer(serializers.ModelSerializer):
 class AuthorDetailSerializer(AuthorSerializer):
     class Meta(AuthorSerializer.Meta):
         fields = AuthorSerializer.Meta.fields + ['biography_md']
+
+
+# Fast path: plain dicts built from ``.values()`` rows of ``Author.objects.with_stats()``,
+# byte-identical to the serializers above.
+
+AUTHOR_VALUES = ('id', 'full_name', 'birth_date', 'death_date', 'photo', 'photo_url', 'poems_count', 'popularity')
+AUTHOR_DETAIL_VALUES = AUTHOR_VALUES + ('biography_md',)
+
+_photo_storage = Author._meta.get_field('photo').storage
+
+
+def _photo_url(row, request):
+    if row['photo']:
+        url = _photo_storage.url(row['photo'])
+        if settings.PUBLIC_BASE_URL:
+            return f'{settings.PUBLIC_BASE_URL}{url}'
+        return request.build_absolute_uri(url) if request else url
+    return row['photo_url']
+
+
+def author_data(row, request=None):
+    slug = slugify_fallback(row['full_name'], 'author')
+    return {
+        'id': row['id'],
+        'full_name': row['full_name'],
+        'birth_date': row['birth_date'].isoformat() if row['birth_date'] else None,
+        'death_date': row['death_date'].isoformat() if row['death_date'] else None,
+        'photo_url': _photo_url(row, request),
+        'poems_count': row['poems_count'],
+        'popularity': row['popularity'],
+        'slug': slug,
+        'url_slug': f"{row['id']}-{slug}",
+    }
+
+
+def author_detail_data(row, request=None):
+    data = author_data(row, request)
+    data['biography_md'] = row['biography_md']
+    return data
+
+
+def serialize_authors(rows, request=None):
+    """Serialize ``.values(*AUTHOR_VALUES)`` rows."""
+    return [author_data(row, request) for row in rows]
+
+
+def absolute_photo_urls(authors, request):
+    """Resolve uploaded photos of authors serialized without a request against ``request``."""
+    if settings.PUBLIC_BASE_URL or request is None:
+        return authors
+    prefix = _photo_storage.base_url
+    return [
+        {**author, 'photo_url': request.build_absolute_uri(author['photo_url'])}
+        if author['photo_url'] and author['photo_url'].startswith(prefix)
+        else author
+        for author in authors
+    ]
@@ -0,0 +1,42 @@
+from django.db import connection
+
+from .models import Author
+
+
+REFRESH_SQL = """
+INSERT INTO authors_authorstats (author_id, poems_count, popularity, updated_at)
+SELECT a.id,
+       COUNT(p.id) FILTER (WHERE p.is_public),
+       COALESCE(SUM(p.views) FILTER (WHERE p.is_public), 0),
+       clock_timestamp()
+FROM authors_author AS a
+LEFT JOIN poems_poem AS p ON p.author_id = a.id
+WHERE a.id = ANY(%s)
+GROUP BY a.id
+ON CONFLICT (author_id) DO UPDATE
+SET poems_count = EXCLUDED.poems_count,
+    popularity = EXCLUDED.popularity,
+    updated_at = EXCLUDED.updated_at
+"""
+
+
+def refresh_author_stats(author_ids):
+    """Recompute the stats rows of the given authors from their public poems."""
+    author_ids = sorted({pk for pk in author_ids if pk is not None})
+    if not author_ids:
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(REFRESH_SQL, [author_ids])
+        return cursor.rowcount
+
+
+def poem_written(sender, instance, origin=None, **kwargs):
+    # Cascaded deletes from an author remove the stats row together with the author.
+    if isinstance(origin, Author):
+        return
+    refresh_author_stats([instance.author_id])
+
+
+def author_created(sender, instance, created, **kwargs):
+    if created:
+        refresh_author_stats([instance.pk])
@@ -0,0 +1,116 @@
+from datetime import date, timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db.models import F
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIClient
+
+from apps.authors.models import Author, AuthorStats
+from apps.poems.models import Poem
+from config.pagination import encode_cursor, keyset_paginate
+
+
+class AuthorStatsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.a1 = Author.objects.create(full_name='Автор 1')
+        self.a2 = Author.objects.create(full_name='Автор 2')
+        Poem.objects.create(author=self.a1, title='Поэма 1', text='Текст', views=10)
+        self.p2 = Poem.objects.create(author=self.a1, title='Поэма 2', text='Текст', views=5)
+        Poem.objects.create(author=self.a2, title='Поэма 3', text='Текст', views=20)
+        Poem.objects.create(author=self.a2, title='Черновик', text='Текст', views=99, is_published=False)
+
+    def test_stats_follow_poem_writes(self):
+        stats = AuthorStats.objects.get(author=self.a1)
+        self.assertEqual((stats.poems_count, stats.popularity), (2, 15))
+        stats = AuthorStats.objects.get(author=self.a2)
+        self.assertEqual((stats.poems_count, stats.popularity), (1, 20))
+
+        self.p2.is_published = False
+        self.p2.save()
+        stats = AuthorStats.objects.get(author=self.a1)
+        self.assertEqual((stats.poems_count, stats.popularity), (1, 10))
+
+    def test_counted_view_moves_the_stats_timestamp(self):
+        stale = timezone.now() - timedelta(days=1)
+        AuthorStats.objects.filter(author=self.a1).update(updated_at=stale)
+        self.client.post(f'/api/v1/poems/{self.p2.id}/view')
+        stats = AuthorStats.objects.get(author=self.a1)
+        self.assertEqual(stats.popularity, 16)
+        self.assertGreater(stats.updated_at, stale)
+
+    def test_author_list_orders_by_stats(self):
+        res = self.client.get('/api/v1/authors', {'ordering': '-popularity'})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual([row['id'] for row in res.data['results']], [self.a2.id, self.a1.id])
+        self.assertEqual(res.data['results'][0]['poems_count'], 1)
+
+    def test_stats_orderings_use_the_stats_columns(self):
+        a3 = Author.objects.create(full_name='Автор 3')
+        Poem.objects.create(author=a3, title='Поэма 4', text='Текст', views=15)
+        sql = str(Author.public.with_stats().order_by('-popularity').query)
+        self.assertIn('INNER JOIN "authors_authorstats"', sql)
+        self.assertNotIn('COALESCE', sql)
+
+        res = self.client.get('/api/v1/authors', {'ordering': '-popularity'})
+        self.assertEqual([row['id'] for row in res.data['results']], [self.a2.id, self.a1.id, a3.id])
+        res = self.client.get('/api/v1/authors', {'ordering': 'popularity'})
+        self.assertEqual([row['id'] for row in res.data['results']], [a3.id, self.a1.id, self.a2.id])
+        res = self.client.get('/api/v1/authors', {'ordering': '-poems_count'})
+        self.assertEqual([row['id'] for row in res.data['results']], [self.a1.id, self.a2.id, a3.id])
+
+    def test_author_list_applies_filter_backends(self):
+        res = self.client.get('/api/v1/authors', {'ordering': '-id'})
+        self.assertEqual([row['id'] for row in res.data['results']], [self.a2.id, self.a1.id])
+
+    def test_reconcile_repairs_drift(self):
+        AuthorStats.objects.update(poems_count=0, popularity=0)
+        call_command('reconcile_author_stats', chunk_size=1, stdout=StringIO())
+        stats = AuthorStats.objects.get(author=self.a1)
+        self.assertEqual((stats.poems_count, stats.popularity), (2, 15))
+
+
+class AuthorPoemsCursorTests(TestCase):
+    def test_cursor_pages_follow_id_order(self):
+        author = Author.objects.create(full_name='Автор')
+        ids = [Poem.objects.create(author=author, title=f'Шеър {idx}', text='Матн').id for idx in range(5)]
+        client = APIClient()
+
+        first = client.get(f'/api/v1/authors/{author.id}/poems', {'cursor': '', 'page_size': 3})
+        self.assertEqual([row['id'] for row in first.data['results']], ids[:3])
+        self.assertTrue(first.data['has_next'])
+
+        second = client.get(f'/api/v1/authors/{author.id}/poems', {'cursor': first.data['next_cursor'], 'page_size': 3})
+        self.assertEqual([row['id'] for row in second.data['results']], ids[3:])
+        self.assertFalse(second.data['has_next'])
+        self.assertIsNone(second.data['next_cursor'])
+
+    def test_malformed_cursor_values_are_rejected(self):
+        author = Author.objects.create(full_name='Автор')
+        client = APIClient()
+        for cursor in (encode_cursor(['abc']), encode_cursor([None]), encode_cursor([1, 2]), 'not-a-cursor'):
+            res = client.get(f'/api/v1/authors/{author.id}/poems', {'cursor': cursor})
+            self.assertEqual(res.status_code, 400)
+
+    def test_cursor_pages_include_null_sort_keys(self):
+        born = [date(1900, 1, 1), None, date(1850, 1, 1), None, date(1900, 1, 1)]
+        for idx, birth_date in enumerate(born):
+            Author.objects.create(full_name=f'Автор {idx}', birth_date=birth_date)
+        for ordering in ('birth_date', '-birth_date'):
+            qs = Author.objects.order_by(ordering)
+            seen, cursor = [], None
+            while True:
+                items, cursor = keyset_paginate(qs, cursor, 2)
+                seen.extend(author.id for author in items)
+                if cursor is None:
+                    break
+            self.assertEqual(seen, list(qs.order_by(ordering, '-id' if ordering[0] == '-' else 'id').values_list('id', flat=True)))
+
+    def test_expression_orderings_are_rejected(self):
+        with self.assertRaises(ValidationError):
+            keyset_paginate(Author.objects.order_by(F('birth_date').asc(nulls_first=True)), '', 2)
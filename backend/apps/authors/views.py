@@ -1,55 +1,93 @@
-from django.db.models import Count, Q, Sum
-from django.db.models.functions import Coalesce
+from django.http import Http404
 from rest_framework.generics import ListAPIView, RetrieveAPIView
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from config.conditional import latest, make_etag, not_modified, with_validators
+from config.pagination import cursor_payload, keyset_paginate
+from config.utils import get_user_hash
 from apps.poems.models import Poem
-from apps.poems.serializers import PoemListSerializer
+from apps.poems.response_cache import GLOBAL, author_dep, cached_data
+from apps.poems.sampling import pick_public_authors
+from apps.poems.serializers import POEM_LIST_VALUES, PoemListSerializer, serialize_poem_list
+from apps.poems.stats import site_stats
 from .models import Author
-from .serializers import AuthorDetailSerializer, AuthorSerializer
+from .serializers import (
+    AUTHOR_DETAIL_VALUES,
+    AUTHOR_VALUES,
+    AuthorDetailSerializer,
+    AuthorSerializer,
+    author_detail_data,
+    serialize_authors,
+)
+
+
+# Author pages change when the author is edited or any of their poems is written
+# (both touch the stats row) or viewed (popularity), so one primary-key lookup
+# validates them.
+AUTHOR_VALIDATOR_VALUES = ('updated_at', 'stats__updated_at', 'stats__poems_count', 'stats__popularity')
+AUTHOR_CACHE_CONTROL = {'public': True, 'max_age': 60}
+STATS_ORDERINGS = {'popularity', '-popularity', 'poems_count', '-poems_count'}
+
+
+def author_validators(request, author_id):
+    """Return ``(etag, last_modified)`` for a public author's pages, or None when not public."""
+    meta = Author.public.filter(pk=author_id).values(*AUTHOR_VALIDATOR_VALUES).first()
+    if meta is None:
+        return None
+    etag = make_etag(request.get_full_path(), *(meta[key] for key in AUTHOR_VALIDATOR_VALUES))
+    return etag, latest(meta['updated_at'], meta['stats__updated_at'])
 
 
 class AuthorListView(ListAPIView):
     serializer_class = AuthorSerializer
+    # Stats orderings are applied in ``get_queryset`` with their index tie-break.
+    ordering_fields = ('id', 'full_name', 'birth_date', 'death_date')
 
     def get_queryset(self):
-        qs = Author.objects.filter(deleted_at__isnull=True, is_published=True).annotate(
-            poems_count=Count(
-                'poems',
-                filter=Q(poems__deleted_at__isnull=True, poems__is_published=True),
-                distinct=True,
-            ),
-            popularity=Coalesce(
-                Sum('poems__views', filter=Q(poems__deleted_at__isnull=True, poems__is_published=True)),
-                0,
-            ),
-        )
+        qs = Author.public.with_stats()
         q = self.request.query_params.get('q')
         if q:
             qs = qs.filter(full_name__icontains=q)
         ordering = self.request.query_params.get('ordering')
-        allowed = {'full_name', '-full_name', 'popularity', '-popularity', 'poems_count', '-poems_count'}
-        if ordering in allowed:
+        if ordering in STATS_ORDERINGS:
+            # Ties break on the author id in the direction the ``author_stats_*_idx`` indexes store it.
+            qs = qs.order_by(ordering, 'id' if ordering.startswith('-') else '-id')
+        elif ordering in {'full_name', '-full_name'}:
             qs = qs.order_by(ordering)
         else:
             qs = qs.order_by('full_name')
         return qs
 
+    def list(self, request, *args, **kwargs):
+        def build():
+            page = self.paginate_queryset(self.filter_queryset(self.get_queryset()).values(*AUTHOR_VALUES))
+            return self.get_paginated_response(serialize_authors(page, request)).data, []
+
+        return Response(cached_data(request, build, deps=[GLOBAL]))
+
 
 class AuthorDetailView(RetrieveAPIView):
     serializer_class = AuthorDetailSerializer
-    queryset = Author.objects.filter(deleted_at__isnull=True, is_published=True).annotate(
-        poems_count=Count(
-            'poems',
-            filter=Q(poems__deleted_at__isnull=True, poems__is_published=True),
-            distinct=True,
-        ),
-        popularity=Coalesce(
-            Sum('poems__views', filter=Q(poems__deleted_at__isnull=True, poems__is_published=True)),
-            0,
-        ),
-    )
+    queryset = Author.public.with_stats()
+
+    def retrieve(self, request, *args, **kwargs):
+        validators = author_validators(request, kwargs['pk'])
+        if validators is None:
+            raise Http404
+        etag, last_modified = validators
+        response = not_modified(request, etag, last_modified)
+        if response is None:
+            data = cached_data(request, lambda: build_author_detail(request, kwargs['pk']), deps=[author_dep(kwargs['pk'])])
+            response = Response(data)
+        return with_validators(response, etag, last_modified, **AUTHOR_CACHE_CONTROL)
+
+
+def build_author_detail(request, pk):
+    row = Author.public.with_stats().filter(pk=pk).values(*AUTHOR_DETAIL_VALUES).first()
+    if row is None:
+        raise Http404
+    return author_detail_data(row, request), []
 
 
 class AuthorPoemsListView(ListAPIView):
@@ -58,48 +96,70 @@ class AuthorPoemsListView(ListAPIView):
 
     def get(self, request, *args, **kwargs):
         author_id = kwargs['pk']
-        page = int(request.query_params.get('page', 1))
-        page_size = int(request.query_params.get('page_size', 25))
-        qs = (
-            Poem.objects.filter(
-                author_id=author_id,
-                deleted_at__isnull=True,
-                is_published=True,
-                author__deleted_at__isnull=True,
-                author__is_published=True,
-            )
-            .select_related('author')
-            .order_by('id')
-        )
-        total = qs.count()
-        offset = (page - 1) * page_size
-        items = qs[offset: offset + page_size]
-        serializer = self.serializer_class(items, many=True, context={'request': request})
-        return Response({
-            'count': total,
-            'page': page,
-            'page_size': page_size,
-            'results': serializer.data,
-        })
+        validators = author_validators(request, author_id)
+        if validators is None:
+            return Response(author_poems_payload(request, author_id))
+        etag, last_modified = validators
+        response = not_modified(request, etag, last_modified)
+        if response is None:
+            data = cached_data(request, lambda: (author_poems_payload(request, author_id), []), deps=[author_dep(author_id)])
+            response = Response(data)
+        return with_validators(response, etag, last_modified, **AUTHOR_CACHE_CONTROL)
+
+
+def author_poems_payload(request, author_id, first_page=False):
+    page = 1 if first_page else int(request.query_params.get('page', 1))
+    page_size = int(request.query_params.get('page_size', 25))
+    qs = (
+        Poem.public.filter(author_id=author_id)
+        .order_by('id')
+        .values(*POEM_LIST_VALUES)
+    )
+    if 'cursor' in request.query_params and not first_page:
+        items, next_cursor = keyset_paginate(qs, request.query_params['cursor'], page_size)
+        return cursor_payload(serialize_poem_list(items), page_size, next_cursor)
+    total = qs.count()
+    offset = (page - 1) * page_size
+    items = qs[offset: offset + page_size]
+    return {
+        'count': total,
+        'page': page,
+        'page_size': page_size,
+        'results': serialize_poem_list(items),
+    }
 
 
 class AuthorRandomView(APIView):
     def get(self, request):
         limit = int(request.query_params.get('limit', 5))
         exclude = request.query_params.get('exclude')
-        qs = Author.objects.filter(deleted_at__isnull=True, is_published=True).annotate(
-            poems_count=Count(
-                'poems',
-                filter=Q(poems__deleted_at__isnull=True, poems__is_published=True),
-                distinct=True,
-            ),
-            popularity=Coalesce(
-                Sum('poems__views', filter=Q(poems__deleted_at__isnull=True, poems__is_published=True)),
-                0,
-            ),
+        qs = Author.public.with_stats()
+        authors = pick_public_authors(
+            qs,
+            limit,
+            exclude=[exclude] if exclude and exclude.isdigit() else [],
+            user_hash=get_user_hash(request),
         )
-        if exclude:
-            qs = qs.exclude(id=exclude)
-        authors = qs.order_by('?')[:limit]
         data = AuthorSerializer(authors, many=True, context={'request': request}).data
         return Response(data)
+
+
+class AuthorPageView(APIView):
+    """Author detail, first page of poems, site stats and other authors in one response."""
+
+    def get(self, request, pk):
+        def build():
+            author, _ = build_author_detail(request, pk)
+            return {'author': author, 'poems': author_poems_payload(request, pk, first_page=True)}, []
+
+        page_size = int(request.query_params.get('page_size', 25))
+        data = dict(cached_data(request, build, deps=[author_dep(pk)], name=f'author-page:{pk}:{page_size}'))
+        data['stats'] = site_stats(request)
+        others = pick_public_authors(
+            Author.public.with_stats(),
+            int(request.query_params.get('others', 5)),
+            exclude=[pk],
+            user_hash=get_user_hash(request),
+        )
+        data['other_authors'] = AuthorSerializer(others, many=True, context={'request': request}).data
+        return Response(data)
@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class DashboardConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.dashboard'
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+
+        from .models import Role, RolePermission
+        from .rbac import role_permission_written, role_written
+
+        post_save.connect(role_written, sender=Role, dispatch_uid='dashboard.role_saved')
+        post_delete.connect(role_written, sender=Role, dispatch_uid='dashboard.role_deleted')
+        post_save.connect(role_permission_written, sender=RolePermission, dispatch_uid='dashboard.permission_saved')
+        post_delete.connect(role_permission_written, sender=RolePermission, dispatch_uid='dashboard.permission_deleted')
@@ -1,7 +1,7 @@
 from rest_framework.authentication import SessionAuthentication
 from rest_framework.permissions import BasePermission
 
-from .rbac import get_dashboard_access, user_has_any_read_permission, user_has_permission
+from .rbac import access_has_any_read_permission, access_has_permission, get_request_access
 
 
 class DashboardSessionAuthentication(SessionAuthentication):
@@ -12,7 +12,7 @@ class DashboardAccessPermission(BasePermission):
     message = 'Access denied.'
 
     def has_permission(self, request, view):
-        access = get_dashboard_access(request.user)
+        access = get_request_access(request)
         if not access.is_allowed:
             self.message = 'Authentication required.'
             return False
@@ -26,10 +26,10 @@ class DashboardAccessPermission(BasePermission):
         required_action = getattr(view, 'required_action', None)
 
         if getattr(view, 'requires_any_read', False):
-            return user_has_any_read_permission(request.user)
+            return access_has_any_read_permission(access)
 
         if required_module and required_action:
-            allowed = user_has_permission(request.user, required_module, required_action)
+            allowed = access_has_permission(access, required_module, required_action)
             if not allowed:
                 self.message = 'Insufficient permissions.'
             return allowed
@@ -4,7 +4,10 @@ from dataclasses import dataclass
 from typing import Dict
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
 
+from config.versions import bump_version, get_versions
 from .models import DashboardUser, Role, RolePermission
 
 
@@ -22,12 +25,69 @@ ACTION_FIELD = {
     'delete': 'can_delete',
 }
 
+REQUEST_ACCESS_ATTR = '_dashboard_access'
+
 
 @dataclass
 class DashboardAccess:
     profile: DashboardUser | None
     is_allowed: bool
     reason: str | None = None
+    is_superuser: bool = False
+
+
+def permission_bit(module: str, action: str) -> int:
+    return 1 << (MODULES.index(module) * len(ACTION_FIELD) + list(ACTION_FIELD).index(action))
+
+
+def compile_permission_mask(permissions) -> int:
+    """Fold ``RolePermission`` rows into one integer with a bit per module and action."""
+    mask = 0
+    for item in permissions:
+        if item.module not in MODULES:
+            continue
+        for action, field in ACTION_FIELD.items():
+            if getattr(item, field):
+                mask |= permission_bit(item.module, action)
+    return mask
+
+
+def role_version_key(role_id: int) -> str:
+    """Version counter bumped whenever the role or one of its permission rows is written."""
+    return f'rbac:role:{role_id}:version'
+
+
+def _role_mask_key(role_id: int) -> str:
+    return f'rbac:role:{role_id}:mask'
+
+
+def bump_role_version(role_id: int | None):
+    if role_id is None:
+        return
+
+    key = role_version_key(role_id)
+    # Bump now so this transaction sees the change, and again after commit so a mask another
+    # process rebuilt from the not yet committed rows is retired as well.
+    bump_version(key)
+    transaction.on_commit(lambda: bump_version(key))
+
+
+def get_role_permission_mask(role: Role) -> int:
+    """The role's compiled permissions; a warm entry costs one cache round trip and no queries."""
+    version_key = role_version_key(role.pk)
+    mask_key = _role_mask_key(role.pk)
+    found = cache.get_many([mask_key, version_key])
+    entry = found.get(mask_key)
+    if entry is not None and version_key in found and entry['version'] == found[version_key]:
+        return entry['mask']
+
+    # Read the version before the rows so a concurrent write can only make the entry older.
+    version = found.get(version_key)
+    if version is None:
+        version = get_versions([version_key])[version_key]
+    mask = compile_permission_mask(RolePermission.objects.filter(role_id=role.pk))
+    cache.set(mask_key, {'version': version, 'mask': mask}, None)
+    return mask
 
 
 def empty_permission_matrix() -> Dict[str, Dict[str, bool]]:
@@ -39,24 +99,16 @@ def role_permission_matrix(role: Role | None) -> Dict[str, Dict[str, bool]]:
     if not role:
         return matrix
 
-    for item in role.permissions.all():
-        matrix[item.module] = {
-            'create': item.can_create,
-            'read': item.can_read,
-            'update': item.can_update,
-            'delete': item.can_delete,
-        }
+    mask = get_role_permission_mask(role)
+    for module in MODULES:
+        matrix[module] = {action: bool(mask & permission_bit(module, action)) for action in ACTION_FIELD}
     return matrix
 
 
 def role_has_permission(role: Role | None, module: str, action: str) -> bool:
-    if not role or module not in MODULES:
+    if not role or module not in MODULES or action not in ACTION_FIELD:
         return False
-    field = ACTION_FIELD.get(action)
-    if not field:
-        return False
-    perm = role.permissions.filter(module=module).first()
-    return bool(getattr(perm, field, False))
+    return bool(get_role_permission_mask(role) & permission_bit(module, action))
 
 
 def get_dashboard_access(user) -> DashboardAccess:
@@ -65,15 +117,13 @@ def get_dashboard_access(user) -> DashboardAccess:
 
     if user.is_superuser:
         try:
-            profile = DashboardUser.objects.select_related('role', 'user').prefetch_related('role__permissions').get(
-                user=user
-            )
+            profile = DashboardUser.objects.select_related('role', 'user').get(user=user)
         except DashboardUser.DoesNotExist:
             profile = None
-        return DashboardAccess(profile=profile, is_allowed=True, reason=None)
+        return DashboardAccess(profile=profile, is_allowed=True, reason=None, is_superuser=True)
 
     try:
-        profile = DashboardUser.objects.select_related('role', 'user').prefetch_related('role__permissions').get(user=user)
+        profile = DashboardUser.objects.select_related('role', 'user').get(user=user)
     except DashboardUser.DoesNotExist:
         return DashboardAccess(profile=None, is_allowed=False, reason='dashboard_user_missing')
 
@@ -89,32 +139,52 @@ def get_dashboard_access(user) -> DashboardAccess:
     return DashboardAccess(profile=profile, is_allowed=True, reason=None)
 
 
-def user_has_permission(user, module: str, action: str) -> bool:
+def get_request_access(request) -> DashboardAccess:
+    """``get_dashboard_access`` for ``request.user``, resolved once per request.
+
+    The result is kept on the underlying ``HttpRequest`` so the permission class, the
+    view and payload helpers share it; it is recomputed if the user changes (login).
+    """
+    http_request = getattr(request, '_request', request)
+    user = request.user
+    memo = getattr(http_request, REQUEST_ACCESS_ATTR, None)
+    if memo is not None and memo[0] == user.pk:
+        return memo[1]
     access = get_dashboard_access(user)
+    setattr(http_request, REQUEST_ACCESS_ATTR, (user.pk, access))
+    return access
+
+
+def access_has_permission(access: DashboardAccess, module: str, action: str) -> bool:
     if not access.is_allowed:
         return False
-    if user.is_superuser:
+    if access.is_superuser:
         return True
     return role_has_permission(access.profile.role, module, action)
 
 
-def user_has_any_read_permission(user) -> bool:
-    access = get_dashboard_access(user)
+def access_has_any_read_permission(access: DashboardAccess) -> bool:
     if not access.is_allowed:
         return False
-    if user.is_superuser:
+    if access.is_superuser:
         return True
-    return any(role_has_permission(access.profile.role, module, 'read') for module in MODULES)
+    mask = get_role_permission_mask(access.profile.role)
+    return any(mask & permission_bit(module, 'read') for module in MODULES)
+
+
+def user_has_permission(user, module: str, action: str) -> bool:
+    return access_has_permission(get_dashboard_access(user), module, action)
+
+
+def user_has_any_read_permission(user) -> bool:
+    return access_has_any_read_permission(get_dashboard_access(user))
 
 
 def is_admin_capable_role(role: Role | None) -> bool:
     if not role or role.deleted_at or not role.is_active:
         return False
-    for module in MODULES:
-        for action in ACTION_FIELD:
-            if not role_has_permission(role, module, action):
-                return False
-    return True
+    full_mask = (1 << len(MODULES) * len(ACTION_FIELD)) - 1
+    return get_role_permission_mask(role) == full_mask
 
 
 def count_active_admin_capable_users(exclude_profile_id: int | None = None) -> int:
@@ -138,3 +208,11 @@ def count_active_admin_capable_users(exclude_profile_id: int | None = None) -> i
 def ensure_role_permission_rows(role: Role):
     for module in MODULES:
         RolePermission.objects.get_or_create(role=role, module=module)
+
+
+def role_written(sender, instance, **kwargs):
+    bump_role_version(instance.pk)
+
+
+def role_permission_written(sender, instance, **kwargs):
+    bump_role_version(instance.role_id)
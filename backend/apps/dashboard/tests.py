@@ -1,9 +1,15 @@
+from unittest import mock
+
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APIClient
 
 from apps.authors.models import Author
 from apps.dashboard.models import DashboardUser, Role
+from apps.dashboard import rbac
 from apps.dashboard.rbac import MODULES, ensure_role_permission_rows
 from apps.poems.models import Poem
 
@@ -211,6 +217,7 @@ class DashboardSoftDeleteTests(DashboardBaseTestCase):
         self.poem.refresh_from_db()
         self.assertIsNotNone(self.author.deleted_at)
         self.assertIsNotNone(self.poem.deleted_at)
+        self.assertFalse(self.poem.is_public)
 
         trash_list = self.client.get('/api/v1/dashboard/authors?trash=trash')
         self.assertEqual(trash_list.status_code, 200)
@@ -222,11 +229,30 @@ class DashboardSoftDeleteTests(DashboardBaseTestCase):
         self.poem.refresh_from_db()
         self.assertIsNone(self.author.deleted_at)
         self.assertIsNone(self.poem.deleted_at)
+        self.assertTrue(self.poem.is_public)
 
         hard_delete_res = self.client.delete(f'/api/v1/dashboard/authors/{self.author.id}/hard-delete')
         self.assertEqual(hard_delete_res.status_code, 200)
         self.assertFalse(Author.objects.filter(id=self.author.id).exists())
 
+    def test_author_unpublish_hides_poems_from_public_api(self):
+        self.client.force_login(self.admin_user)
+        self.assertEqual(self.client.get(f'/api/v1/poems/{self.poem.id}').status_code, 200)
+
+        patch_res = self.client.patch(
+            f'/api/v1/dashboard/authors/{self.author.id}',
+            {'full_name': self.author.full_name, 'is_published': False},
+            format='json',
+        )
+        self.assertEqual(patch_res.status_code, 200)
+        self.poem.refresh_from_db()
+        self.assertFalse(self.poem.is_public)
+        self.assertEqual(self.client.get(f'/api/v1/poems/{self.poem.id}').status_code, 404)
+
+        self.client.patch(f'/api/v1/dashboard/authors/{self.author.id}', {'is_published': True}, format='json')
+        self.poem.refresh_from_db()
+        self.assertTrue(self.poem.is_public)
+
     def test_employee_and_role_trash_restore_and_hard_delete(self):
         self.client.force_login(self.admin_user)
         role = self.client.post(
@@ -282,6 +308,33 @@ class DashboardSoftDeleteTests(DashboardBaseTestCase):
         self.assertEqual(hard_res.status_code, 200)
         self.assertFalse(Poem.objects.filter(id=self.poem.id).exists())
 
+    def test_moving_a_poem_retires_the_previous_authors_cached_pages(self):
+        cache.clear()
+        other = Author.objects.create(full_name='Другой Автор', is_published=True)
+        public = APIClient()
+        poems_url = f'/api/v1/authors/{self.author.id}/poems'
+        self.assertEqual(public.get(poems_url).data['count'], 1)
+
+        self.client.force_login(self.admin_user)
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.patch(f'/api/v1/dashboard/poems/{self.poem.id}', {'author_id': other.id}, format='json')
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(public.get(poems_url).data['count'], 0)
+        self.assertEqual(public.get(f'/api/v1/authors/{other.id}/poems').data['count'], 1)
+
+    def test_moving_a_poem_drops_it_from_the_previous_authors_neighbors(self):
+        cache.clear()
+        other = Author.objects.create(full_name='Другой Автор', is_published=True)
+        last = Poem.objects.create(author=self.author, title='Последний стих', text='Текст', is_published=True)
+        public = APIClient()
+        url = f'/api/v1/poems/{last.id}/neighbors'
+        self.assertEqual(public.get(url, {'author_id': self.author.id}).data['prev']['id'], self.poem.id)
+
+        self.client.force_login(self.admin_user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f'/api/v1/dashboard/poems/{self.poem.id}', {'author_id': other.id}, format='json')
+        self.assertIsNone(public.get(url, {'author_id': self.author.id}).data['prev'])
+
 
 class DashboardListFiltersTests(DashboardBaseTestCase):
     def test_authors_filters_sort_and_pagination(self):
@@ -310,3 +363,59 @@ class DashboardListFiltersTests(DashboardBaseTestCase):
         self.assertGreaterEqual(res.data['count'], 1)
         for item in res.data['results']:
             self.assertTrue(item['is_published'])
+
+    def test_poems_cursor_pagination_walks_all_rows_without_count(self):
+        self.client.force_login(self.admin_user)
+        for idx in range(4):
+            Poem.objects.create(author=self.author, title=f'Стих {idx}', text='Текст', is_published=True)
+
+        seen = []
+        cursor = ''
+        while True:
+            res = self.client.get('/api/v1/dashboard/poems', {'sort': 'newest', 'page_size': 2, 'cursor': cursor})
+            self.assertEqual(res.status_code, 200)
+            self.assertNotIn('count', res.data)
+            seen.extend(item['id'] for item in res.data['results'])
+            if not res.data['has_next']:
+                break
+            cursor = res.data['next_cursor']
+
+        expected = list(Poem.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+        bad = self.client.get('/api/v1/dashboard/poems', {'cursor': 'not-a-cursor'})
+        self.assertEqual(bad.status_code, 400)
+
+
+class DashboardRBACCacheTests(DashboardBaseTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.limited_role = make_role(
+            'Reader',
+            [{'module': 'authors', 'can_create': False, 'can_read': True, 'can_update': False, 'can_delete': False}],
+        )
+        self.limited_user = User.objects.create_user(username='reader@example.com', email='reader@example.com', password='Reader12345!')
+        DashboardUser.objects.create(user=self.limited_user, full_name='Reader', role=self.limited_role, is_active=True)
+
+    def test_access_is_resolved_once_and_permissions_come_from_cache(self):
+        self.client.force_login(self.limited_user)
+        self.assertEqual(self.client.get('/api/v1/dashboard/authors').status_code, 200)
+
+        with mock.patch.object(rbac, 'get_dashboard_access', wraps=rbac.get_dashboard_access) as resolve:
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.client.get('/api/v1/dashboard/home').status_code, 200)
+        self.assertEqual(resolve.call_count, 1)
+        self.assertFalse([query for query in queries if 'dashboard_rolepermission' in query['sql']])
+
+    def test_permission_changes_apply_to_the_next_request(self):
+        self.client.force_login(self.limited_user)
+        self.assertEqual(self.client.get('/api/v1/dashboard/poems').status_code, 403)
+
+        permission = self.limited_role.permissions.get(module='poems')
+        permission.can_read = True
+        permission.save()
+        self.assertEqual(self.client.get('/api/v1/dashboard/poems').status_code, 200)
+
+        self.limited_role.permissions.filter(module='poems').delete()
+        self.assertEqual(self.client.get('/api/v1/dashboard/poems').status_code, 403)
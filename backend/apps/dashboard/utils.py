@@ -7,6 +7,8 @@ from datetime import date
 from django.core.mail import send_mail
 from django.utils import timezone
 
+from config.pagination import cursor_payload, keyset_paginate
+
 
 def parse_int(value, default, min_value=None, max_value=None):
     try:
@@ -32,6 +34,19 @@ def paginate_queryset(qs, page: int, page_size: int):
     return qs[offset : offset + page_size], total
 
 
+def paginate_request(request, qs, default_size=25):
+    """Paginate by ``?cursor=`` (keyset, no COUNT) when given, otherwise by ``?page=``.
+
+    Returns the page items and a ``build(results)`` callable producing the response payload.
+    """
+    page, page_size = parse_page(request, default_size)
+    if 'cursor' in request.query_params:
+        items, next_cursor = keyset_paginate(qs, request.query_params['cursor'], page_size)
+        return items, lambda results: cursor_payload(results, page_size, next_cursor)
+    items, total = paginate_queryset(qs, page, page_size)
+    return items, lambda results: paginated_payload(results, total, page, page_size)
+
+
 def paginated_payload(items, total: int, page: int, page_size: int):
     return {
         'count': total,
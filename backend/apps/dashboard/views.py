@@ -17,17 +17,19 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from apps.authors.models import Author
+from apps.authors.stats import refresh_author_stats
 from apps.poems.models import Poem, PoemMonthlyVisit
+from apps.poems.signals import notify_content_changed
 from .models import DashboardUser, Role, RolePermission, SiteSettings
 from .permissions import DashboardAccessPermission, DashboardSessionAuthentication
 from .rbac import (
     MODULES,
+    access_has_permission,
     count_active_admin_capable_users,
     ensure_role_permission_rows,
-    get_dashboard_access,
+    get_request_access,
     is_admin_capable_role,
     role_permission_matrix,
-    user_has_permission,
 )
 from .serializers import (
     AuthorAdminSerializer,
@@ -48,9 +50,7 @@ from .utils import (
     current_month_label,
     current_month_start,
     generate_temp_password,
-    paginated_payload,
-    paginate_queryset,
-    parse_page,
+    paginate_request,
     send_temp_password_email,
 )
 
@@ -65,7 +65,7 @@ def _deny_insufficient_permissions():
 def _check_permission(request, module: str, action: str):
     if request.user.is_superuser:
         return None
-    if user_has_permission(request.user, module, action):
+    if access_has_permission(get_request_access(request), module, action):
         return None
     return _deny_insufficient_permissions()
 
@@ -107,7 +107,7 @@ def _all_true_permissions():
 
 
 def _profile_payload(request):
-    access = get_dashboard_access(request.user)
+    access = get_request_access(request)
     profile = access.profile
 
     if request.user.is_superuser and not profile:
@@ -183,7 +183,6 @@ class DashboardAuthLoginView(APIView):
 
         profile = (
             DashboardUser.objects.select_related('user', 'role')
-            .prefetch_related('role__permissions')
             .filter(user__email__iexact=email, deleted_at__isnull=True)
             .first()
         )
@@ -266,7 +265,7 @@ class DashboardAuthChangePasswordView(DashboardBaseView):
     def post(self, request):
         serializer = ChangePasswordSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        access = get_dashboard_access(request.user)
+        access = get_request_access(request)
         profile = access.profile
 
         request.user.set_password(serializer.validated_data['new_password'])
@@ -357,10 +356,9 @@ class DashboardAuthorListCreateView(DashboardBaseView):
             'full_name',
         )
         qs = qs.order_by(ordering)
-        page, page_size = parse_page(request)
-        items, total = paginate_queryset(qs, page, page_size)
+        items, build_payload = paginate_request(request, qs)
         payload = AuthorAdminSerializer(items, many=True, context={'request': request}).data
-        return Response(paginated_payload(payload, total, page, page_size))
+        return Response(build_payload(payload))
 
     def post(self, request):
         denied = _check_permission(request, RolePermission.MODULE_AUTHORS, 'create')
@@ -410,11 +408,19 @@ class DashboardAuthorDetailView(DashboardBaseView):
         if 'avatar_crop' in request.data or 'avatar_crop' in data:
             data['avatar_crop'] = _json_or_raw(request.data.get('avatar_crop') or data.get('avatar_crop'))
 
-        for key, value in data.items():
-            setattr(author, key, value)
+        changed = [key for key, value in data.items() if getattr(author, key) != value]
+        for key in changed:
+            setattr(author, key, data[key])
         if 'photo' in request.FILES:
             author.photo = request.FILES['photo']
-        author.save()
+            changed.append('photo')
+        if not changed:
+            return Response(AuthorAdminSerializer(author, context={'request': request}).data)
+        with transaction.atomic():
+            author.save(update_fields=[*changed, 'updated_at'])
+            if 'is_published' in changed:
+                Poem.objects.filter(author_id=author.id).sync_is_public()
+                refresh_author_stats([author.id])
 
         payload = AuthorAdminSerializer(author, context={'request': request}).data
         return Response(payload)
@@ -435,6 +441,8 @@ class DashboardAuthorDetailView(DashboardBaseView):
                 deleted_by=request.user,
                 updated_at=deleted_at,
             )
+            Poem.objects.filter(author=author).sync_is_public()
+            refresh_author_stats([author.id])
         return Response({'message': 'Автор отправлен в корзину.'})
 
 
@@ -456,10 +464,9 @@ class DashboardAuthorPoemsView(DashboardBaseView):
             '-created_at',
         )
         qs = qs.order_by(ordering)
-        page, page_size = parse_page(request)
-        items, total = paginate_queryset(qs, page, page_size)
+        items, build_payload = paginate_request(request, qs)
         payload = PoemAdminSerializer(items, many=True).data
-        return Response(paginated_payload(payload, total, page, page_size))
+        return Response(build_payload(payload))
 
     def post(self, request, pk):
         denied = _check_permission(request, RolePermission.MODULE_POEMS, 'create')
@@ -490,6 +497,8 @@ class DashboardAuthorRestoreView(DashboardBaseView):
                 deleted_by=None,
                 updated_at=timezone.now(),
             )
+            Poem.objects.filter(author=author).sync_is_public()
+            refresh_author_stats([author.id])
         return Response({'message': 'Автор восстановлен из корзины.'})
 
 
@@ -527,10 +536,9 @@ class DashboardPoemListCreateView(DashboardBaseView):
             '-created_at',
         )
         qs = qs.order_by(ordering)
-        page, page_size = parse_page(request)
-        items, total = paginate_queryset(qs, page, page_size)
+        items, build_payload = paginate_request(request, qs)
         payload = PoemAdminSerializer(items, many=True).data
-        return Response(paginated_payload(payload, total, page, page_size))
+        return Response(build_payload(payload))
 
     def post(self, request):
         denied = _check_permission(request, RolePermission.MODULE_POEMS, 'create')
@@ -565,16 +573,26 @@ class DashboardPoemDetailView(DashboardBaseView):
         serializer = PoemWriteSerializer(data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
         data = serializer.validated_data
+        previous_author_id = poem.author_id
 
+        changed = []
         if 'author_id' in data:
-            poem.author = get_object_or_404(Author, pk=data['author_id'], deleted_at__isnull=True)
-        if 'title' in data:
-            poem.title = data['title']
-        if 'text' in data:
-            poem.text = data['text']
-        if 'is_published' in data:
-            poem.is_published = data['is_published']
-        poem.save()
+            author = get_object_or_404(Author, pk=data['author_id'], deleted_at__isnull=True)
+            if author.id != poem.author_id:
+                poem.author = author
+                changed.append('author')
+        for key in ('title', 'text', 'is_published'):
+            if key in data and getattr(poem, key) != data[key]:
+                setattr(poem, key, data[key])
+                changed.append(key)
+        if not changed:
+            return Response(PoemAdminSerializer(poem).data)
+        with transaction.atomic():
+            poem.save(update_fields=[*changed, 'updated_at'])
+            if poem.author_id != previous_author_id:
+                refresh_author_stats([previous_author_id])
+                # The save signal only names the new author; retire the old author's pages too.
+                notify_content_changed(author_ids=[previous_author_id])
         return Response(PoemAdminSerializer(poem).data)
 
     def delete(self, request, pk):
@@ -629,10 +647,9 @@ class DashboardEmployeeListCreateView(DashboardBaseView):
             'full_name',
         )
         qs = qs.order_by(ordering)
-        page, page_size = parse_page(request)
-        items, total = paginate_queryset(qs, page, page_size)
+        items, build_payload = paginate_request(request, qs)
         payload = DashboardUserSerializer(items, many=True).data
-        return Response(paginated_payload(payload, total, page, page_size))
+        return Response(build_payload(payload))
 
     def post(self, request):
         denied = _check_permission(request, RolePermission.MODULE_EMPLOYEES, 'create')
@@ -852,10 +869,9 @@ class DashboardRoleListCreateView(DashboardBaseView):
             'name',
         )
         qs = qs.order_by(ordering)
-        page, page_size = parse_page(request)
-        items, total = paginate_queryset(qs, page, page_size)
+        items, build_payload = paginate_request(request, qs)
         payload = RoleSerializer(items, many=True).data
-        return Response(paginated_payload(payload, total, page, page_size))
+        return Response(build_payload(payload))
 
     def post(self, request):
         denied = _check_permission(request, RolePermission.MODULE_ROLES, 'create')
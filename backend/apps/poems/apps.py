@@ -4,3 +4,18 @@ from django.apps import AppConfig
 class PoemsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.poems'
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+
+        from apps.authors.models import Author
+        from . import home, sampling
+        from .models import Poem
+        from .signals import author_written, content_changed, poem_written
+
+        post_save.connect(poem_written, sender=Poem, dispatch_uid='poems.poem_saved')
+        post_delete.connect(poem_written, sender=Poem, dispatch_uid='poems.poem_deleted')
+        post_save.connect(author_written, sender=Author, dispatch_uid='poems.author_saved')
+        post_delete.connect(author_written, sender=Author, dispatch_uid='poems.author_deleted')
+        content_changed.connect(sampling.on_content_changed, dispatch_uid='poems.sampling')
+        content_changed.connect(home.on_content_changed, dispatch_uid='poems.home')
@@ -0,0 +1,104 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+
+from apps.authors.models import Author
+from apps.authors.serializers import AUTHOR_VALUES, absolute_photo_urls, serialize_authors
+from .models import Poem
+from .serializers import POEM_LIST_VALUES, serialize_poem_list
+from .signals import get_content_version
+
+
+logger = logging.getLogger(__name__)
+
+HERO_TEXT = 'Портали асарҳои шоирони классикӣ ва муосири форсу-тоҷик.'
+
+HOME_CACHE_KEY = 'home_payload'
+HOME_LOCK_KEY = 'home_payload:lock'
+
+
+def build_home_payload():
+    """Build the payload shared by every host; uploaded photo URLs stay relative until served."""
+    top_poems = Poem.public.order_by('-views').values(*POEM_LIST_VALUES)[:5]
+    top_authors = Author.public.with_stats().order_by('-popularity').values(*AUTHOR_VALUES)[:5]
+
+    return {
+        'hero_text': HERO_TEXT,
+        'stats': {
+            'authors_count': Author.public.count(),
+            'poems_count': Poem.public.count(),
+        },
+        'top_poems': serialize_poem_list(top_poems),
+        'top_authors': serialize_authors(top_authors),
+    }
+
+
+def _is_fresh(entry, version):
+    return entry['version'] == version and time.time() - entry['built_at'] < settings.HOME_CACHE_TTL
+
+
+def refresh_home_payload():
+    version = get_content_version()
+    payload = build_home_payload()
+    entry = {'payload': payload, 'version': version, 'built_at': time.time()}
+    cache.set(HOME_CACHE_KEY, entry, settings.HOME_CACHE_STALE_TTL)
+    return payload
+
+
+def _refresh_in_background():
+    def run():
+        try:
+            refresh_home_payload()
+        except Exception:
+            logger.exception('Failed to rebuild home payload')
+        finally:
+            cache.delete(HOME_LOCK_KEY)
+            close_old_connections()
+
+    threading.Thread(target=run, name='home-payload-refresh', daemon=True).start()
+
+
+def schedule_home_refresh():
+    """Rebuild in the background unless another worker already holds the rebuild lock."""
+    if cache.add(HOME_LOCK_KEY, 1, settings.HOME_CACHE_LOCK_TTL):
+        _refresh_in_background()
+
+
+def _for_request(payload, request):
+    return {**payload, 'top_authors': absolute_photo_urls(payload['top_authors'], request)}
+
+
+def get_home_payload(request=None):
+    """Serve the shared payload, revalidating stale entries in the background."""
+    return _for_request(_shared_payload(), request)
+
+
+def _shared_payload():
+    entry = cache.get(HOME_CACHE_KEY)
+    if entry is not None:
+        if not _is_fresh(entry, get_content_version()):
+            schedule_home_refresh()
+        return entry['payload']
+
+    if cache.add(HOME_LOCK_KEY, 1, settings.HOME_CACHE_LOCK_TTL):
+        try:
+            return refresh_home_payload()
+        finally:
+            cache.delete(HOME_LOCK_KEY)
+
+    # Another worker is building the first entry; wait briefly instead of piling on.
+    deadline = time.monotonic() + settings.HOME_CACHE_LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        entry = cache.get(HOME_CACHE_KEY)
+        if entry is not None:
+            return entry['payload']
+    return build_home_payload()
+
+
+def on_content_changed(sender, **kwargs):
+    schedule_home_refresh()
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from apps.poems.models import Poem, text_stats
+
+
+class Command(BaseCommand):
+    help = 'Fill preview, line_count and char_count for poems in id-ordered chunks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500, help='Poems updated per statement')
+        parser.add_argument('--all', action='store_true', help='Recompute every poem, not only unfilled rows')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        qs = Poem.objects.all()
+        if not options['all']:
+            # Any non-empty text has char_count > 0, so zero marks rows written before the columns existed.
+            qs = qs.filter(char_count=0).exclude(text='')
+        last_id = 0
+        total = 0
+        while True:
+            poems = list(qs.filter(id__gt=last_id).order_by('id').only('id', 'text')[:chunk_size])
+            if not poems:
+                break
+            for poem in poems:
+                poem.preview, poem.line_count, poem.char_count = text_stats(poem.text)
+            Poem.objects.bulk_update(poems, ['preview', 'line_count', 'char_count'])
+            total += len(poems)
+            last_id = poems[-1].id
+        self.stdout.write(self.style.SUCCESS(f'Backfilled text stats for {total} poems.'))
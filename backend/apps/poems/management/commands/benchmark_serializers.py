@@ -0,0 +1,65 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.authors.models import Author
+from apps.authors.serializers import AUTHOR_VALUES, AuthorSerializer, serialize_authors
+from apps.poems.models import Poem
+from apps.poems.serializers import (
+    POEM_DETAIL_VALUES,
+    POEM_LIST_VALUES,
+    PoemDetailSerializer,
+    PoemListSerializer,
+    poem_detail_data,
+    serialize_poem_list,
+)
+
+
+class Command(BaseCommand):
+    help = 'Compare per-row cost of DRF serializers and the values-based fast path on existing rows.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=500, help='Rows fetched per model')
+        parser.add_argument('--repeat', type=int, default=20, help='Serialization passes per variant')
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        repeat = options['repeat']
+
+        poems = Poem.objects.select_related('author').order_by('id')[:rows]
+        authors = Author.objects.with_stats().order_by('id')[:rows]
+        poem_instances = list(poems)
+        author_instances = list(authors)
+        poem_list_rows = list(poems.values(*POEM_LIST_VALUES))
+        poem_detail_rows = list(poems.values(*POEM_DETAIL_VALUES))
+        author_rows = list(authors.values(*AUTHOR_VALUES))
+
+        cases = [
+            ('PoemListSerializer', len(poem_instances),
+             lambda: PoemListSerializer(poem_instances, many=True).data,
+             lambda: serialize_poem_list(poem_list_rows)),
+            ('PoemDetailSerializer', len(poem_instances),
+             lambda: [PoemDetailSerializer(poem).data for poem in poem_instances],
+             lambda: [poem_detail_data(row) for row in poem_detail_rows]),
+            ('AuthorSerializer', len(author_instances),
+             lambda: AuthorSerializer(author_instances, many=True).data,
+             lambda: serialize_authors(author_rows)),
+        ]
+        for name, count, drf, fast in cases:
+            if not count:
+                self.stdout.write(f'{name}: no rows, skipped')
+                continue
+            drf_us = self._per_row_us(drf, count, repeat)
+            fast_us = self._per_row_us(fast, count, repeat)
+            self.stdout.write(
+                f'{name}: {count} rows, drf {drf_us:.1f} us/row, fast {fast_us:.1f} us/row '
+                f'({drf_us / fast_us:.1f}x)'
+            )
+        self.stdout.write(self.style.SUCCESS('Benchmark finished.'))
+
+    def _per_row_us(self, fn, count, repeat):
+        fn()
+        started = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        return (time.perf_counter() - started) * 1_000_000 / (repeat * count)
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.poems.view_buffer import drain_pending_views
+
+
+class Command(BaseCommand):
+    help = 'Apply poem views counted in the cache to view counters and monthly visits.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep flushing until interrupted')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds between flushes with --loop')
+        parser.add_argument('--batch-size', type=int, default=None, help='Dirty poems per flush statement')
+
+    def handle(self, *args, **options):
+        while True:
+            consumed, counted = drain_pending_views(options['batch_size'])
+            if consumed or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(f'Flushed {counted} views from {consumed} dirty entries.'))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
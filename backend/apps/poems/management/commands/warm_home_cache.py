@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from apps.poems.home import refresh_home_payload
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the shared home page payload cache.'
+
+    def handle(self, *args, **options):
+        payload = refresh_home_payload()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Home cache warmed ({payload['stats']['poems_count']} poems, "
+                f"{payload['stats']['authors_count']} authors)."
+            )
+        )
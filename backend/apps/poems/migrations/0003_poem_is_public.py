@@ -0,0 +1,41 @@
+# Generated by Django 5.0.8 on 2026-10-17 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authors', '0002_author_avatar_crop_author_deleted_at_and_more'),
+        ('poems', '0002_poem_deleted_at_poem_deleted_by_poem_is_published_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='poem',
+            name='is_public',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.RunSQL(
+            sql="""
+                UPDATE poems_poem AS p
+                SET is_public = (
+                    p.deleted_at IS NULL
+                    AND p.is_published
+                    AND a.deleted_at IS NULL
+                    AND a.is_published
+                )
+                FROM authors_author AS a
+                WHERE a.id = p.author_id
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name='poem',
+            index=models.Index(condition=models.Q(('is_public', True)), fields=['author', 'id'], name='poems_public_author_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='poem',
+            index=models.Index(condition=models.Q(('is_public', True)), fields=['-views', 'id'], name='poems_public_views_idx'),
+        ),
+    ]
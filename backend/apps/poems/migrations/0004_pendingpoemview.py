@@ -0,0 +1,24 @@
+# Generated by Django 5.0.8 on 2026-10-17 10:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poems', '0003_poem_is_public'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingPoemView',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_hash', models.CharField(max_length=64)),
+                ('viewed_date', models.DateField()),
+                ('viewed_at', models.DateTimeField(auto_now_add=True)),
+                ('poem', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pending_views', to='poems.poem')),
+            ],
+        ),
+    ]
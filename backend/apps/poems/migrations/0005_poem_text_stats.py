@@ -0,0 +1,28 @@
+# Generated by Django 5.0.8 on 2026-10-17 11:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poems', '0004_pendingpoemview'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='poem',
+            name='preview',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='poem',
+            name='line_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='poem',
+            name='char_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
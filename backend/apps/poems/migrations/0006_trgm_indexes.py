@@ -0,0 +1,35 @@
+# Generated by Django 5.0.8 on 2026-10-17 13:10
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('poems', '0005_poem_text_stats'),
+        ('search', '0001_enable_trgm'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='poem',
+            index=django.contrib.postgres.indexes.GinIndex(
+                condition=models.Q(('is_public', True)),
+                fields=['title'],
+                name='poems_title_trgm',
+                opclasses=['gin_trgm_ops'],
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name='poem',
+            index=django.contrib.postgres.indexes.GinIndex(
+                condition=models.Q(('is_public', True)),
+                fields=['text'],
+                name='poems_text_trgm',
+                opclasses=['gin_trgm_ops'],
+            ),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.0.8 on 2026-10-17 13:40
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poems', '0006_trgm_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='poem',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunSQL(
+            sql="""
+            CREATE FUNCTION poems_poem_search_vector() RETURNS trigger AS $$
+            BEGIN
+                NEW.search_vector :=
+                    setweight(to_tsvector('simple'::regconfig, COALESCE(NEW.title, '')), 'A')
+                    || setweight(to_tsvector('simple'::regconfig, COALESCE(NEW.text, '')), 'B');
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql;
+
+            CREATE TRIGGER poems_poem_search_vector
+            BEFORE INSERT OR UPDATE OF title, text ON poems_poem
+            FOR EACH ROW EXECUTE FUNCTION poems_poem_search_vector();
+            """,
+            reverse_sql="""
+            DROP TRIGGER IF EXISTS poems_poem_search_vector ON poems_poem;
+            DROP FUNCTION IF EXISTS poems_poem_search_vector();
+            """,
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.0.8 on 2026-10-17 15:20
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poems', '0007_search_vector_trigger'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="""
+            CREATE OR REPLACE FUNCTION poems_poem_search_vector() RETURNS trigger AS $$
+            BEGIN
+                NEW.search_vector :=
+                    setweight(to_tsvector('simple'::regconfig, translate(
+                        COALESCE(NEW.title, ''), 'ӢӮҲҚҒҶЁӣӯҳқғҷё', 'ИУХКГЧЕиухкгче'
+                    )), 'A')
+                    || setweight(to_tsvector('simple'::regconfig, translate(
+                        COALESCE(NEW.text, ''), 'ӢӮҲҚҒҶЁӣӯҳқғҷё', 'ИУХКГЧЕиухкгче'
+                    )), 'B');
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql;
+
+            -- Fires the trigger for every row.
+            UPDATE poems_poem SET title = title;
+            """,
+            reverse_sql="""
+            CREATE OR REPLACE FUNCTION poems_poem_search_vector() RETURNS trigger AS $$
+            BEGIN
+                NEW.search_vector :=
+                    setweight(to_tsvector('simple'::regconfig, COALESCE(NEW.title, '')), 'A')
+                    || setweight(to_tsvector('simple'::regconfig, COALESCE(NEW.text, '')), 'B');
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql;
+
+            UPDATE poems_poem SET title = title;
+            """,
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.0.8 on 2026-10-17 15:30
+
+import django.contrib.postgres.indexes
+import django.db.models.expressions
+from django.contrib.postgres.operations import AddIndexConcurrently, RemoveIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('poems', '0008_fold_search_vector'),
+    ]
+
+    operations = [
+        RemoveIndexConcurrently(
+            model_name='poem',
+            name='poems_title_trgm',
+        ),
+        RemoveIndexConcurrently(
+            model_name='poem',
+            name='poems_text_trgm',
+        ),
+        AddIndexConcurrently(
+            model_name='poem',
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.expressions.Func(
+                        django.db.models.expressions.F('title'),
+                        django.db.models.expressions.Value('ӢӮҲҚҒҶЁӣӯҳқғҷё'),
+                        django.db.models.expressions.Value('ИУХКГЧЕиухкгче'),
+                        function='TRANSLATE',
+                    ),
+                    name='gin_trgm_ops',
+                ),
+                condition=models.Q(('is_public', True)),
+                name='poems_title_trgm',
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name='poem',
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.expressions.Func(
+                        django.db.models.expressions.F('text'),
+                        django.db.models.expressions.Value('ӢӮҲҚҒҶЁӣӯҳқғҷё'),
+                        django.db.models.expressions.Value('ИУХКГЧЕиухкгче'),
+                        function='TRANSLATE',
+                    ),
+                    name='gin_trgm_ops',
+                ),
+                condition=models.Q(('is_public', True)),
+                name='poems_text_trgm',
+            ),
+        ),
+    ]
@@ -0,0 +1,97 @@
+# Generated by Django 5.0.8 on 2026-10-17 17:10
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.deletion
+import django.db.models.expressions
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poems', '0009_folded_trgm_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PoemLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField()),
+                ('text', models.TextField()),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(editable=False, null=True)),
+                ('poem', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='lines', to='poems.poem')),
+            ],
+            options={
+                'ordering': ['poem', 'number'],
+                'constraints': [models.UniqueConstraint(fields=('poem', 'number'), name='uniq_poem_line')],
+            },
+        ),
+        migrations.RunSQL(
+            sql="""
+            CREATE FUNCTION poems_poem_sync_lines() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP = 'UPDATE' THEN
+                    IF NEW.text IS NOT DISTINCT FROM OLD.text THEN
+                        RETURN NULL;
+                    END IF;
+                    DELETE FROM poems_poemline WHERE poem_id = NEW.id;
+                END IF;
+                INSERT INTO poems_poemline (poem_id, number, text, search_vector)
+                SELECT
+                    NEW.id,
+                    row_number() OVER (ORDER BY split.position),
+                    btrim(split.line, E' \\t'),
+                    to_tsvector('simple'::regconfig, translate(
+                        split.line, 'ӢӮҲҚҒҶЁӣӯҳқғҷё', 'ИУХКГЧЕиухкгче'
+                    ))
+                FROM regexp_split_to_table(COALESCE(NEW.text, ''), E'\\r\\n|\\r|\\n')
+                    WITH ORDINALITY AS split(line, position)
+                WHERE split.line ~ '[^[:space:]]';
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql;
+
+            CREATE TRIGGER poems_poem_sync_lines
+            AFTER INSERT OR UPDATE OF text ON poems_poem
+            FOR EACH ROW EXECUTE FUNCTION poems_poem_sync_lines();
+
+            INSERT INTO poems_poemline (poem_id, number, text, search_vector)
+            SELECT
+                poem.id,
+                row_number() OVER (PARTITION BY poem.id ORDER BY split.position),
+                btrim(split.line, E' \\t'),
+                to_tsvector('simple'::regconfig, translate(
+                    split.line, 'ӢӮҲҚҒҶЁӣӯҳқғҷё', 'ИУХКГЧЕиухкгче'
+                ))
+            FROM poems_poem AS poem
+            CROSS JOIN LATERAL regexp_split_to_table(poem.text, E'\\r\\n|\\r|\\n')
+                WITH ORDINALITY AS split(line, position)
+            WHERE split.line ~ '[^[:space:]]';
+            """,
+            reverse_sql="""
+            DROP TRIGGER IF EXISTS poems_poem_sync_lines ON poems_poem;
+            DROP FUNCTION IF EXISTS poems_poem_sync_lines();
+            """,
+        ),
+        migrations.AddIndex(
+            model_name='poemline',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='poemline_search_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='poemline',
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.expressions.Func(
+                        django.db.models.expressions.F('text'),
+                        django.db.models.expressions.Value('ӢӮҲҚҒҶЁӣӯҳқғҷё'),
+                        django.db.models.expressions.Value('ИУХКГЧЕиухкгче'),
+                        function='TRANSLATE',
+                    ),
+                    name='gin_trgm_ops',
+                ),
+                name='poemline_text_trgm',
+            ),
+        ),
+    ]
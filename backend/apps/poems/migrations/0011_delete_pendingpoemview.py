@@ -0,0 +1,66 @@
+# Generated by Django 5.0.8 on 2026-10-17 18:40
+
+from django.db import migrations
+
+
+# Views still staged in the table are applied once before it goes; pending views now live in the cache.
+APPLY_STAGED_SQL = """
+WITH batch AS (
+    DELETE FROM poems_pendingpoemview
+    RETURNING poem_id, user_hash, viewed_date, viewed_at
+),
+logged AS (
+    INSERT INTO poems_poemview (poem_id, user_hash, viewed_date, viewed_at)
+    SELECT DISTINCT ON (poem_id, user_hash, viewed_date) poem_id, user_hash, viewed_date, viewed_at
+    FROM batch
+    ORDER BY poem_id, user_hash, viewed_date, viewed_at
+    ON CONFLICT (poem_id, user_hash, viewed_date) DO NOTHING
+    RETURNING poem_id, viewed_date
+),
+deltas AS (
+    SELECT poem_id, date_trunc('month', viewed_date)::date AS month_start, COUNT(*) AS delta
+    FROM logged
+    GROUP BY 1, 2
+),
+bumped AS (
+    UPDATE poems_poem AS p
+    SET views = p.views + d.delta
+    FROM (SELECT poem_id, SUM(delta) AS delta FROM deltas GROUP BY poem_id) AS d
+    WHERE p.id = d.poem_id
+    RETURNING p.id
+),
+author_bumped AS (
+    UPDATE authors_authorstats AS s
+    SET popularity = s.popularity + a.delta
+    FROM (
+        SELECT p.author_id, SUM(d.delta) AS delta
+        FROM deltas AS d
+        JOIN poems_poem AS p ON p.id = d.poem_id
+        WHERE p.is_public
+        GROUP BY p.author_id
+    ) AS a
+    WHERE s.author_id = a.author_id
+    RETURNING s.author_id
+)
+INSERT INTO poems_poemmonthlyvisit (poem_id, month_start, visits_count, created_at, updated_at)
+SELECT poem_id, month_start, delta, now(), now()
+FROM deltas
+ON CONFLICT (poem_id, month_start) DO UPDATE
+SET visits_count = poems_poemmonthlyvisit.visits_count + EXCLUDED.visits_count,
+    updated_at = EXCLUDED.updated_at
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authors', '0003_authorstats'),
+        ('poems', '0010_poemline'),
+    ]
+
+    operations = [
+        migrations.RunSQL(APPLY_STAGED_SQL, reverse_sql=migrations.RunSQL.noop),
+        migrations.DeleteModel(
+            name='PendingPoemView',
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.0.8 on 2026-10-17 19:10
+
+from django.db import migrations
+
+from apps.poems.models import text_stats
+
+
+CHUNK_SIZE = 500
+
+
+def backfill_text_stats(apps, schema_editor):
+    # Any non-empty text has char_count > 0, so zero marks rows written before the columns existed.
+    Poem = apps.get_model('poems', 'Poem')
+    qs = Poem.objects.filter(char_count=0).exclude(text='')
+    last_id = 0
+    while True:
+        poems = list(qs.filter(id__gt=last_id).order_by('id').only('id', 'text')[:CHUNK_SIZE])
+        if not poems:
+            break
+        for poem in poems:
+            poem.preview, poem.line_count, poem.char_count = text_stats(poem.text)
+        Poem.objects.bulk_update(poems, ['preview', 'line_count', 'char_count'])
+        last_id = poems[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poems', '0011_delete_pendingpoemview'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_text_stats, migrations.RunPython.noop),
+    ]
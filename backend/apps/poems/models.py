@@ -1,10 +1,50 @@
 from django.conf import settings
-from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
+from django.db.models import Q
 from django.utils import timezone
 
 from apps.authors.models import Author
+from apps.search.text import folded
+
+
+PREVIEW_LINES = 3
+
+# Same expression as the ``poems_poem_search_vector`` trigger (migration 0008), which keeps
+# the column current on every insert and on updates that write ``title`` or ``text``.
+POEM_SEARCH_VECTOR = (
+    SearchVector(folded('title'), weight='A', config='simple')
+    + SearchVector(folded('text'), weight='B', config='simple')
+)
+
+
+def text_stats(text):
+    """Return ``(preview, line_count, char_count)`` for a poem text."""
+    lines = [line for line in text.splitlines() if line.strip()]
+    return '\n'.join(lines[:PREVIEW_LINES]), len(lines), len(text)
+
+
+class PoemQuerySet(models.QuerySet):
+    def for_list(self):
+        """Rows for list payloads: author joined, full text and search vector left in the table."""
+        return self.select_related('author').defer('text', 'search_vector')
+
+    def sync_is_public(self):
+        visible = Q(
+            deleted_at__isnull=True,
+            is_published=True,
+            author__deleted_at__isnull=True,
+            author__is_published=True,
+        )
+        hidden = self.filter(is_public=True).exclude(visible).update(is_public=False)
+        shown = self.filter(visible, is_public=False).update(is_public=True)
+        return hidden + shown
+
+
+class PublicPoemManager(models.Manager.from_queryset(PoemQuerySet)):
+    def get_queryset(self):
+        return super().get_queryset().filter(is_public=True)
 
 
 class Poem(models.Model):
@@ -21,25 +61,79 @@ class Poem(models.Model):
         blank=True,
         related_name='deleted_poems',
     )
-    search_vector = SearchVectorField(null=True)
+    is_public = models.BooleanField(default=False, editable=False)
+    preview = models.TextField(blank=True, default='', editable=False)
+    line_count = models.PositiveIntegerField(default=0, editable=False)
+    char_count = models.PositiveIntegerField(default=0, editable=False)
+    search_vector = SearchVectorField(null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = PoemQuerySet.as_manager()
+    public = PublicPoemManager()
+
     class Meta:
         ordering = ['id']
-        indexes = [GinIndex(fields=['search_vector'], name='poems_search_gin')]
+        indexes = [
+            GinIndex(fields=['search_vector'], name='poems_search_gin'),
+            GinIndex(OpClass(folded('title'), name='gin_trgm_ops'), name='poems_title_trgm', condition=Q(is_public=True)),
+            GinIndex(OpClass(folded('text'), name='gin_trgm_ops'), name='poems_text_trgm', condition=Q(is_public=True)),
+            models.Index(fields=['author', 'id'], name='poems_public_author_idx', condition=Q(is_public=True)),
+            models.Index(fields=['-views', 'id'], name='poems_public_views_idx', condition=Q(is_public=True)),
+        ]
 
     def __str__(self):
         return f'{self.title} ({self.author.full_name})'
 
-    def update_search_vector(self):
-        self.__class__.objects.filter(pk=self.pk).update(
-            search_vector=SearchVector('title', 'text', config='simple')
+    def compute_is_public(self):
+        return bool(
+            self.deleted_at is None
+            and self.is_published
+            and self.author.deleted_at is None
+            and self.author.is_published
         )
 
+    def refresh_text_stats(self):
+        self.preview, self.line_count, self.char_count = text_stats(self.text)
+
     def save(self, *args, **kwargs):
+        self.is_public = self.compute_is_public()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'text' in update_fields:
+            self.refresh_text_stats()
+        if update_fields is not None:
+            extra = {'is_public'}
+            if 'text' in update_fields:
+                extra |= {'preview', 'line_count', 'char_count'}
+            kwargs['update_fields'] = {*update_fields, *extra}
         super().save(*args, **kwargs)
-        self.update_search_vector()
+
+
+class PoemLine(models.Model):
+    """One non-blank line of a poem, numbered from 1.
+
+    Rows and their search vectors are written by the ``poems_poem_sync_lines`` trigger
+    (migration 0010) whenever a poem's ``text`` is inserted or changed.
+    """
+
+    # The ``uniq_poem_line`` constraint leads with ``poem`` and serves its lookups.
+    poem = models.ForeignKey(Poem, related_name='lines', on_delete=models.CASCADE, db_index=False)
+    number = models.PositiveIntegerField()
+    text = models.TextField()
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        ordering = ['poem', 'number']
+        constraints = [
+            models.UniqueConstraint(fields=['poem', 'number'], name='uniq_poem_line'),
+        ]
+        indexes = [
+            GinIndex(fields=['search_vector'], name='poemline_search_gin'),
+            GinIndex(OpClass(folded('text'), name='gin_trgm_ops'), name='poemline_text_trgm'),
+        ]
+
+    def __str__(self):
+        return f'{self.poem_id}:{self.number}'
 
 
 class PoemView(models.Model):
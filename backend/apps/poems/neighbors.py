@@ -0,0 +1,71 @@
+from array import array
+from bisect import bisect_left, bisect_right
+
+from django.core.cache import cache
+
+from config.utils import slugify_fallback
+from config.versions import get_versions
+from apps.authors.models import Author
+from .models import Poem
+from .signals import entity_version_key
+
+
+def _index_key(author_id):
+    return f'poem_index:author:{author_id}'
+
+
+class AuthorPoemIndex:
+    """Public poems of one author ordered by id, for prev/next lookups by bisection."""
+
+    def __init__(self, ids=(), titles=(), url_slugs=()):
+        self.ids = array('q', ids)
+        self.titles = list(titles)
+        self.url_slugs = list(url_slugs)
+
+    def _entry(self, position):
+        return {
+            'id': self.ids[position],
+            'title': self.titles[position],
+            'url_slug': self.url_slugs[position],
+        }
+
+    def neighbors(self, poem_id):
+        before = bisect_left(self.ids, poem_id)
+        after = bisect_right(self.ids, poem_id)
+        return {
+            'prev': self._entry(before - 1) if before > 0 else None,
+            'next': self._entry(after) if after < len(self.ids) else None,
+        }
+
+
+def _build_index(author_id):
+    if not Author.public.filter(pk=author_id).exists():
+        return None
+    rows = Poem.public.filter(author_id=author_id).order_by('id').values_list('id', 'title')
+    ids, titles, url_slugs = [], [], []
+    for pk, title in rows:
+        ids.append(pk)
+        titles.append(title)
+        url_slugs.append(f'{pk}-{slugify_fallback(title, "poem")}')
+    return AuthorPoemIndex(ids, titles, url_slugs)
+
+
+def get_author_poem_index(author_id):
+    """Return the author's index, or None when the author is not public.
+
+    Cached entries carry the author's version counter, which every write to the author
+    or one of their poems bumps; a hit costs one cache round trip and no queries.
+    """
+    version_key = entity_version_key('author', author_id)
+    index_key = _index_key(author_id)
+    found = cache.get_many([index_key, version_key])
+    entry = found.get(index_key)
+    if entry is not None and version_key in found and entry['version'] == found[version_key]:
+        return entry['index']
+
+    version = found.get(version_key)
+    if version is None:
+        version = get_versions([version_key])[version_key]
+    index = _build_index(author_id)
+    cache.set(index_key, {'version': version, 'index': index}, None)
+    return index
@@ -0,0 +1,59 @@
+import hashlib
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+
+from config.versions import get_versions
+from .signals import CONTENT_VERSION_KEY, entity_version_key
+
+
+# Dependencies name the version counters a cached body was built from.
+GLOBAL = CONTENT_VERSION_KEY
+
+
+def author_dep(pk):
+    return entity_version_key('author', pk)
+
+
+def poem_dep(pk):
+    return entity_version_key('poem', pk)
+
+
+def response_cache_key(request, name=None):
+    if name is None:
+        query = sorted((key, value) for key, values in request.query_params.lists() for value in values)
+        name = f'{request.path}?{urlencode(query)}'
+    # Absolute URLs in the body follow the scheme and host unless PUBLIC_BASE_URL is set.
+    normalized = f'{request.scheme}://{request.get_host()}{name}'
+    return f'response:{hashlib.sha1(normalized.encode("utf-8")).hexdigest()}'
+
+
+def cached_data(request, build, deps=(), name=None, ttl=None):
+    """Return response data for ``request`` from the cache or ``build()``.
+
+    Entries are keyed by the normalized URL unless ``name`` gives an explicit key.
+
+    ``build`` returns ``(data, extra_deps)`` for dependencies only known after loading
+    (e.g. a poem's author). An entry is served only while every version counter it was
+    built from is unchanged, so writes invalidate exactly the entries that depend on
+    the written author or poem. ``ttl`` (default ``RESPONSE_CACHE_TTL``) bounds staleness
+    of counters that change without a content write (views, popularity).
+    """
+    ttl = settings.RESPONSE_CACHE_TTL if ttl is None else ttl
+    if ttl <= 0:
+        return build()[0]
+
+    key = response_cache_key(request, name)
+    entry = cache.get(key)
+    if entry is not None and get_versions(list(entry['versions'])) == entry['versions']:
+        return entry['data']
+
+    # Read known versions before building so a concurrent write can only make the entry older.
+    versions = get_versions(list(deps))
+    data, extra_deps = build()
+    extra_deps = [dep for dep in extra_deps if dep not in versions]
+    if extra_deps:
+        versions.update(get_versions(extra_deps))
+    cache.set(key, {'data': data, 'versions': versions}, ttl)
+    return data
@@ -0,0 +1,215 @@
+import random
+import threading
+from array import array
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+from apps.authors.models import Author
+from .models import Poem
+from .signals import get_content_version, read_changes
+
+
+class IdPool:
+    """Compact array of ids with O(1) add/discard and O(k) sampling of distinct members."""
+
+    def __init__(self, ids=()):
+        self._ids = array('q', ids)
+        self._positions = {pk: index for index, pk in enumerate(self._ids)}
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, pk):
+        return pk in self._positions
+
+    def add(self, pk):
+        if pk not in self._positions:
+            self._positions[pk] = len(self._ids)
+            self._ids.append(pk)
+
+    def discard(self, pk):
+        index = self._positions.pop(pk, None)
+        if index is None:
+            return
+        # Move the last id into the freed slot so removal never shifts the array.
+        last = self._ids.pop()
+        if index < len(self._ids):
+            self._ids[index] = last
+            self._positions[last] = index
+
+    def sample(self, k, exclude=frozenset()):
+        size = len(self._ids)
+        if k <= 0 or not size:
+            return []
+        if (k + len(exclude)) * 2 >= size:
+            candidates = [pk for pk in self._ids if pk not in exclude]
+            return random.sample(candidates, min(k, len(candidates)))
+
+        picked = []
+        seen = set(exclude)
+        while len(picked) < k:
+            pk = self._ids[random.randrange(size)]
+            if pk in seen:
+                continue
+            seen.add(pk)
+            picked.append(pk)
+        return picked
+
+
+class RandomSampler:
+    """Per-process pool of visible ids, kept current by replaying the shared change log.
+
+    Any process catches up on the changes it missed (see ``read_changes``); a gap it
+    cannot replay, such as a bulk write, reloads the whole pool.
+    """
+
+    def __init__(self, scope, load_ids, load_visibility):
+        self.scope = scope
+        self._load_ids = load_ids
+        self._load_visibility = load_visibility
+        self._lock = threading.Lock()
+        self._pool = None
+        self._version = None
+
+    def _current_pool(self):
+        version = get_content_version()
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._reload(version)
+        elif self._version != version:
+            self.catch_up(version)
+        return self._pool
+
+    def _reload(self, version):
+        self._pool = IdPool(self._load_ids())
+        self._version = version
+
+    def sample(self, k, exclude=(), user_hash=None):
+        pool = self._current_pool()
+        exclude = {int(pk) for pk in exclude}
+        seen = self._recently_seen(user_hash)
+        picked = pool.sample(k, exclude | seen)
+        if len(picked) < k and seen:
+            picked += pool.sample(k - len(picked), exclude | set(picked))
+        self._remember(user_hash, picked)
+        return picked
+
+    def invalidate(self):
+        with self._lock:
+            self._pool = None
+
+    def discard(self, pks):
+        if self._pool is None:
+            return
+        with self._lock:
+            for pk in pks:
+                self._pool.discard(pk)
+
+    def catch_up(self, version):
+        """Replay the changes up to ``version``; one thread does it while the others keep sampling."""
+        if self._pool is None or not self._lock.acquire(blocking=False):
+            return
+        try:
+            if self._pool is None or self._version == version:
+                return
+            replay = read_changes(self._version, version)
+            if replay is None:
+                self._reload(version)
+                return
+            reached, author_ids, poem_ids = replay
+            if reached > self._version:
+                self._apply(author_ids, poem_ids)
+                self._version = reached
+        finally:
+            self._lock.release()
+
+    def _apply(self, author_ids, poem_ids):
+        visibility = self._load_visibility(author_ids, poem_ids)
+        for pk in poem_ids if self.scope == 'poems' else author_ids:
+            visibility.setdefault(pk, False)
+        for pk, visible in visibility.items():
+            if visible:
+                self._pool.add(pk)
+            else:
+                self._pool.discard(pk)
+
+    def evict_hidden(self, pks):
+        """Discard the ids among ``pks`` that were deleted or are no longer public."""
+        if self.scope == 'poems':
+            visibility = self._load_visibility((), pks)
+        else:
+            visibility = self._load_visibility(pks, ())
+        self.discard([pk for pk in pks if not visibility.get(pk)])
+
+    def _seen_key(self, user_hash):
+        return f'random_seen:{self.scope}:{user_hash}'
+
+    def _recently_seen(self, user_hash):
+        if not user_hash or not settings.RANDOM_NO_REPEAT_WINDOW:
+            return set()
+        return set(cache.get(self._seen_key(user_hash)) or [])
+
+    def _remember(self, user_hash, picked):
+        window = settings.RANDOM_NO_REPEAT_WINDOW
+        if not user_hash or not window or not picked:
+            return
+        key = self._seen_key(user_hash)
+        recent = (cache.get(key) or []) + picked
+        cache.set(key, recent[-window:], settings.RANDOM_NO_REPEAT_TTL)
+
+
+def _poem_ids():
+    return Poem.public.order_by().values_list('id', flat=True).iterator(chunk_size=10000)
+
+
+def _poem_visibility(author_ids, poem_ids):
+    rows = Poem.objects.filter(Q(id__in=poem_ids) | Q(author_id__in=author_ids)).values_list('id', 'is_public')
+    return dict(rows)
+
+
+def _author_ids():
+    return Author.public.order_by().values_list('id', flat=True).iterator(chunk_size=10000)
+
+
+def _author_visibility(author_ids, poem_ids):
+    visible = set(Author.public.filter(id__in=author_ids).values_list('id', flat=True))
+    return {pk: pk in visible for pk in author_ids}
+
+
+poem_sampler = RandomSampler('poems', _poem_ids, _poem_visibility)
+author_sampler = RandomSampler('authors', _author_ids, _author_visibility)
+
+
+def on_content_changed(sender, version, author_ids, poem_ids, **kwargs):
+    # Catch up to the current version: a later write may already have been replayed.
+    version = get_content_version()
+    poem_sampler.catch_up(version)
+    author_sampler.catch_up(version)
+
+
+def _pick(sampler, queryset, k, exclude, user_hash):
+    # A short result is final: the pool only changes with the content version.
+    skipped = set()
+    while True:
+        ids = sampler.sample(k, exclude=[*exclude, *skipped], user_hash=user_hash)
+        rows = {row.id: row for row in queryset.filter(id__in=ids)}
+        missing = [pk for pk in ids if pk not in rows]
+        if not missing:
+            return [rows[pk] for pk in ids]
+        # Rows removed outside the change events (e.g. raw SQL) heal the pool lazily; ids the
+        # queryset merely filters out stay pooled and are only skipped for this pick.
+        sampler.evict_hidden(missing)
+        skipped.update(missing)
+
+
+def pick_public_poems(k, exclude=(), user_hash=None):
+    """Return up to ``k`` distinct random public poems with their authors loaded."""
+    return _pick(poem_sampler, Poem.public.for_list(), k, exclude, user_hash)
+
+
+def pick_public_authors(queryset, k, exclude=(), user_hash=None):
+    """Return up to ``k`` distinct random authors from ``queryset`` (a public author queryset)."""
+    return _pick(author_sampler, queryset, k, exclude, user_hash)
@@ -6,7 +6,6 @@ from .models import Poem
 
 class PoemListSerializer(serializers.ModelSerializer):
     author = serializers.SerializerMethodField()
-    preview = serializers.SerializerMethodField()
     slug = serializers.SerializerMethodField()
     url_slug = serializers.SerializerMethodField()
 
@@ -21,11 +20,6 @@ class PoemListSerializer(serializers.ModelSerializer):
             'slug': slugify_fallback(obj.author.full_name, 'author'),
         }
 
-    def get_preview(self, obj):
-        lines = [line for line in obj.text.splitlines() if line.strip()]
-        preview_lines = lines[:3]
-        return '\n'.join(preview_lines)
-
     def get_slug(self, obj):
         return slugify_fallback(obj.title, 'poem')
 
@@ -54,3 +48,48 @@ class PoemDetailSerializer(serializers.ModelSerializer):
 
     def get_url_slug(self, obj):
         return f"{obj.id}-{self.get_slug(obj)}"
+
+
+# Fast path: plain dicts built from ``.values()`` rows, byte-identical to the serializers above.
+
+POEM_LIST_VALUES = ('id', 'title', 'preview', 'author_id', 'author__full_name', 'views')
+POEM_DETAIL_VALUES = ('id', 'title', 'text', 'author_id', 'author__full_name', 'views')
+
+
+def _author_ref(row):
+    return {
+        'id': row['author_id'],
+        'full_name': row['author__full_name'],
+        'slug': slugify_fallback(row['author__full_name'], 'author'),
+    }
+
+
+def poem_list_data(row):
+    slug = slugify_fallback(row['title'], 'poem')
+    return {
+        'id': row['id'],
+        'title': row['title'],
+        'preview': row['preview'],
+        'author': _author_ref(row),
+        'views': row['views'],
+        'slug': slug,
+        'url_slug': f"{row['id']}-{slug}",
+    }
+
+
+def poem_detail_data(row):
+    slug = slugify_fallback(row['title'], 'poem')
+    return {
+        'id': row['id'],
+        'title': row['title'],
+        'text': row['text'],
+        'author': _author_ref(row),
+        'views': row['views'],
+        'slug': slug,
+        'url_slug': f"{row['id']}-{slug}",
+    }
+
+
+def serialize_poem_list(rows):
+    """Serialize ``.values(*POEM_LIST_VALUES)`` rows."""
+    return [poem_list_data(row) for row in rows]
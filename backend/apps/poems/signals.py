@@ -0,0 +1,85 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.dispatch import Signal
+
+from config.versions import bump_version, get_versions
+
+
+# Sent after commit whenever authors or poems are written.
+# Receivers get ``version`` (the new content version), ``author_ids`` and ``poem_ids``.
+content_changed = Signal()
+
+CONTENT_VERSION_KEY = 'content_version'
+
+# Changes further behind than this are not replayed; in-process copies rebuild instead.
+MAX_REPLAYED_CHANGES = 500
+
+
+def get_content_version():
+    return get_versions([CONTENT_VERSION_KEY])[CONTENT_VERSION_KEY]
+
+
+def _change_key(version):
+    return f'{CONTENT_VERSION_KEY}:change:{version}'
+
+
+def record_change(version, author_ids, poem_ids):
+    cache.set(_change_key(version), (sorted(author_ids), sorted(poem_ids)), settings.CONTENT_CHANGE_LOG_TTL)
+
+
+def read_changes(after, upto):
+    """Merge the changes recorded for the versions after ``after`` up to ``upto``.
+
+    Returns ``(version, author_ids, poem_ids)`` where ``version`` is the last one covered:
+    the newest entries may still be missing while their writer is between its bump and
+    its log write, and are left for the next call. Returns None when the changes cannot
+    be replayed: the gap is too large, an older entry is gone, or a change names no ids
+    (a bulk write).
+    """
+    if not 0 < upto - after <= MAX_REPLAYED_CHANGES:
+        return None
+    versions = range(after + 1, upto + 1)
+    recorded = cache.get_many([_change_key(version) for version in versions])
+    author_ids, poem_ids = set(), set()
+    reached = after
+    for version in versions:
+        change = recorded.get(_change_key(version))
+        if change is None:
+            continue
+        if reached != version - 1 or not any(change):
+            return None
+        author_ids.update(change[0])
+        poem_ids.update(change[1])
+        reached = version
+    return reached, author_ids, poem_ids
+
+
+def entity_version_key(kind, pk):
+    """Version counter bumped whenever the given author or poem is written."""
+    return f'{CONTENT_VERSION_KEY}:{kind}:{pk}'
+
+
+def notify_content_changed(author_ids=(), poem_ids=()):
+    author_ids = frozenset(pk for pk in author_ids if pk is not None)
+    poem_ids = frozenset(pk for pk in poem_ids if pk is not None)
+
+    def send():
+        version = bump_version(CONTENT_VERSION_KEY)
+        # Log the change before anything else so other processes can replay it right away.
+        record_change(version, author_ids, poem_ids)
+        for pk in author_ids:
+            bump_version(entity_version_key('author', pk))
+        for pk in poem_ids:
+            bump_version(entity_version_key('poem', pk))
+        content_changed.send(sender=None, version=version, author_ids=author_ids, poem_ids=poem_ids)
+
+    transaction.on_commit(send)
+
+
+def poem_written(sender, instance, **kwargs):
+    notify_content_changed(author_ids=[instance.author_id], poem_ids=[instance.pk])
+
+
+def author_written(sender, instance, **kwargs):
+    notify_content_changed(author_ids=[instance.pk])
@@ -0,0 +1,53 @@
+from datetime import date
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.models.functions import Now
+from django.utils import timezone
+
+from apps.authors.models import Author, AuthorStats
+from .models import Poem, PoemMonthlyVisit, PoemView
+from .response_cache import GLOBAL, cached_data
+from .view_buffer import is_buffered_mode, record_view
+
+
+def site_stats(request):
+    def build():
+        return {
+            'authors_count': Author.public.count(),
+            'poems_count': Poem.public.count(),
+        }, []
+
+    return cached_data(request, build, deps=[GLOBAL], name='site-stats')
+
+
+def register_view(pk, user_hash):
+    """Count a visitor's daily view of a public poem; returns (views, counted) or None if hidden."""
+    if is_buffered_mode():
+        return record_view(pk, user_hash)
+
+    poem = Poem.public.only('id', 'author_id', 'views').filter(pk=pk).first()
+    if poem is None:
+        return None
+    today = timezone.now().date()
+    month_start = date(today.year, today.month, 1)
+
+    created = False
+    with transaction.atomic():
+        try:
+            PoemView.objects.create(poem=poem, user_hash=user_hash, viewed_date=today)
+            created = True
+        except IntegrityError:
+            created = False
+
+        if created:
+            Poem.objects.filter(pk=poem.pk).update(views=F('views') + 1)
+            AuthorStats.objects.filter(author_id=poem.author_id).update(
+                popularity=F('popularity') + 1,
+                updated_at=Now(),
+            )
+            monthly, _ = PoemMonthlyVisit.objects.get_or_create(poem=poem, month_start=month_start)
+            PoemMonthlyVisit.objects.filter(pk=monthly.pk).update(visits_count=F('visits_count') + 1)
+
+    poem.refresh_from_db(fields=['views'])
+    return poem.views, created
@@ -1,9 +1,31 @@
+from datetime import date
+from io import StringIO
+from unittest import mock
+
 from django.core.cache import cache
-from django.test import TestCase
-from rest_framework.test import APIClient
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APIRequestFactory
 
 from apps.authors.models import Author
-from apps.poems.models import Poem
+from apps.authors.serializers import AUTHOR_VALUES, AuthorSerializer, serialize_authors
+from apps.poems.models import Poem, PoemMonthlyVisit, PoemView
+from apps.poems.sampling import IdPool, RandomSampler, _poem_ids, _poem_visibility, author_sampler, pick_public_authors
+from apps.poems.serializers import (
+    POEM_DETAIL_VALUES,
+    POEM_LIST_VALUES,
+    PoemDetailSerializer,
+    PoemListSerializer,
+    poem_detail_data,
+    serialize_poem_list,
+)
+from apps.poems.signals import CONTENT_VERSION_KEY
+from apps.poems import view_buffer
+from apps.poems.view_buffer import drain_pending_views
 
 
 class HomeAggregatesTests(TestCase):
@@ -22,4 +44,351 @@ class HomeAggregatesTests(TestCase):
         self.assertEqual(res.data['stats']['authors_count'], 2)
         self.assertEqual(res.data['stats']['poems_count'], 3)
         self.assertEqual(len(res.data['top_poems']), 3)
-        self.assertEqual(len(res.data['top_authors']), 2)
\ No newline at end of file
+        self.assertEqual(len(res.data['top_authors']), 2)
+
+    def test_stale_home_payload_is_served_while_revalidating(self):
+        self.client.get('/api/v1/home')
+        Poem.objects.create(author=Author.objects.first(), title='Поэма 4', text='Текст')
+        cache.incr(CONTENT_VERSION_KEY)
+
+        with mock.patch('apps.poems.home._refresh_in_background') as refresh:
+            res = self.client.get('/api/v1/home')
+            self.client.get('/api/v1/home')
+        self.assertEqual(res.data['stats']['poems_count'], 3)
+        refresh.assert_called_once()
+
+    @override_settings(PUBLIC_BASE_URL='')
+    def test_photo_urls_follow_the_serving_host(self):
+        Author.objects.filter(full_name='Автор 1').update(photo='authors/a1.jpg')
+        call_command('warm_home_cache', stdout=StringIO())
+        for host in ('testserver', 'localhost'):
+            res = self.client.get('/api/v1/home', HTTP_HOST=host)
+            photos = [row['photo_url'] for row in res.data['top_authors'] if row['photo_url']]
+            self.assertEqual(photos, [f'http://{host}/media/authors/a1.jpg'])
+
+
+@override_settings(POEM_VIEWS_MODE='buffered', POEM_VIEWS_FLUSH_INTERVAL=3600)
+class BufferedViewRegisterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.cookies['shoieron_uid'] = 'reader-1'
+        author = Author.objects.create(full_name='Автор')
+        self.poem = Poem.objects.create(author=author, title='Поэма', text='Текст', views=3)
+        flusher = mock.patch.object(view_buffer, 'ensure_flusher')
+        flusher.start()
+        self.addCleanup(flusher.stop)
+
+    def test_views_are_counted_in_the_cache_deduped_and_flushed(self):
+        url = f'/api/v1/poems/{self.poem.id}/view'
+        with self.assertNumQueries(1):
+            res1 = self.client.post(url)
+        res2 = self.client.post(url)
+        self.client.cookies['shoieron_uid'] = 'reader-2'
+        self.client.post(url)
+        self.assertEqual(res1.data, {'views': 4, 'counted': True})
+        self.assertFalse(res2.data['counted'])
+        self.assertFalse(PoemView.objects.exists())
+
+        self.poem.refresh_from_db()
+        self.assertEqual(self.poem.views, 3)
+
+        consumed, counted = drain_pending_views()
+        self.assertEqual((consumed, counted), (1, 2))
+        self.poem.refresh_from_db()
+        self.assertEqual(self.poem.views, 5)
+        self.assertEqual(PoemMonthlyVisit.objects.get(poem=self.poem).visits_count, 2)
+        self.assertEqual(drain_pending_views(), (0, 0))
+
+    def test_views_counted_during_a_flush_are_kept_for_the_next_one(self):
+        other = Poem.objects.create(author=self.poem.author, title='Дигар', text='Текст')
+        view_buffer._stage(self.poem.id, date(2026, 10, 1))
+        view_buffer._stage(other.id, date(2026, 10, 1))
+        view_buffer._stage(self.poem.id, date(2026, 9, 1))
+        decr = cache.decr
+
+        def decr_after_a_new_view(key, delta):
+            if str(self.poem.id) in key and '2026-10' in key:
+                view_buffer._stage(self.poem.id, date(2026, 10, 1))
+            return decr(key, delta)
+
+        with mock.patch.object(view_buffer.cache, 'decr', side_effect=decr_after_a_new_view):
+            self.assertEqual(view_buffer.flush_pending_views(), (3, 3))
+        self.assertEqual(drain_pending_views(), (1, 1))
+        self.poem.refresh_from_db()
+        self.assertEqual(self.poem.views, 6)
+        self.assertEqual(PoemMonthlyVisit.objects.get(poem=self.poem, month_start=date(2026, 10, 1)).visits_count, 2)
+
+    def test_full_buffer_wakes_the_flusher(self):
+        self.addCleanup(view_buffer._wake.clear)
+        with override_settings(POEM_VIEWS_MAX_PENDING=2):
+            view_buffer._stage(self.poem.id, date(2026, 10, 1))
+            self.assertFalse(view_buffer._wake.is_set())
+            view_buffer._stage(self.poem.id, date(2026, 9, 1))
+        self.assertTrue(view_buffer._wake.is_set())
+
+
+class RandomSamplingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.author = author = Author.objects.create(full_name='Автор')
+        hidden_author = Author.objects.create(full_name='Скрытый', is_published=False)
+        self.p1 = Poem.objects.create(author=author, title='Поэма 1', text='Текст')
+        self.p2 = Poem.objects.create(author=author, title='Поэма 2', text='Текст')
+        Poem.objects.create(author=author, title='Черновик', text='Текст', is_published=False)
+        Poem.objects.create(author=hidden_author, title='Скрытая', text='Текст')
+
+    def test_random_only_returns_public_poems_and_honours_exclude(self):
+        for _ in range(10):
+            res = self.client.get('/api/v1/poems/random')
+            self.assertEqual(res.status_code, 200)
+            self.assertIn(res.data['id'], {self.p1.id, self.p2.id})
+
+        res = self.client.get('/api/v1/home/recommendation/next', {'exclude': self.p1.id})
+        self.assertEqual(res.data['id'], self.p2.id)
+        res = self.client.get('/api/v1/poems/random', {'exclude': f'x,-3,{self.p2.id}'})
+        self.assertEqual(res.data['id'], self.p1.id)
+        res = self.client.get('/api/v1/poems/random', {'exclude': ','.join(map(str, range(1, 302)))})
+        self.assertEqual(res.status_code, 400)
+
+    def test_short_samples_reuse_the_pool(self):
+        self.client.get('/api/v1/authors/random', {'limit': 5})
+        with mock.patch('apps.poems.sampling.author_sampler._load_ids') as load:
+            res = self.client.get('/api/v1/authors/random', {'limit': 5})
+        load.assert_not_called()
+        self.assertEqual(len(res.data), 1)
+
+    def test_id_pool_samples_distinct_ids(self):
+        pool = IdPool(range(1, 101))
+        pool.discard(50)
+        picked = pool.sample(10, exclude={1, 2, 3})
+        self.assertEqual(len(set(picked)), 10)
+        self.assertFalse({1, 2, 3, 50} & set(picked))
+
+    def test_id_pool_discard_moves_the_last_id_into_the_gap(self):
+        pool = IdPool([1, 2, 3, 4])
+        pool.discard(2)
+        pool.discard(9)
+        self.assertEqual((len(pool), 2 in pool), (3, False))
+        pool.discard(4)
+        pool.add(5)
+        pool.add(5)
+        self.assertEqual(sorted(pool.sample(10)), [1, 3, 5])
+
+    def test_other_processes_replay_changes_into_their_pool(self):
+        sampler = RandomSampler('poems', _poem_ids, _poem_visibility)
+        self.assertEqual(set(sampler.sample(10)), {self.p1.id, self.p2.id})
+        with self.captureOnCommitCallbacks(execute=True):
+            p3 = Poem.objects.create(author=self.author, title='Поэма 3', text='Текст')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.p1.delete()
+        with mock.patch.object(sampler, '_load_ids') as load:
+            self.assertEqual(set(sampler.sample(10)), {self.p2.id, p3.id})
+        load.assert_not_called()
+
+    def test_pick_evicts_only_ids_that_are_no_longer_public(self):
+        other = Author.objects.create(full_name='Другой')
+        pick_public_authors(Author.public.with_stats(), 5)
+        picked = pick_public_authors(Author.public.with_stats().exclude(pk=other.pk), 5)
+        self.assertEqual([author.id for author in picked], [self.author.id])
+        self.assertIn(other.id, author_sampler._pool)
+
+        # Raw updates send no change event; the pick notices the author is hidden now.
+        Author.objects.filter(pk=other.pk).update(is_published=False)
+        picked = pick_public_authors(Author.public.with_stats(), 5)
+        self.assertEqual([author.id for author in picked], [self.author.id])
+        self.assertNotIn(other.id, author_sampler._pool)
+
+
+class PoemTextStatsTests(TestCase):
+    def setUp(self):
+        self.author = Author.objects.create(full_name='Автор')
+        self.poem = Poem.objects.create(author=self.author, title='Шеър', text='Як\n\nДу\nСе\nЧор')
+
+    def test_stats_are_stored_on_write(self):
+        self.assertEqual(self.poem.preview, 'Як\nДу\nСе')
+        self.assertEqual((self.poem.line_count, self.poem.char_count), (4, 13))
+
+        self.poem.text = 'Як'
+        self.poem.save(update_fields=['text'])
+        self.poem.refresh_from_db()
+        self.assertEqual((self.poem.preview, self.poem.line_count, self.poem.char_count), ('Як', 1, 2))
+
+    def test_list_queries_do_not_load_text(self):
+        client = APIClient()
+        with CaptureQueriesContext(connection) as ctx:
+            res = client.get(f'/api/v1/authors/{self.author.id}/poems')
+        self.assertEqual(res.data['results'][0]['preview'], 'Як\nДу\nСе')
+        poem_selects = [q['sql'] for q in ctx.captured_queries if 'FROM "poems_poem"' in q['sql']]
+        self.assertTrue(poem_selects)
+        self.assertFalse(any('"poems_poem"."text"' in sql.split(' FROM ')[0] for sql in poem_selects))
+
+    def test_backfill_fills_unset_rows(self):
+        Poem.objects.filter(pk=self.poem.pk).update(preview='', line_count=0, char_count=0)
+        call_command('backfill_poem_text_stats', chunk_size=1, stdout=StringIO())
+        self.poem.refresh_from_db()
+        self.assertEqual((self.poem.preview, self.poem.line_count, self.poem.char_count), ('Як\nДу\nСе', 4, 13))
+
+
+class FastSerializerParityTests(TestCase):
+    def setUp(self):
+        self.request = APIRequestFactory().get('/api/v1/authors')
+        with_photo = Author.objects.create(full_name='Абулқосим Фирдавсӣ', birth_date='0940-01-01')
+        Author.objects.filter(pk=with_photo.pk).update(photo='authors/ferdowsi.jpg')
+        linked = Author.objects.create(full_name='Rudaki', photo_url='https://example.com/r.jpg')
+        Author.objects.create(full_name='Ҳофиз')
+        Poem.objects.create(author=with_photo, title='Шоҳнома', text='Як\nДу\nСе\nЧор', views=7)
+        Poem.objects.create(author=linked, title='Bui Ju-yi Mulyon', text='Line', views=3)
+
+    def render(self, data):
+        return JSONRenderer().render(data)
+
+    def test_author_rows_match_author_serializer(self):
+        qs = Author.objects.with_stats().order_by('id')
+        drf = AuthorSerializer(qs, many=True, context={'request': self.request}).data
+        fast = serialize_authors(qs.values(*AUTHOR_VALUES), self.request)
+        self.assertEqual(self.render(fast), self.render(drf))
+
+    def test_poem_rows_match_poem_serializers(self):
+        qs = Poem.objects.select_related('author').order_by('id')
+        drf = PoemListSerializer(qs, many=True).data
+        self.assertEqual(self.render(serialize_poem_list(qs.values(*POEM_LIST_VALUES))), self.render(drf))
+
+        drf = [PoemDetailSerializer(poem).data for poem in qs]
+        fast = [poem_detail_data(row) for row in qs.values(*POEM_DETAIL_VALUES)]
+        self.assertEqual(self.render(fast), self.render(drf))
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.author = Author.objects.create(full_name='Автор')
+        self.poem = Poem.objects.create(author=self.author, title='Шеър', text='Матн')
+
+    def test_poem_detail_revalidates_with_etag(self):
+        url = f'/api/v1/poems/{self.poem.id}'
+        res = self.client.get(url)
+        self.assertEqual(res.status_code, 200)
+        etag = res['ETag']
+        self.assertIn('private', res['Cache-Control'])
+
+        with CaptureQueriesContext(connection) as ctx:
+            cached = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+        Poem.objects.filter(pk=self.poem.pk).update(views=F('views') + 1)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_author_pages_revalidate_until_content_changes(self):
+        detail_url = f'/api/v1/authors/{self.author.id}'
+        etag = self.client.get(detail_url)['ETag']
+        self.assertEqual(self.client.get(detail_url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.author.full_name = 'Автори нав'
+        self.author.save()
+        self.assertEqual(self.client.get(detail_url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        poems_url = f'/api/v1/authors/{self.author.id}/poems'
+        etag = self.client.get(poems_url)['ETag']
+        self.assertEqual(self.client.get(poems_url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.poem.title = 'Шеъри нав'
+        self.poem.save()
+        self.assertEqual(self.client.get(poems_url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.author = Author.objects.create(full_name='Автор')
+        self.poem = Poem.objects.create(author=self.author, title='Шеър', text='Матн')
+
+    def test_poem_detail_is_served_from_cache_until_its_author_changes(self):
+        url = f'/api/v1/poems/{self.poem.id}'
+        self.client.get(url)
+
+        Poem.objects.filter(pk=self.poem.pk).update(views=F('views') + 3)
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(url)
+        self.assertFalse(any('"poems_poem"."text"' in q['sql'] for q in ctx.captured_queries))
+        self.assertEqual(res.data['views'], 3)
+        self.assertIn('user_flags_by_type', res.data['reactions'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.author.full_name = 'Автори нав'
+            self.author.save()
+        self.assertEqual(self.client.get(url).data['author']['full_name'], 'Автори нав')
+
+
+class PoemNeighborsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.author = Author.objects.create(full_name='Автор')
+        self.poems = [Poem.objects.create(author=self.author, title=f'Шеър {idx}', text='Матн') for idx in range(3)]
+
+    def test_neighbors_come_from_cached_index(self):
+        first, middle, last = self.poems
+        url = f'/api/v1/poems/{middle.id}/neighbors'
+        res = self.client.get(url, {'author_id': self.author.id})
+        self.assertEqual(res.data['prev']['id'], first.id)
+        self.assertEqual(res.data['next']['id'], last.id)
+        self.assertTrue(res.data['next']['url_slug'].startswith(f'{last.id}-'))
+
+        with CaptureQueriesContext(connection) as ctx:
+            batch = self.client.get('/api/v1/poems/neighbors', {
+                'author_id': self.author.id,
+                'poem_ids': f'{first.id},{last.id}',
+            })
+        self.assertEqual(len(ctx.captured_queries), 0)
+        self.assertIsNone(batch.data['results'][str(first.id)]['prev'])
+        self.assertIsNone(batch.data['results'][str(last.id)]['next'])
+
+    def test_index_is_rebuilt_when_the_author_changes(self):
+        first, middle, last = self.poems
+        self.client.get(f'/api/v1/poems/{first.id}/neighbors', {'author_id': self.author.id})
+        with self.captureOnCommitCallbacks(execute=True):
+            middle.is_published = False
+            middle.save()
+        res = self.client.get(f'/api/v1/poems/{first.id}/neighbors', {'author_id': self.author.id})
+        self.assertEqual(res.data['next']['id'], last.id)
+
+    def test_batch_rejects_malformed_and_oversized_id_lists(self):
+        url = '/api/v1/poems/neighbors'
+        res = self.client.get(url, {'author_id': self.author.id, 'poem_ids': f'²,{self.poems[0].id}'})
+        self.assertEqual(list(res.data['results']), [str(self.poems[0].id)])
+        self.assertEqual(self.client.get(url, {'author_id': '²', 'poem_ids': '1'}).status_code, 400)
+        too_many = ','.join(str(pk) for pk in range(1, 302))
+        self.assertEqual(self.client.get(url, {'author_id': self.author.id, 'poem_ids': too_many}).status_code, 400)
+
+
+class PageBundleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.author = Author.objects.create(full_name='Автор')
+        self.first = Poem.objects.create(author=self.author, title='Якум', text='Матн')
+        self.second = Poem.objects.create(author=self.author, title='Дуюм', text='Матн')
+
+    def test_poem_page_bundles_detail_author_and_neighbors(self):
+        res = self.client.get(f'/api/v1/poems/{self.second.id}/page', {'register_view': '1'})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data['poem']['text'], 'Матн')
+        self.assertIn('counts_by_type', res.data['poem']['reactions'])
+        self.assertEqual(res.data['author']['id'], self.author.id)
+        self.assertEqual(res.data['neighbors']['prev']['id'], self.first.id)
+        self.assertEqual(res.data['view'], {'views': 1, 'counted': True})
+        self.assertEqual(res.data['poem']['views'], 1)
+
+        hidden = Poem.objects.create(author=self.author, title='Пинҳон', text='Матн', is_published=False)
+        self.assertEqual(self.client.get(f'/api/v1/poems/{hidden.id}/page').status_code, 404)
+
+    def test_author_page_bundles_author_poems_and_stats(self):
+        res = self.client.get(f'/api/v1/authors/{self.author.id}/page', {'page_size': 1})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data['author']['id'], self.author.id)
+        self.assertEqual(res.data['poems']['count'], 2)
+        self.assertEqual([row['id'] for row in res.data['poems']['results']], [self.first.id])
+        self.assertEqual(res.data['stats']['poems_count'], 2)
+        self.assertEqual(res.data['other_authors'], [])
@@ -5,7 +5,9 @@ from .views import (
     HomeRecommendationView,
     HomeView,
     PoemDetailView,
+    PoemNeighborsBatchView,
     PoemNeighborsView,
+    PoemPageView,
     PoemRandomView,
     PoemViewRegister,
     StatsView,
@@ -16,8 +18,10 @@ urlpatterns = [
     path('stats', StatsView.as_view(), name='stats'),
     path('home', HomeView.as_view(), name='home'),
     path('home/recommendation/next', HomeRecommendationView.as_view(), name='home-recommendation'),
+    path('poems/neighbors', PoemNeighborsBatchView.as_view(), name='poems-neighbors-batch'),
     path('poems/random', PoemRandomView.as_view(), name='poems-random'),
     path('poems/<int:pk>', PoemDetailView.as_view(), name='poems-detail'),
+    path('poems/<int:pk>/page', PoemPageView.as_view(), name='poems-page'),
     path('poems/<int:pk>/view', PoemViewRegister.as_view(), name='poems-view'),
     path('poems/<int:pk>/neighbors', PoemNeighborsView.as_view(), name='poems-neighbors'),
 ]
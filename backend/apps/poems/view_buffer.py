@@ -0,0 +1,230 @@
+import logging
+import threading
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+
+from .models import Poem
+
+
+logger = logging.getLogger(__name__)
+
+FLUSH_SQL = """
+WITH deltas AS (
+    SELECT batch.poem_id, batch.month_start, batch.delta
+    FROM unnest(%s::bigint[], %s::date[], %s::bigint[]) AS batch(poem_id, month_start, delta)
+    JOIN poems_poem AS p ON p.id = batch.poem_id
+),
+bumped AS (
+    UPDATE poems_poem AS p
+    SET views = p.views + d.delta
+    FROM (SELECT poem_id, SUM(delta) AS delta FROM deltas GROUP BY poem_id) AS d
+    WHERE p.id = d.poem_id
+    RETURNING p.id
+),
+author_bumped AS (
+    UPDATE authors_authorstats AS s
+    SET popularity = s.popularity + a.delta,
+        updated_at = now()
+    FROM (
+        SELECT p.author_id, SUM(d.delta) AS delta
+        FROM deltas AS d
+        JOIN poems_poem AS p ON p.id = d.poem_id
+        WHERE p.is_public
+        GROUP BY p.author_id
+    ) AS a
+    WHERE s.author_id = a.author_id
+    RETURNING s.author_id
+),
+monthly AS (
+    INSERT INTO poems_poemmonthlyvisit (poem_id, month_start, visits_count, created_at, updated_at)
+    SELECT poem_id, month_start, delta, now(), now()
+    FROM deltas
+    ON CONFLICT (poem_id, month_start) DO UPDATE
+    SET visits_count = poems_poemmonthlyvisit.visits_count + EXCLUDED.visits_count,
+        updated_at = EXCLUDED.updated_at
+    RETURNING poem_id
+)
+SELECT COALESCE(SUM(delta), 0) FROM deltas
+"""
+
+# Views are counted per poem and month under ``_count_key``. The first pending view of a
+# counter appends it to a ring of dirty slots (``HEAD`` is the last slot written, ``TAIL``
+# the last one flushed), so a flush reads only the counters that moved.
+PENDING_PREFIX = 'poem_views:pending'
+DIRTY_HEAD_KEY = f'{PENDING_PREFIX}:head'
+DIRTY_TAIL_KEY = f'{PENDING_PREFIX}:tail'
+FLUSH_LOCK_KEY = f'{PENDING_PREFIX}:flushing'
+FLUSH_LOCK_TTL = 60
+
+_flusher_lock = threading.Lock()
+_flusher_thread = None
+_wake = threading.Event()
+_stalled_slot = None
+
+
+def is_buffered_mode():
+    return settings.POEM_VIEWS_MODE == 'buffered'
+
+
+def _dedupe_key(poem_id, user_hash, day):
+    return f'poem_view:{poem_id}:{user_hash}:{day.isoformat()}'
+
+
+def _count_key(poem_id, month_start):
+    return f'{PENDING_PREFIX}:{poem_id}:{month_start.isoformat()}'
+
+
+def _slot_key(slot):
+    return f'{PENDING_PREFIX}:slot:{slot}'
+
+
+def _seconds_until_day_end(now):
+    day_end = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), tzinfo=now.tzinfo)
+    return max(1, int((day_end - now).total_seconds()))
+
+
+def _incr(key, delta=1):
+    cache.add(key, 0, None)
+    try:
+        return cache.incr(key, delta)
+    except ValueError:
+        # Evicted between the add and the incr.
+        cache.add(key, delta, None)
+        return delta
+
+
+def _mark_dirty(poem_id, month_start):
+    slot = _incr(DIRTY_HEAD_KEY)
+    cache.set(_slot_key(slot), (poem_id, month_start), None)
+    if slot - (cache.get(DIRTY_TAIL_KEY) or 0) >= settings.POEM_VIEWS_MAX_PENDING:
+        _wake.set()
+
+
+def _stage(poem_id, month_start, count=1):
+    if _incr(_count_key(poem_id, month_start), count) == count:
+        _mark_dirty(poem_id, month_start)
+
+
+def record_view(poem_id, user_hash):
+    """Count a view in the shared cache for the flusher; returns (views, counted) or None if the poem is not public."""
+    views = Poem.public.filter(pk=poem_id).values_list('views', flat=True).first()
+    if views is None:
+        return None
+
+    now = timezone.now()
+    today = now.date()
+    counted = cache.add(_dedupe_key(poem_id, user_hash, today), 1, _seconds_until_day_end(now))
+    if counted:
+        _stage(poem_id, date(today.year, today.month, 1))
+        ensure_flusher()
+    return views + int(counted), counted
+
+
+def _take_dirty(tail, batch_size):
+    """Read up to ``batch_size`` dirty slots after ``tail``; returns (last slot read, counters)."""
+    global _stalled_slot
+    upto = min(cache.get(DIRTY_HEAD_KEY) or 0, tail + batch_size)
+    slots = cache.get_many([_slot_key(slot) for slot in range(tail + 1, upto + 1)])
+    reached = tail
+    counters = {}
+    for slot in range(tail + 1, upto + 1):
+        entry = slots.get(_slot_key(slot))
+        if entry is None:
+            # Its writer is between bumping the head and writing the slot. A slot still
+            # missing on the next flush lost its writer and is skipped.
+            if slot != _stalled_slot:
+                _stalled_slot = slot
+                break
+        else:
+            counters[_count_key(*entry)] = entry
+        reached = slot
+    return reached, counters
+
+
+def flush_pending_views(batch_size=None):
+    """Apply one batch of counted views; returns (dirty slots consumed, views counted)."""
+    batch_size = batch_size or settings.POEM_VIEWS_FLUSH_BATCH
+    if not cache.add(FLUSH_LOCK_KEY, 1, FLUSH_LOCK_TTL):
+        return 0, 0
+    try:
+        tail = cache.get(DIRTY_TAIL_KEY) or 0
+        reached, counters = _take_dirty(tail, batch_size)
+        if reached == tail:
+            return 0, 0
+
+        claimed = Counter()
+        for key, count in cache.get_many(list(counters)).items():
+            if not count:
+                continue
+            try:
+                left = cache.decr(key, count)
+            except ValueError:
+                continue
+            # Views counted after the read stay behind; the counter is re-marked so they are not stranded.
+            if left > 0:
+                _mark_dirty(*counters[key])
+            claimed[counters[key]] += count
+        cache.set(DIRTY_TAIL_KEY, reached, None)
+        cache.delete_many([_slot_key(slot) for slot in range(tail + 1, reached + 1)])
+
+        batch = sorted(claimed.items())
+        try:
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    cursor.execute(FLUSH_SQL, [
+                        [poem_id for (poem_id, _), _ in batch],
+                        [month_start for (_, month_start), _ in batch],
+                        [count for _, count in batch],
+                    ])
+                    counted = cursor.fetchone()[0]
+        except Exception:
+            for (poem_id, month_start), count in batch:
+                _stage(poem_id, month_start, count)
+            raise
+        return reached - tail, int(counted)
+    finally:
+        cache.delete(FLUSH_LOCK_KEY)
+
+
+def drain_pending_views(batch_size=None):
+    total_consumed = 0
+    total_counted = 0
+    while True:
+        consumed, counted = flush_pending_views(batch_size)
+        total_consumed += consumed
+        total_counted += counted
+        if not consumed:
+            return total_consumed, total_counted
+
+
+def _flusher_loop(interval):
+    while True:
+        # A full dirty ring wakes the flusher early.
+        _wake.wait(interval)
+        _wake.clear()
+        close_old_connections()
+        try:
+            drain_pending_views()
+        except Exception:
+            logger.exception('Failed to flush pending poem views')
+
+
+def ensure_flusher():
+    global _flusher_thread
+    if _flusher_thread is not None and _flusher_thread.is_alive():
+        return
+    with _flusher_lock:
+        if _flusher_thread is not None and _flusher_thread.is_alive():
+            return
+        _flusher_thread = threading.Thread(
+            target=_flusher_loop,
+            args=(settings.POEM_VIEWS_FLUSH_INTERVAL,),
+            name='poem-views-flusher',
+            daemon=True,
+        )
+        _flusher_thread.start()
@@ -1,25 +1,25 @@
-from datetime import date
-
-from django.core.cache import cache
-from django.db import IntegrityError, transaction
-from django.db.models import Count, F, Q, Sum
-from django.db.models.functions import Coalesce
-from django.shortcuts import get_object_or_404
-from django.utils import timezone
+from django.http import Http404
 from rest_framework.generics import RetrieveAPIView
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from config.conditional import latest, make_etag, not_modified, with_validators
 from config.throttling import ViewRateThrottle
-from config.utils import get_user_hash
+from config.utils import get_user_hash, parse_ids
 from apps.authors.models import Author
-from apps.authors.serializers import AuthorSerializer
+from apps.authors.serializers import AUTHOR_VALUES, author_data
 from apps.reactions.utils import get_reaction_counts, get_user_flags
-from .models import Poem, PoemMonthlyVisit, PoemView
-from .serializers import PoemDetailSerializer, PoemListSerializer
+from .home import get_home_payload
+from .models import Poem
+from .neighbors import get_author_poem_index
+from .response_cache import author_dep, cached_data, poem_dep
+from .sampling import pick_public_poems
+from .serializers import POEM_DETAIL_VALUES, PoemDetailSerializer, PoemListSerializer, poem_detail_data
+from .stats import register_view, site_stats
 
 
-HERO_TEXT = 'Портали асарҳои шоирони классикӣ ва муосири форсу-тоҷик.'
+NEIGHBORS_BATCH_MAX_POEMS = 300
+RANDOM_MAX_EXCLUDED = 300
 
 
 class HealthView(APIView):
@@ -29,163 +29,146 @@ class HealthView(APIView):
 
 class StatsView(APIView):
     def get(self, request):
-        return Response({
-            'authors_count': Author.objects.filter(deleted_at__isnull=True, is_published=True).count(),
-            'poems_count': Poem.objects.filter(
-                deleted_at__isnull=True,
-                is_published=True,
-                author__deleted_at__isnull=True,
-                author__is_published=True,
-            ).count(),
-        })
+        return Response(site_stats(request))
 
 
 class HomeView(APIView):
     def get(self, request):
-        cached = cache.get('home_payload')
-        if cached:
-            return Response(cached)
-
-        top_poems = Poem.objects.filter(
-            deleted_at__isnull=True,
-            is_published=True,
-            author__deleted_at__isnull=True,
-            author__is_published=True,
-        ).select_related('author').order_by('-views')[:5]
-        top_authors = Author.objects.filter(deleted_at__isnull=True, is_published=True).annotate(
-            poems_count=Count(
-                'poems',
-                filter=Q(poems__deleted_at__isnull=True, poems__is_published=True),
-                distinct=True,
-            ),
-            popularity=Coalesce(
-                Sum('poems__views', filter=Q(poems__deleted_at__isnull=True, poems__is_published=True)),
-                0,
-            ),
-        ).order_by('-popularity')[:5]
-
-        payload = {
-            'hero_text': HERO_TEXT,
-            'stats': {
-                'authors_count': Author.objects.filter(deleted_at__isnull=True, is_published=True).count(),
-                'poems_count': Poem.objects.filter(
-                    deleted_at__isnull=True,
-                    is_published=True,
-                    author__deleted_at__isnull=True,
-                    author__is_published=True,
-                ).count(),
-            },
-            'top_poems': PoemListSerializer(top_poems, many=True, context={'request': request}).data,
-            'top_authors': AuthorSerializer(top_authors, many=True, context={'request': request}).data,
-        }
-        cache.set('home_payload', payload, 60)
-        return Response(payload)
+        return Response(get_home_payload(request))
+
+
+def _random_poem_response(request):
+    exclude = parse_ids(request.query_params.get('exclude', ''))
+    if len(exclude) > RANDOM_MAX_EXCLUDED:
+        return Response({'detail': f'Too many exclude ids (max {RANDOM_MAX_EXCLUDED})'}, status=400)
+    poems = pick_public_poems(1, exclude=exclude, user_hash=get_user_hash(request))
+    if not poems:
+        return Response({'detail': 'No poems'}, status=404)
+    return Response(PoemListSerializer(poems[0], context={'request': request}).data)
 
 
 class HomeRecommendationView(APIView):
     def get(self, request):
-        poem = Poem.objects.filter(
-            deleted_at__isnull=True,
-            is_published=True,
-            author__deleted_at__isnull=True,
-            author__is_published=True,
-        ).select_related('author').order_by('?').first()
-        if not poem:
-            return Response({'detail': 'No poems'}, status=404)
-        return Response(PoemListSerializer(poem, context={'request': request}).data)
+        return _random_poem_response(request)
 
 
 class PoemRandomView(APIView):
     def get(self, request):
-        poem = Poem.objects.filter(
-            deleted_at__isnull=True,
-            is_published=True,
-            author__deleted_at__isnull=True,
-            author__is_published=True,
-        ).select_related('author').order_by('?').first()
-        if not poem:
-            return Response({'detail': 'No poems'}, status=404)
-        return Response(PoemListSerializer(poem, context={'request': request}).data)
+        return _random_poem_response(request)
+
+
+def build_poem_detail(pk):
+    """Shared (cacheable) part of a poem detail body and its extra cache dependencies."""
+    row = Poem.public.filter(pk=pk).values(*POEM_DETAIL_VALUES).first()
+    if row is None:
+        raise Http404
+    return poem_detail_data(row), [author_dep(row['author_id'])]
+
+
+# Everything a poem detail body depends on, read with one primary-key lookup.
+POEM_VALIDATOR_VALUES = ('updated_at', 'views', 'author__updated_at', 'reaction_counts__updated_at')
 
 
 class PoemDetailView(RetrieveAPIView):
     serializer_class = PoemDetailSerializer
-    queryset = Poem.objects.filter(
-        deleted_at__isnull=True,
-        is_published=True,
-        author__deleted_at__isnull=True,
-        author__is_published=True,
-    ).select_related('author')
+    queryset = Poem.public.select_related('author')
 
     def retrieve(self, request, *args, **kwargs):
-        instance = self.get_object()
-        data = self.get_serializer(instance).data
+        meta = Poem.public.filter(pk=kwargs['pk']).values(*POEM_VALIDATOR_VALUES).first()
+        if meta is None:
+            raise Http404
         user_hash = get_user_hash(request)
-        data['reactions'] = {
-            'counts_by_type': get_reaction_counts(instance.id),
-            'user_flags_by_type': get_user_flags(instance.id, user_hash),
-        }
-        return Response(data)
+        # Flags are per visitor, so the visitor is part of the tag and shared caches are kept out.
+        etag = make_etag(kwargs['pk'], user_hash, *(meta[key] for key in POEM_VALIDATOR_VALUES))
+        last_modified = latest(meta['updated_at'], meta['author__updated_at'], meta['reaction_counts__updated_at'])
+        response = not_modified(request, etag, last_modified)
+        if response is None:
+            data = dict(cached_data(request, lambda: build_poem_detail(kwargs['pk']), deps=[poem_dep(kwargs['pk'])]))
+            # Counters and per-visitor state are merged after the cache so entries stay shared.
+            data['views'] = meta['views']
+            data['reactions'] = {
+                'counts_by_type': get_reaction_counts(data['id']),
+                'user_flags_by_type': get_user_flags(data['id'], user_hash),
+            }
+            response = Response(data)
+        return with_validators(response, etag, last_modified, private=True, no_cache=True)
 
 
 class PoemViewRegister(APIView):
     throttle_classes = [ViewRateThrottle]
 
     def post(self, request, pk):
-        poem = get_object_or_404(
-            Poem,
-            pk=pk,
-            deleted_at__isnull=True,
-            is_published=True,
-            author__deleted_at__isnull=True,
-            author__is_published=True,
-        )
+        recorded = register_view(pk, get_user_hash(request))
+        if recorded is None:
+            raise Http404
+        views, counted = recorded
+        return Response({'views': views, 'counted': counted})
+
+
+class PoemPageView(APIView):
+    """Poem detail, reactions, author summary and prev/next in one response.
+
+    ``?register_view=1`` also counts the visit, subject to the view throttle.
+    """
+
+    def get(self, request, pk):
+        meta = Poem.public.filter(pk=pk).values('author_id', *POEM_VALIDATOR_VALUES).first()
+        if meta is None:
+            raise Http404
         user_hash = get_user_hash(request)
-        today = timezone.now().date()
-        month_start = date(today.year, today.month, 1)
 
-        created = False
-        with transaction.atomic():
-            try:
-                PoemView.objects.create(poem=poem, user_hash=user_hash, viewed_date=today)
-                created = True
-            except IntegrityError:
-                created = False
+        def build():
+            poem, _ = build_poem_detail(pk)
+            author = Author.objects.with_stats().filter(pk=meta['author_id']).values(*AUTHOR_VALUES).first()
+            index = get_author_poem_index(meta['author_id'])
+            return {
+                'poem': poem,
+                'author': author_data(author, request) if author else None,
+                'neighbors': index.neighbors(pk) if index else {'prev': None, 'next': None},
+            }, [author_dep(meta['author_id'])]
+
+        data = dict(cached_data(request, build, deps=[poem_dep(pk)], name=f'poem-page:{pk}'))
+        poem = data['poem'] = dict(data['poem'])
+        poem['views'] = meta['views']
+        poem['reactions'] = {
+            'counts_by_type': get_reaction_counts(pk),
+            'user_flags_by_type': get_user_flags(pk, user_hash),
+        }
+        if request.query_params.get('register_view') == '1' and ViewRateThrottle().allow_request(request, self):
+            recorded = register_view(pk, user_hash)
+            if recorded is not None:
+                poem['views'], counted = recorded
+                data['view'] = {'views': poem['views'], 'counted': counted}
+        return Response(data)
 
-            if created:
-                Poem.objects.filter(pk=poem.pk).update(views=F('views') + 1)
-                monthly, _ = PoemMonthlyVisit.objects.get_or_create(poem=poem, month_start=month_start)
-                PoemMonthlyVisit.objects.filter(pk=monthly.pk).update(visits_count=F('visits_count') + 1)
 
-        poem.refresh_from_db(fields=['views'])
-        return Response({'views': poem.views, 'counted': created})
+def _author_index(request):
+    try:
+        author_id = int(request.query_params.get('author_id', ''))
+    except ValueError:
+        return None, Response({'detail': 'author_id required'}, status=400)
+    index = get_author_poem_index(author_id)
+    if index is None:
+        raise Http404
+    return index, None
 
 
 class PoemNeighborsView(APIView):
     def get(self, request, pk):
-        author_id = request.query_params.get('author_id')
-        if not author_id:
-            return Response({'detail': 'author_id required'}, status=400)
-        get_object_or_404(Author, pk=author_id, deleted_at__isnull=True, is_published=True)
-
-        visible_filters = {
-            'author_id': author_id,
-            'deleted_at__isnull': True,
-            'is_published': True,
-            'author__deleted_at__isnull': True,
-            'author__is_published': True,
-        }
-        prev_poem = Poem.objects.filter(**visible_filters, id__lt=pk).order_by('-id').first()
-        next_poem = Poem.objects.filter(**visible_filters, id__gt=pk).order_by('id').first()
+        index, error = _author_index(request)
+        if error:
+            return error
+        return Response(index.neighbors(pk))
 
-        def minimal(poem):
-            if not poem:
-                return None
-            data = PoemListSerializer(poem, context={'request': request}).data
-            return {
-                'id': data['id'],
-                'title': data['title'],
-                'url_slug': data['url_slug'],
-            }
 
-        return Response({'prev': minimal(prev_poem), 'next': minimal(next_poem)})
+class PoemNeighborsBatchView(APIView):
+    def get(self, request):
+        index, error = _author_index(request)
+        if error:
+            return error
+        poem_ids = parse_ids(request.query_params.get('poem_ids', ''))
+        if not poem_ids:
+            return Response({'detail': 'poem_ids required'}, status=400)
+        if len(poem_ids) > NEIGHBORS_BATCH_MAX_POEMS:
+            return Response({'detail': f'Too many poem_ids (max {NEIGHBORS_BATCH_MAX_POEMS})'}, status=400)
+        return Response({'results': {str(pk): index.neighbors(pk) for pk in poem_ids}})
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Reaction
+from .models import PoemReactionCounts, Reaction
 
 
 @admin.register(Reaction)
@@ -8,3 +8,8 @@ class ReactionAdmin(admin.ModelAdmin):
     list_display = ('id', 'poem', 'type', 'user_hash', 'created_at')
     list_filter = ('type',)
     search_fields = ('user_hash',)
+
+
+@admin.register(PoemReactionCounts)
+class PoemReactionCountsAdmin(admin.ModelAdmin):
+    list_display = ('poem', 'heart_count', 'fire_count', 'like_count', 'sad_count', 'star_count', 'updated_at')
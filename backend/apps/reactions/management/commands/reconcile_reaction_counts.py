@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from apps.poems.models import Poem
+from apps.reactions.utils import refresh_reaction_counts
+
+
+class Command(BaseCommand):
+    help = 'Rebuild per-poem reaction counters from Reaction rows in chunks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500, help='Poems recomputed per statement')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        last_id = 0
+        total = 0
+        while True:
+            ids = list(Poem.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:chunk_size])
+            if not ids:
+                break
+            refresh_reaction_counts(ids)
+            total += len(ids)
+            last_id = ids[-1]
+        self.stdout.write(self.style.SUCCESS(f'Reconciled reaction counts for {total} poems.'))
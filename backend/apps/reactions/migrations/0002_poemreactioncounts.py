@@ -0,0 +1,43 @@
+# Generated by Django 5.0.8 on 2026-10-17 11:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poems', '0005_poem_text_stats'),
+        ('reactions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PoemReactionCounts',
+            fields=[
+                ('poem', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='reaction_counts', serialize=False, to='poems.poem')),
+                ('heart_count', models.PositiveIntegerField(default=0)),
+                ('fire_count', models.PositiveIntegerField(default=0)),
+                ('like_count', models.PositiveIntegerField(default=0)),
+                ('sad_count', models.PositiveIntegerField(default=0)),
+                ('star_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunSQL(
+            sql="""
+                INSERT INTO reactions_poemreactioncounts
+                    (poem_id, heart_count, fire_count, like_count, sad_count, star_count, updated_at)
+                SELECT poem_id,
+                       COUNT(*) FILTER (WHERE type = 'heart'),
+                       COUNT(*) FILTER (WHERE type = 'fire'),
+                       COUNT(*) FILTER (WHERE type = 'like'),
+                       COUNT(*) FILTER (WHERE type = 'sad'),
+                       COUNT(*) FILTER (WHERE type = 'star'),
+                       now()
+                FROM reactions_reaction
+                GROUP BY poem_id
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
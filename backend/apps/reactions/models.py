@@ -30,3 +30,18 @@ class Reaction(models.Model):
 
     def __str__(self):
         return f'{self.type} on {self.poem_id}'
+
+
+class PoemReactionCounts(models.Model):
+    """Per-poem reaction totals kept in step with ``Reaction`` by the toggle."""
+
+    poem = models.OneToOneField(Poem, primary_key=True, related_name='reaction_counts', on_delete=models.CASCADE)
+    heart_count = models.PositiveIntegerField(default=0)
+    fire_count = models.PositiveIntegerField(default=0)
+    like_count = models.PositiveIntegerField(default=0)
+    sad_count = models.PositiveIntegerField(default=0)
+    star_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'Reaction counts for {self.poem_id}'
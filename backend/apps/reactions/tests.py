@@ -1,11 +1,16 @@
+import threading
 import uuid
+from io import StringIO
 
-from django.test import TestCase
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
 from rest_framework.test import APIClient
 
 from apps.authors.models import Author
 from apps.poems.models import Poem
-from apps.reactions.models import Reaction
+from apps.reactions.models import PoemReactionCounts, Reaction
+from apps.reactions.utils import toggle_reaction
 
 
 class ReactionToggleTests(TestCase):
@@ -43,3 +48,89 @@ class ReactionToggleTests(TestCase):
         self.assertEqual(Reaction.objects.count(), 1)
         self.assertTrue(res2.data['user_flags_by_type'][Reaction.TYPE_FIRE])
         self.assertFalse(res2.data['user_flags_by_type'][Reaction.TYPE_HEART])
+
+    def test_counters_follow_toggles_and_reconcile(self):
+        url = '/api/v1/reactions/toggle'
+        self.client.post(url, {'poem_id': self.poem.id, 'type': Reaction.TYPE_HEART}, format='json')
+        res = self.client.post(url, {'poem_id': self.poem.id, 'type': Reaction.TYPE_FIRE}, format='json')
+        self.assertEqual(res.data['counts_by_type'][Reaction.TYPE_HEART], 0)
+        self.assertEqual(res.data['counts_by_type'][Reaction.TYPE_FIRE], 1)
+        counts = PoemReactionCounts.objects.get(pk=self.poem.id)
+        self.assertEqual((counts.heart_count, counts.fire_count), (0, 1))
+
+        PoemReactionCounts.objects.filter(pk=self.poem.id).update(fire_count=7, sad_count=3)
+        call_command('reconcile_reaction_counts', chunk_size=1, stdout=StringIO())
+        counts.refresh_from_db()
+        self.assertEqual((counts.fire_count, counts.sad_count), (1, 0))
+
+    def test_batch_returns_counts_and_flags_for_public_poems(self):
+        other = Poem.objects.create(author=self.author, title='Дигар', text='Сатр')
+        hidden = Poem.objects.create(author=self.author, title='Пинҳон', text='Сатр', is_published=False)
+        self.client.post('/api/v1/reactions/toggle', {'poem_id': self.poem.id, 'type': Reaction.TYPE_STAR}, format='json')
+
+        res = self.client.get('/api/v1/reactions', {'poem_ids': f'{self.poem.id},{other.id},{hidden.id}'})
+        self.assertEqual(res.status_code, 200)
+        results = res.data['results']
+        self.assertEqual(set(results), {str(self.poem.id), str(other.id)})
+        self.assertEqual(results[str(self.poem.id)]['counts_by_type'][Reaction.TYPE_STAR], 1)
+        self.assertTrue(results[str(self.poem.id)]['user_flags_by_type'][Reaction.TYPE_STAR])
+        self.assertEqual(sum(results[str(other.id)]['counts_by_type'].values()), 0)
+
+        self.assertEqual(self.client.get('/api/v1/reactions').status_code, 400)
+        res = self.client.get('/api/v1/reactions', {'poem_ids': f'²,{self.poem.id}'})
+        self.assertEqual(set(res.data['results']), {str(self.poem.id)})
+
+
+class ConcurrentToggleTests(TransactionTestCase):
+    def setUp(self):
+        author = Author.objects.create(full_name='Тестовый Автор')
+        self.poem = Poem.objects.create(author=author, title='Тест', text='Строка')
+
+    def run_concurrently(self, calls):
+        barrier = threading.Barrier(len(calls))
+        errors = []
+
+        def worker(reaction_type, user_hash):
+            try:
+                barrier.wait()
+                toggle_reaction(self.poem.id, reaction_type, user_hash)
+            except Exception as exc:  # surfaced below; a thread cannot fail the test directly
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=call) for call in calls]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+    def assert_counters_match_rows(self):
+        counts = PoemReactionCounts.objects.get(pk=self.poem.id)
+        for rtype, _label in Reaction.TYPE_CHOICES:
+            actual = Reaction.objects.filter(poem=self.poem, type=rtype).count()
+            self.assertEqual(getattr(counts, f'{rtype}_count'), actual, rtype)
+
+    def test_double_clicks_from_one_visitor_toggle_in_turn(self):
+        self.run_concurrently([(Reaction.TYPE_HEART, 'same-visitor')] * 6)
+        self.assertEqual(Reaction.objects.filter(user_hash='same-visitor').count(), 0)
+        self.assert_counters_match_rows()
+
+        self.run_concurrently([(Reaction.TYPE_HEART, 'same-visitor')] * 5)
+        self.assertEqual(Reaction.objects.filter(user_hash='same-visitor').count(), 1)
+        self.assert_counters_match_rows()
+
+    def test_mixed_types_and_visitors_keep_counters_exact(self):
+        types = [Reaction.TYPE_HEART, Reaction.TYPE_FIRE, Reaction.TYPE_STAR]
+        calls = [(types[idx % 3], f'visitor-{idx % 4}') for idx in range(16)]
+        self.run_concurrently(calls)
+        for idx in range(4):
+            self.assertLessEqual(Reaction.objects.filter(user_hash=f'visitor-{idx}').count(), 1)
+        self.assert_counters_match_rows()
+
+    def test_hidden_poem_is_not_toggled(self):
+        self.poem.is_published = False
+        self.poem.save()
+        self.assertIsNone(toggle_reaction(self.poem.id, Reaction.TYPE_HEART, 'visitor'))
+        self.assertFalse(Reaction.objects.exists())
@@ -1,7 +1,8 @@
 from django.urls import path
 
-from .views import ReactionToggleView
+from .views import ReactionBatchView, ReactionToggleView
 
 urlpatterns = [
+    path('reactions', ReactionBatchView.as_view(), name='reactions-batch'),
     path('reactions/toggle', ReactionToggleView.as_view(), name='reactions-toggle'),
 ]
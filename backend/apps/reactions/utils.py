@@ -1,17 +1,126 @@
-from django.db.models import Count
+from django.db import connection, transaction
 
-from .models import Reaction
+from apps.poems.models import Poem
+from .models import PoemReactionCounts, Reaction
 
 
 REACTION_TYPES = [r[0] for r in Reaction.TYPE_CHOICES]
+COUNT_FIELDS = {rtype: f'{rtype}_count' for rtype in REACTION_TYPES}
+
+REFRESH_SQL = """
+INSERT INTO reactions_poemreactioncounts
+    (poem_id, heart_count, fire_count, like_count, sad_count, star_count, updated_at)
+SELECT p.id,
+       COUNT(r.id) FILTER (WHERE r.type = 'heart'),
+       COUNT(r.id) FILTER (WHERE r.type = 'fire'),
+       COUNT(r.id) FILTER (WHERE r.type = 'like'),
+       COUNT(r.id) FILTER (WHERE r.type = 'sad'),
+       COUNT(r.id) FILTER (WHERE r.type = 'star'),
+       now()
+FROM poems_poem AS p
+LEFT JOIN reactions_reaction AS r ON r.poem_id = p.id
+WHERE p.id = ANY(%s)
+GROUP BY p.id
+ON CONFLICT (poem_id) DO UPDATE
+SET heart_count = EXCLUDED.heart_count,
+    fire_count = EXCLUDED.fire_count,
+    like_count = EXCLUDED.like_count,
+    sad_count = EXCLUDED.sad_count,
+    star_count = EXCLUDED.star_count,
+    updated_at = EXCLUDED.updated_at
+"""
+
+
+# Serializes toggles of one visitor on one poem, so a double click toggles twice
+# instead of racing on the unique constraint.
+TOGGLE_LOCK_SQL = "SELECT pg_advisory_xact_lock(hashtextextended(%s || ':' || %s::text, 0))"
+
+# Removes the visitor's reactions on the poem, adds the requested type unless it was
+# just removed, and applies the resulting deltas to the counters row in one statement.
+# Nothing is written when the poem is not public.
+TOGGLE_SQL = """
+WITH target AS (
+    SELECT id FROM poems_poem WHERE id = %(poem_id)s AND is_public
+),
+removed AS (
+    DELETE FROM reactions_reaction AS r
+    USING target
+    WHERE r.poem_id = target.id AND r.user_hash = %(user_hash)s
+    RETURNING r.type
+),
+added AS (
+    INSERT INTO reactions_reaction (poem_id, type, user_hash, created_at)
+    SELECT id, %(type)s, %(user_hash)s, now()
+    FROM target
+    WHERE NOT EXISTS (SELECT 1 FROM removed WHERE type = %(type)s)
+    ON CONFLICT (poem_id, type, user_hash) DO NOTHING
+    RETURNING type
+),
+deltas AS (
+    SELECT COALESCE(SUM(delta) FILTER (WHERE type = 'heart'), 0) AS heart,
+           COALESCE(SUM(delta) FILTER (WHERE type = 'fire'), 0) AS fire,
+           COALESCE(SUM(delta) FILTER (WHERE type = 'like'), 0) AS "like",
+           COALESCE(SUM(delta) FILTER (WHERE type = 'sad'), 0) AS sad,
+           COALESCE(SUM(delta) FILTER (WHERE type = 'star'), 0) AS star
+    FROM (
+        SELECT type, -1 AS delta FROM removed
+        UNION ALL
+        SELECT type, 1 AS delta FROM added
+    ) AS changes
+),
+counts AS (
+    INSERT INTO reactions_poemreactioncounts AS c
+        (poem_id, heart_count, fire_count, like_count, sad_count, star_count, updated_at)
+    SELECT target.id,
+           GREATEST(d.heart, 0), GREATEST(d.fire, 0), GREATEST(d."like", 0),
+           GREATEST(d.sad, 0), GREATEST(d.star, 0), now()
+    FROM target CROSS JOIN deltas AS d
+    ON CONFLICT (poem_id) DO UPDATE
+    SET heart_count = GREATEST(c.heart_count + (SELECT heart FROM deltas), 0),
+        fire_count = GREATEST(c.fire_count + (SELECT fire FROM deltas), 0),
+        like_count = GREATEST(c.like_count + (SELECT "like" FROM deltas), 0),
+        sad_count = GREATEST(c.sad_count + (SELECT sad FROM deltas), 0),
+        star_count = GREATEST(c.star_count + (SELECT star FROM deltas), 0),
+        updated_at = EXCLUDED.updated_at
+    RETURNING heart_count, fire_count, like_count, sad_count, star_count
+)
+SELECT counts.*, (SELECT type FROM added LIMIT 1)
+FROM counts
+"""
+
+
+def toggle_reaction(poem_id, reaction_type, user_hash):
+    """Toggle ``reaction_type`` for the visitor; returns ``(counts, flags)`` or None if the poem is not public."""
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(TOGGLE_LOCK_SQL, [user_hash, poem_id])
+        cursor.execute(TOGGLE_SQL, {'poem_id': poem_id, 'type': reaction_type, 'user_hash': user_hash})
+        row = cursor.fetchone()
+    if row is None:
+        return None
+    counts = dict(zip(REACTION_TYPES, row[:len(REACTION_TYPES)]))
+    flags = {key: key == row[-1] for key in REACTION_TYPES}
+    return counts, flags
+
+
+def counts_from_row(row):
+    if row is None:
+        return {key: 0 for key in REACTION_TYPES}
+    return {rtype: row[field] for rtype, field in COUNT_FIELDS.items()}
 
 
 def get_reaction_counts(poem_id):
-    counts = {key: 0 for key in REACTION_TYPES}
-    rows = Reaction.objects.filter(poem_id=poem_id).values('type').annotate(c=Count('id'))
-    for row in rows:
-        counts[row['type']] = row['c']
-    return counts
+    row = PoemReactionCounts.objects.filter(pk=poem_id).values(*COUNT_FIELDS.values()).first()
+    return counts_from_row(row)
+
+
+def refresh_reaction_counts(poem_ids):
+    """Rebuild the counter rows of the given poems from ``Reaction``."""
+    poem_ids = sorted({pk for pk in poem_ids if pk is not None})
+    if not poem_ids:
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(REFRESH_SQL, [poem_ids])
+        return cursor.rowcount
 
 
 def get_user_flags(poem_id, user_hash):
@@ -22,3 +131,23 @@ def get_user_flags(poem_id, user_hash):
     for rtype in rows:
         flags[rtype] = True
     return flags
+
+
+def get_reaction_counts_bulk(poem_ids):
+    """Counts keyed by poem id for the public poems among ``poem_ids``; other ids are left out."""
+    lookups = {rtype: f'reaction_counts__{field}' for rtype, field in COUNT_FIELDS.items()}
+    rows = Poem.public.filter(id__in=poem_ids).values('id', *lookups.values())
+    return {
+        row['id']: {rtype: row[lookup] or 0 for rtype, lookup in lookups.items()}
+        for row in rows
+    }
+
+
+def get_user_flags_bulk(poem_ids, user_hash):
+    flags = {poem_id: {key: False for key in REACTION_TYPES} for poem_id in poem_ids}
+    if not user_hash or not flags:
+        return flags
+    rows = Reaction.objects.filter(poem_id__in=flags, user_hash=user_hash).values_list('poem_id', 'type')
+    for poem_id, rtype in rows:
+        flags[poem_id][rtype] = True
+    return flags
@@ -1,13 +1,14 @@
-from django.shortcuts import get_object_or_404
+from django.http import Http404
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from config.throttling import ReactionRateThrottle
-from config.utils import get_user_hash
-from apps.poems.models import Poem
-from .models import Reaction
+from config.utils import get_user_hash, parse_ids
 from .serializers import ReactionToggleSerializer
-from .utils import get_reaction_counts, get_user_flags
+from .utils import get_reaction_counts_bulk, get_user_flags_bulk, toggle_reaction
+
+
+BATCH_MAX_POEMS = 300
 
 
 class ReactionToggleView(APIView):
@@ -20,34 +21,33 @@ class ReactionToggleView(APIView):
         reaction_type = serializer.validated_data['type']
         user_hash = get_user_hash(request)
 
-        get_object_or_404(
-            Poem,
-            pk=poem_id,
-            deleted_at__isnull=True,
-            is_published=True,
-            author__deleted_at__isnull=True,
-            author__is_published=True,
-        )
-
-        existing = Reaction.objects.filter(
-            poem_id=poem_id,
-            type=reaction_type,
-            user_hash=user_hash,
-        ).first()
-
-        if existing:
-            existing.delete()
-        else:
-            Reaction.objects.filter(poem_id=poem_id, user_hash=user_hash).exclude(type=reaction_type).delete()
-            Reaction.objects.create(
-                poem_id=poem_id,
-                type=reaction_type,
-                user_hash=user_hash,
-            )
-
-        counts = get_reaction_counts(poem_id)
-        flags = get_user_flags(poem_id, user_hash)
+        toggled = toggle_reaction(poem_id, reaction_type, user_hash)
+        if toggled is None:
+            raise Http404
+        counts, flags = toggled
         return Response({
             'counts_by_type': counts,
             'user_flags_by_type': flags,
         })
+
+
+class ReactionBatchView(APIView):
+    def get(self, request):
+        poem_ids = parse_ids(request.query_params.get('poem_ids', ''))
+        if not poem_ids:
+            return Response({'detail': 'poem_ids required'}, status=400)
+        if len(poem_ids) > BATCH_MAX_POEMS:
+            return Response({'detail': f'Too many poem_ids (max {BATCH_MAX_POEMS})'}, status=400)
+
+        counts = get_reaction_counts_bulk(poem_ids)
+        flags = get_user_flags_bulk(list(counts), get_user_hash(request))
+        return Response({
+            'results': {
+                str(poem_id): {
+                    'counts_by_type': counts[poem_id],
+                    'user_flags_by_type': flags[poem_id],
+                }
+                for poem_id in poem_ids
+                if poem_id in counts
+            },
+        })
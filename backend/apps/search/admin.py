@@ -0,0 +1,10 @@
+from django.contrib import admin
+
+from .models import PopularQuery
+
+
+@admin.register(PopularQuery)
+class PopularQueryAdmin(admin.ModelAdmin):
+    list_display = ('query', 'hits', 'last_seen_at')
+    ordering = ('-hits',)
+    search_fields = ('query',)
@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class SearchConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.search'
+
+    def ready(self):
+        from django.db.models import CharField, TextField
+
+        from apps.poems.signals import content_changed
+        from . import live_index
+        from .lookups import ILikeContains
+
+        CharField.register_lookup(ILikeContains)
+        TextField.register_lookup(ILikeContains)
+        content_changed.connect(live_index.on_content_changed, dispatch_uid='search.live_index')
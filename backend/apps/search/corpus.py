@@ -0,0 +1,169 @@
+import random
+from itertools import accumulate
+
+from .text import normalize, tokenize
+
+
+# Target phrase -> section of the search response it is expected in.
+TARGETS = {
+    'муҳаббат': 'poems',
+    'ситораи субҳ': 'poems',
+    'ашки шабнам': 'poems',
+    'гулшани ҷовид': 'poems',
+    'Абулқосим Фирдавсӣ': 'authors',
+    'Мирзо Турсунзода': 'authors',
+    'Лоиқ Шералӣ': 'authors',
+}
+
+# ``(query, kind, target)``; kinds are prefix, multi (several tokens), typo and name.
+QUERY_SET = [
+    ('муҳаб', 'prefix', 'муҳаббат'),
+    ('ситор', 'prefix', 'ситораи субҳ'),
+    ('ашки шаб', 'prefix', 'ашки шабнам'),
+    ('муҳаббат', 'multi', 'муҳаббат'),
+    ('ситораи субҳ', 'multi', 'ситораи субҳ'),
+    ('субҳ ситораи', 'multi', 'ситораи субҳ'),
+    ('ашки шабнам', 'multi', 'ашки шабнам'),
+    ('гулшани ҷовид', 'multi', 'гулшани ҷовид'),
+    ('мухабат', 'typo', 'муҳаббат'),
+    ('ситараи субҳ', 'typo', 'ситораи субҳ'),
+    ('гулшани ҷавид', 'typo', 'гулшани ҷовид'),
+    ('Фирдоуси', 'typo', 'Абулқосим Фирдавсӣ'),
+    ('Турсунзаде', 'typo', 'Мирзо Турсунзода'),
+    ('Фирдавсӣ', 'name', 'Абулқосим Фирдавсӣ'),
+    ('абулкосим фирдавси', 'name', 'Абулқосим Фирдавсӣ'),
+    ('Турсунзода', 'name', 'Мирзо Турсунзода'),
+    ('Лоиқ', 'name', 'Лоиқ Шералӣ'),
+]
+
+WORDS = [
+    'дил', 'ишқ', 'ёр', 'гул', 'шаб', 'рӯз', 'об', 'кӯҳ', 'дар', 'ба', 'аз', 'ки', 'бо', 'ман', 'ту',
+    'мо', 'шумо', 'ҷон', 'ҷаҳон', 'осмон', 'замин', 'моҳ', 'офтоб', 'бод', 'борон', 'баҳор',
+    'тирамоҳ', 'зимистон', 'тобистон', 'май', 'соқӣ', 'қадаҳ', 'шамъ', 'парвона', 'булбул', 'чаман',
+    'боғ', 'роҳ', 'манзил', 'ватан', 'модар', 'падар', 'дӯст', 'ғам', 'шодӣ', 'чашм', 'лаб', 'рӯй',
+    'мӯй', 'сар', 'даст', 'хок', 'оташ', 'сухан', 'шеър', 'қалам', 'нома', 'умр', 'ҳаёт', 'дунё',
+    'орзу', 'умед', 'сабр', 'ақл', 'хирад', 'нур', 'зулмат', 'дарё', 'баҳр', 'мавҷ', 'соҳил', 'санг',
+    'гавҳар', 'ганҷ', 'сарв', 'нигор', 'ҷонон', 'дилбар', 'ошиқ', 'маъшуқ', 'ҳиҷрон', 'висол',
+    'ғурбат', 'хона', 'дарвоза', 'кӯча', 'шаҳр', 'деҳа', 'саҳро', 'ҷангал', 'дарахт', 'барг', 'реша',
+    'мева', 'нон', 'шароб', 'ҷом', 'соз', 'наво', 'сурат', 'оина', 'ранг', 'бӯй', 'наргис', 'лола',
+    'бунафша', 'сабза', 'фасл', 'сол', 'имрӯз', 'фардо', 'дирӯз', 'ҳаргиз', 'ҳамеша', 'боз', 'ҳам',
+    'омад', 'рафт', 'гуфт', 'дид', 'мекунад', 'меояд', 'меравад', 'мегӯяд', 'мебинад', 'аст', 'буд',
+    'шуд', 'хоҳад', 'метавон', 'нест', 'равшан', 'торик', 'ширин', 'талх', 'ҷавон', 'пир', 'зебо',
+]
+SYLLABLES = [
+    'ба', 'да', 'ро', 'ни', 'ша', 'ма', 'зо', 'ки', 'лу', 'ҳо', 'гу', 'ор', 'ан', 'ди', 'су', 'то',
+    'на', 'ва', 'хо', 'рӯ', 'ҷа', 'қо', 'ғу', 'ми', 'ле', 'ё', 'ӣ', 'ист', 'он', 'гар',
+]
+FIRST_NAMES = [
+    'Абдулло', 'Бобо', 'Гулрухсор', 'Зулфия', 'Камол', 'Муъмин', 'Сайид', 'Фарзона', 'Ҳабиб',
+    'Шоҳмузаффар', 'Бозор', 'Гулназар', 'Аскар', 'Убайд', 'Сафар', 'Раҳим', 'Меҳринисо', 'Нуриддин',
+]
+SURNAME_ENDINGS = ['зода', 'ӣ', 'ов', 'ова', 'ён']
+
+VOCABULARY_SIZE = 4000
+STANZA_LINES = 4
+
+
+def _conflict_tokens():
+    texts = [query for query, _, _ in QUERY_SET] + list(TARGETS)
+    return {token for text in texts for token in tokenize(text) if len(token) >= 4}
+
+
+def _is_filler(word, conflicts):
+    word = normalize(word)
+    return not any(token in word for token in conflicts)
+
+
+class SyntheticCorpus:
+    """Deterministic authors and poems for a ``seed``; the same arguments give the same text.
+
+    Filler text is drawn from a fixed vocabulary with a Zipf-like distribution and every
+    poem target is planted into a known set of poems. Words and names that could match a
+    benchmark query are kept out of the filler, so the planted poems and the named
+    authors are exactly the relevant results of each query.
+    """
+
+    def __init__(self, seed, poems, authors):
+        self.seed = seed
+        self.poem_count = poems
+        self.author_count = max(authors, len(self.named_authors()))
+        rng = random.Random(seed)
+        self.conflicts = conflicts = _conflict_tokens()
+
+        vocabulary = [word for word in WORDS if _is_filler(word, conflicts)]
+        seen = set(vocabulary)
+        while len(vocabulary) < VOCABULARY_SIZE:
+            word = ''.join(rng.choices(SYLLABLES, k=rng.randint(2, 4)))
+            if word not in seen and _is_filler(word, conflicts):
+                seen.add(word)
+                vocabulary.append(word)
+        self.vocabulary = vocabulary
+        self.cum_weights = list(accumulate(1 / rank for rank in range(1, len(vocabulary) + 1)))
+
+        self.first_names = [name for name in FIRST_NAMES if _is_filler(name, conflicts)]
+        self.surnames = [word for word in vocabulary[len(WORDS):] if len(word) > 3]
+
+        # Poems each poem target is planted into, drawn once so the plan does not depend on chunking.
+        planted = max(10, poems // 1000)
+        self.plants = {}
+        for target, section in TARGETS.items():
+            if section == 'poems':
+                for position in rng.sample(range(poems), min(planted, poems)):
+                    self.plants.setdefault(position, []).append(target)
+        self.rng = rng
+
+    @staticmethod
+    def named_authors():
+        return [target for target, section in TARGETS.items() if section == 'authors']
+
+    def authors(self):
+        """Author names: the named targets first, then generated names."""
+        names = self.named_authors()
+        while len(names) < self.author_count:
+            surname = self.rng.choice(self.surnames).capitalize() + self.rng.choice(SURNAME_ENDINGS)
+            name = f'{self.rng.choice(self.first_names)} {surname}'
+            if _is_filler(name, self.conflicts):
+                names.append(name)
+        return names
+
+    def _words(self, count):
+        return self.rng.choices(self.vocabulary, cum_weights=self.cum_weights, k=count)
+
+    def _line(self):
+        words = self._words(self.rng.randint(5, 9))
+        words[0] = words[0].capitalize()
+        return ' '.join(words)
+
+    def poems(self):
+        """Yield ``(position, author_index, title, text, views, targets)`` for every poem."""
+        rng = self.rng
+        for position in range(self.poem_count):
+            title_words = self._words(rng.randint(1, 3))
+            lines = [self._line() for _ in range(2 * rng.randint(2, 8))]
+            targets = self.plants.get(position, ())
+            for target in targets:
+                line = rng.randrange(len(lines))
+                words = lines[line].split(' ')
+                words.insert(rng.randint(1, len(words)), target)
+                lines[line] = ' '.join(words)
+                if rng.random() < 0.25:
+                    title_words.append(target)
+            stanzas = [lines[start: start + STANZA_LINES] for start in range(0, len(lines), STANZA_LINES)]
+            text = '\n\n'.join('\n'.join(stanza) for stanza in stanzas)
+            title = ' '.join(title_words).capitalize()
+            views = int(rng.paretovariate(1.2)) - 1
+            yield position, rng.randrange(self.author_count), title, text, views, targets
+
+
+def recall_at_k(found_ids, relevant_ids, k):
+    """Share of the relevant ids (at most ``k``) found among the first ``k`` results."""
+    if not relevant_ids:
+        return 1.0
+    hits = len(set(found_ids[:k]) & set(relevant_ids))
+    return hits / min(k, len(relevant_ids))
+
+
+def percentile(sorted_values, percent):
+    """Nearest-rank percentile of an ascending list."""
+    rank = max(1, -(-len(sorted_values) * percent // 100))
+    return sorted_values[min(len(sorted_values), int(rank)) - 1]
@@ -0,0 +1,166 @@
+import logging
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+
+from django.db import close_old_connections
+
+from apps.poems.signals import get_content_version, read_changes
+
+
+logger = logging.getLogger(__name__)
+
+_live_indexes = []
+
+
+class ReadWriteLock:
+    """Many readers or one writer; a waiting writer holds off new readers."""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writing = False
+        self._writers_waiting = 0
+
+    @contextmanager
+    def reading(self):
+        with self._condition:
+            while self._writing or self._writers_waiting:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def writing(self):
+        with self._condition:
+            self._writers_waiting += 1
+            while self._writing or self._readers:
+                self._condition.wait()
+            self._writers_waiting -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+
+    def busy(self):
+        with self._condition:
+            return self._writing or bool(self._readers)
+
+
+class LiveIndex(ABC):
+    """Per-process in-memory index kept current by replaying content change events.
+
+    Writers log each change under its content version in the shared cache, so every
+    process can replay the versions it missed; changes it cannot replay (see
+    ``read_changes``) trigger a rebuild in the background while the current index keeps
+    serving. Readers share ``_lock``; only swapping in a new index and ``apply`` take it
+    exclusively, so searches in one process overlap and never wait on queries.
+    """
+
+    name = 'index'
+
+    def __init__(self):
+        self._lock = ReadWriteLock()
+        self._state_lock = threading.Lock()
+        self._replay_lock = threading.Lock()
+        self._index = None
+        self._building = False
+        _live_indexes.append(self)
+
+    @abstractmethod
+    def build(self):
+        """Return a fresh index with a ``version`` attribute."""
+
+    @abstractmethod
+    def load(self, author_ids, poem_ids):
+        """Read the rows of the changed authors and poems; runs outside the lock."""
+
+    @abstractmethod
+    def apply(self, index, changes):
+        """Write what ``load`` returned into ``index`` without running queries."""
+
+    @property
+    def ready(self):
+        return self._index is not None
+
+    def rebuild(self):
+        index = self.build()
+        with self._lock.writing():
+            self._index = index
+        return index
+
+    def invalidate(self):
+        with self._lock.writing():
+            self._index = None
+
+    def schedule_rebuild(self):
+        with self._state_lock:
+            if self._building:
+                return
+            self._building = True
+        _build_in_background(self)
+
+    def _finish_build(self):
+        with self._state_lock:
+            self._building = False
+
+    def catch_up(self, version):
+        """Replay recorded changes up to ``version``; returns False when a rebuild was needed.
+
+        One thread replays at a time; others keep serving the current index meanwhile.
+        """
+        index = self._index
+        if index is None or index.version == version:
+            return True
+        if not self._replay_lock.acquire(blocking=False):
+            return True
+        try:
+            index = self._index
+            if index is None or index.version == version:
+                return True
+            # A version behind the index means the counter was reset; nothing can be replayed.
+            replay = read_changes(index.version, version)
+            if replay is not None:
+                reached, author_ids, poem_ids = replay
+                if reached > index.version:
+                    changes = self.load(author_ids, poem_ids)
+                    with self._lock.writing():
+                        # A rebuild swapped in during the load already holds these rows.
+                        if self._index is index:
+                            self.apply(index, changes)
+                            index.version = reached
+                return True
+        finally:
+            self._replay_lock.release()
+        self.schedule_rebuild()
+        return False
+
+
+def _build_in_background(live_index):
+    def run():
+        try:
+            live_index.rebuild()
+        except Exception:
+            logger.exception('Failed to build %s', live_index.name)
+        finally:
+            live_index._finish_build()
+            close_old_connections()
+
+    threading.Thread(target=run, name=f'{live_index.name}-build', daemon=True).start()
+
+
+def on_content_changed(sender, version, author_ids, poem_ids, **kwargs):
+    # Catch up to the current version: a later write may already have been replayed.
+    version = get_content_version()
+    for live_index in _live_indexes:
+        if live_index.ready:
+            live_index.catch_up(version)
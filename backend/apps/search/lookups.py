@@ -0,0 +1,18 @@
+from django.db.models import Lookup
+
+
+class ILikeContains(Lookup):
+    """Case-insensitive substring match emitted as ``col ILIKE '%value%'``.
+
+    Unlike ``icontains`` (``UPPER(col) LIKE UPPER(...)`` on PostgreSQL) this keeps the bare
+    column on the left, so plain ``gin_trgm_ops`` indexes can serve it.
+    """
+
+    lookup_name = 'ilike_contains'
+    prepare_rhs = False
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        rhs_params = [f'%{connection.ops.prep_for_like_query(value)}%' for value in rhs_params]
+        return f'{lhs} ILIKE {rhs}', [*lhs_params, *rhs_params]
@@ -0,0 +1,104 @@
+import json
+import time
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from apps.authors.serializers import AUTHOR_VALUES
+from apps.poems.serializers import POEM_LIST_VALUES
+from apps.search.corpus import QUERY_SET, percentile, recall_at_k
+from apps.search.queries import build_search_querysets
+from apps.search.text import canonical_query
+from apps.search.views import COUNT_MODES, build_search_page
+
+
+TRIGRAM_INDEXES = ['poems_title_trgm', 'poems_text_trgm', 'authors_name_trgm']
+
+
+class Command(BaseCommand):
+    help = (
+        'Time /search first pages on the current data, print their plans and, given the labels '
+        'written by generate_search_corpus, report recall@k.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--query', action='append', dest='queries', help='Query to run; repeatable')
+        parser.add_argument('--page-size', type=int, default=25, help='Rows fetched per section')
+        parser.add_argument('--repeat', type=int, default=20, help='Timed runs per query')
+        parser.add_argument('--count', choices=COUNT_MODES, default='capped', help='Count mode of the timed pages')
+        parser.add_argument('--labels', help='Relevance labels from generate_search_corpus; enables recall@k')
+        parser.add_argument('--k', type=int, default=10, help='Cut-off for recall@k')
+        parser.add_argument('--explain', action='store_true', help='Print EXPLAIN ANALYZE of each section query')
+        parser.add_argument(
+            '--compare',
+            action='store_true',
+            help='Also run with the trigram indexes dropped inside a rolled-back transaction '
+                 '(locks the tables while it runs; use on a benchmark database)',
+        )
+
+    def handle(self, *args, **options):
+        labels = None
+        if options['labels']:
+            with open(options['labels'], encoding='utf-8') as handle:
+                labels = json.load(handle)['targets']
+        if options['queries']:
+            cases = [(q, 'custom', None) for q in options['queries']]
+        else:
+            cases = QUERY_SET
+
+        self._run('with trigram indexes', cases, labels, options)
+        if options['compare']:
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    for name in TRIGRAM_INDEXES:
+                        cursor.execute(f'DROP INDEX IF EXISTS {connection.ops.quote_name(name)}')
+                self._run('without trigram indexes', cases, labels, options)
+                transaction.set_rollback(True)
+        self.stdout.write(self.style.SUCCESS('Benchmark finished.'))
+
+    def _run(self, label, cases, labels, options):
+        page_size = options['page_size']
+        k = options['k']
+        self.stdout.write(self.style.MIGRATE_HEADING(label))
+        all_timings = []
+        recalls = defaultdict(list)
+        for raw_q, kind, target in cases:
+            q = canonical_query(raw_q)
+            payload = build_search_page(None, q, 1, page_size, options['count'])
+            timings = []
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                build_search_page(None, q, 1, page_size, options['count'])
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            all_timings.extend(timings)
+            line = (
+                f"{raw_q!r} [{kind}]: {payload['authors']['count']} authors, {payload['poems']['count']} poems, "
+                f'p50 {percentile(timings, 50):.1f} ms, p95 {percentile(timings, 95):.1f} ms, '
+                f'p99 {percentile(timings, 99):.1f} ms'
+            )
+
+            expected = labels.get(target) if labels and target else None
+            if expected:
+                section = expected['section']
+                found = build_search_page(None, q, 1, k, options['count'], types=(section,))[section]['results']
+                recall = recall_at_k([row['id'] for row in found], expected['ids'], k)
+                recalls[kind].append(recall)
+                line += f', recall@{k} {recall:.2f}'
+            self.stdout.write(line)
+
+            if options['explain']:
+                authors_qs, poems_qs = build_search_querysets(q)
+                for name, qs, fields in (('authors', authors_qs, AUTHOR_VALUES), ('poems', poems_qs, POEM_LIST_VALUES)):
+                    self.stdout.write(f'-- {name}')
+                    self.stdout.write(qs.values(*fields)[:page_size].explain(analyze=True, buffers=True))
+
+        if all_timings:
+            all_timings.sort()
+            self.stdout.write(
+                f'all queries: p50 {percentile(all_timings, 50):.1f} ms, '
+                f'p95 {percentile(all_timings, 95):.1f} ms, p99 {percentile(all_timings, 99):.1f} ms'
+            )
+        for kind, values in recalls.items():
+            self.stdout.write(f'{kind}: mean recall@{k} {sum(values) / len(values):.2f} over {len(values)} queries')
@@ -0,0 +1,25 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.search.memory_index import build_index, save_snapshot
+
+
+class Command(BaseCommand):
+    help = 'Build the in-memory search index and write it to the snapshot file servers load at startup.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=None, help='Snapshot path (defaults to SEARCH_INDEX_SNAPSHOT)')
+
+    def handle(self, *args, **options):
+        path = options['output'] or settings.SEARCH_INDEX_SNAPSHOT
+        if not path:
+            raise CommandError('Pass --output or set SEARCH_INDEX_SNAPSHOT.')
+        started = time.perf_counter()
+        index = build_index()
+        save_snapshot(index, path)
+        self.stdout.write(self.style.SUCCESS(
+            f'Indexed {len(index.poems)} poems and {len(index.authors)} authors '
+            f'at version {index.version} in {time.perf_counter() - started:.1f}s -> {path}'
+        ))
@@ -0,0 +1,101 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import models, transaction
+
+from apps.authors.models import Author
+from apps.authors.stats import refresh_author_stats
+from apps.poems.models import Poem, text_stats
+from apps.poems.signals import notify_content_changed
+from apps.search.corpus import TARGETS, SyntheticCorpus
+
+
+def _delete_all(model):
+    """Delete every row of ``model`` and, first, of the models cascading from it, without signals."""
+    for relation in model._meta.related_objects:
+        if relation.on_delete is models.CASCADE:
+            _delete_all(relation.related_model)
+    qs = model._base_manager.all()
+    qs._raw_delete(qs.db)
+
+
+class Command(BaseCommand):
+    help = 'Fill the database with a synthetic Tajik poem corpus and write the relevance labels for benchmark_search.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--poems', type=int, default=10000, help='Poems to generate (10k to 1M)')
+        parser.add_argument('--authors', type=int, help='Authors to generate (defaults to one per 50 poems)')
+        parser.add_argument('--seed', type=int, default=1, help='Random seed; the same seed gives the same corpus')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Rows inserted per statement')
+        parser.add_argument('--labels', default='search_labels.json', help='Where to write the relevance labels')
+        parser.add_argument('--force', action='store_true', help='Clear existing authors and poems first')
+
+    def handle(self, *args, **options):
+        if Author.objects.exists() and not options['force']:
+            self.stdout.write(self.style.WARNING('Data already exists. Use --force to replace it.'))
+            return
+        if options['force']:
+            # One DELETE per table: the ORM delete would send post_delete, and recompute author stats, per poem.
+            with transaction.atomic():
+                _delete_all(Author)
+
+        chunk_size = options['chunk_size']
+        corpus = SyntheticCorpus(
+            options['seed'],
+            poems=options['poems'],
+            authors=options['authors'] or max(20, options['poems'] // 50),
+        )
+        labels = {target: {'section': section, 'ids': []} for target, section in TARGETS.items()}
+
+        names = corpus.authors()
+        authors = Author.objects.bulk_create([Author(full_name=name) for name in names], batch_size=chunk_size)
+        author_ids = [author.id for author in authors]
+        for name, author_id in zip(names, author_ids):
+            if name in labels:
+                labels[name]['ids'].append(author_id)
+
+        total = 0
+        chunk = []
+        for row in corpus.poems():
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                total += self._create_poems(chunk, author_ids, labels)
+                chunk = []
+        if chunk:
+            total += self._create_poems(chunk, author_ids, labels)
+
+        for start in range(0, len(author_ids), chunk_size):
+            refresh_author_stats(author_ids[start: start + chunk_size])
+        # Bulk inserts send no signals; one change naming no ids retires cached pages and in-process indexes.
+        notify_content_changed()
+
+        with open(options['labels'], 'w', encoding='utf-8') as handle:
+            json.dump(
+                {'seed': options['seed'], 'poems': total, 'authors': len(author_ids), 'targets': labels},
+                handle,
+                ensure_ascii=False,
+                indent=2,
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {len(author_ids)} authors and {total} poems; labels written to {options['labels']}."
+        ))
+
+    def _create_poems(self, rows, author_ids, labels):
+        poems = []
+        for _, author_index, title, text, views, _ in rows:
+            preview, line_count, char_count = text_stats(text)
+            poems.append(Poem(
+                author_id=author_ids[author_index],
+                title=title,
+                text=text,
+                views=views,
+                is_public=True,
+                preview=preview,
+                line_count=line_count,
+                char_count=char_count,
+            ))
+        Poem.objects.bulk_create(poems)
+        for poem, row in zip(poems, rows):
+            for target in row[5]:
+                labels[target]['ids'].append(poem.id)
+        return len(poems)
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from apps.authors.models import AUTHOR_SEARCH_VECTOR, Author
+from apps.poems.models import POEM_SEARCH_VECTOR, Poem
+
+
+TARGETS = {
+    'authors': (Author, AUTHOR_SEARCH_VECTOR),
+    'poems': (Poem, POEM_SEARCH_VECTOR),
+}
+
+
+class Command(BaseCommand):
+    help = 'Recompute search_vector for authors and poems in id-ordered chunks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500, help='Rows updated per statement')
+        parser.add_argument('--all', action='store_true', help='Recompute every row, not only rows without a vector')
+        parser.add_argument('--only', choices=sorted(TARGETS), help='Reindex a single model')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        names = [options['only']] if options['only'] else sorted(TARGETS)
+        for name in names:
+            model, vector = TARGETS[name]
+            qs = model.objects.all()
+            if not options['all']:
+                qs = qs.filter(search_vector__isnull=True)
+            last_id = 0
+            total = 0
+            while True:
+                ids = list(qs.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:chunk_size])
+                if not ids:
+                    break
+                # Assigning the column directly does not fire the trigger, which only watches the text columns.
+                model.objects.filter(id__in=ids).update(search_vector=vector)
+                total += len(ids)
+                last_id = ids[-1]
+            self.stdout.write(self.style.SUCCESS(f'Reindexed {total} {name}.'))
@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+
+from apps.search.popular import top_queries
+from apps.search.views import search_page
+
+
+class Command(BaseCommand):
+    help = 'Cache the first search page of the most frequent queries, e.g. right after a deploy.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=300, help='Number of popular queries to warm')
+        parser.add_argument('--page-size', type=int, default=25, help='Page size the frontend requests')
+        parser.add_argument(
+            '--host',
+            action='append',
+            dest='hosts',
+            help='Host the responses are cached for; repeatable (defaults to the non-wildcard ALLOWED_HOSTS)',
+        )
+        parser.add_argument(
+            '--scheme',
+            action='append',
+            dest='schemes',
+            choices=('http', 'https'),
+            help='Scheme the responses are cached for; repeatable (defaults to both)',
+        )
+
+    def handle(self, *args, **options):
+        hosts = options['hosts'] or [host for host in settings.ALLOWED_HOSTS if host != '*' and not host.startswith('.')]
+        schemes = options['schemes'] or ['http', 'https']
+        queries = top_queries(options['limit'])
+        factory = RequestFactory()
+        for host in hosts:
+            for scheme in schemes:
+                request = factory.get('/api/v1/search', HTTP_HOST=host, secure=scheme == 'https')
+                for q in queries:
+                    search_page(request, q, 1, options['page_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Warmed {len(queries)} search queries for {len(hosts)} hosts over {", ".join(schemes)}.'
+        ))
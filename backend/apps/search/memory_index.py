@@ -0,0 +1,256 @@
+import heapq
+import logging
+import os
+import pickle
+import sys
+from array import array
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.db.models import Q
+
+from apps.authors.models import Author
+from apps.poems.models import Poem
+from apps.poems.signals import get_content_version
+from .live_index import LiveIndex
+from .text import tokenize
+
+
+logger = logging.getLogger(__name__)
+
+# Field weights follow ts_rank's defaults for the A/B labels of ``search_vector``.
+POEM_WEIGHTS = {'title': 1.0, 'text': 0.4}
+AUTHOR_WEIGHTS = {'name': 1.0}
+
+
+class FieldIndex:
+    """Sorted term dictionary with a sorted ``array('q')`` of document ids per term."""
+
+    def __init__(self, postings=None):
+        self.postings = postings or {}
+        self.terms = sorted(self.postings)
+
+    def add(self, doc_id, terms):
+        for term in terms:
+            ids = self.postings.get(term)
+            if ids is None:
+                insort(self.terms, term)
+                self.postings[term] = array('q', [doc_id])
+                continue
+            position = bisect_left(ids, doc_id)
+            if position == len(ids) or ids[position] != doc_id:
+                ids.insert(position, doc_id)
+
+    def remove(self, doc_id, terms):
+        for term in terms:
+            ids = self.postings.get(term)
+            if ids is None:
+                continue
+            position = bisect_left(ids, doc_id)
+            if position < len(ids) and ids[position] == doc_id:
+                del ids[position]
+            if not ids:
+                del self.postings[term]
+                del self.terms[bisect_left(self.terms, term)]
+
+    def prefix(self, prefix):
+        """Ids of documents holding any term that starts with ``prefix``."""
+        matched = set()
+        for position in range(bisect_left(self.terms, prefix), len(self.terms)):
+            term = self.terms[position]
+            if not term.startswith(prefix):
+                break
+            matched.update(self.postings[term])
+        return matched
+
+
+class DocumentIndex:
+    """Weighted fields over one kind of document plus the tiebreak value of each document."""
+
+    def __init__(self, weights):
+        self.weights = weights
+        self.fields = {field: FieldIndex() for field in weights}
+        self.docs = {}
+
+    @staticmethod
+    def _terms(text):
+        return tuple(sys.intern(term) for term in dict.fromkeys(tokenize(text or '')))
+
+    @classmethod
+    def build(cls, weights, rows):
+        """Build from ``(doc_id, {field: text}, sort_value)`` rows given in ascending id order."""
+        index = cls(weights)
+        postings = {field: {} for field in weights}
+        for doc_id, texts, sort_value in rows:
+            doc_terms = {}
+            for field in weights:
+                terms = cls._terms(texts.get(field))
+                doc_terms[field] = terms
+                field_postings = postings[field]
+                for term in terms:
+                    ids = field_postings.get(term)
+                    if ids is None:
+                        field_postings[term] = array('q', [doc_id])
+                    else:
+                        ids.append(doc_id)
+            index.docs[doc_id] = (sort_value, doc_terms)
+        index.fields = {field: FieldIndex(postings[field]) for field in weights}
+        return index
+
+    def __len__(self):
+        return len(self.docs)
+
+    def add(self, doc_id, texts, sort_value):
+        self.remove(doc_id)
+        doc_terms = {field: self._terms(texts.get(field)) for field in self.weights}
+        for field, terms in doc_terms.items():
+            self.fields[field].add(doc_id, terms)
+        self.docs[doc_id] = (sort_value, doc_terms)
+
+    def remove(self, doc_id):
+        entry = self.docs.pop(doc_id, None)
+        if entry is None:
+            return
+        for field, terms in entry[1].items():
+            self.fields[field].remove(doc_id, terms)
+
+    def search(self, tokens, limit):
+        """Return ``(total, ids)`` for documents matching every token as a prefix.
+
+        ``ids`` are the best ``limit`` of the ``total`` matches, best first; the rest are
+        never sorted. A document scores the weight of the best field each token matched
+        in; ties go to the higher sort value, then the lower id.
+        """
+        scores = None
+        for token in dict.fromkeys(tokens):
+            token_scores = {}
+            for field, weight in self.weights.items():
+                for doc_id in self.fields[field].prefix(token):
+                    if token_scores.get(doc_id, 0) < weight:
+                        token_scores[doc_id] = weight
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {doc_id: score + token_scores[doc_id] for doc_id, score in scores.items() if doc_id in token_scores}
+            if not scores:
+                return 0, []
+        if scores is None:
+            return 0, []
+        docs = self.docs
+        best = heapq.nsmallest(limit, scores, key=lambda doc_id: (-scores[doc_id], -docs[doc_id][0], doc_id))
+        return len(scores), best
+
+
+class SearchIndex:
+    """Poem and author indexes as of content ``version``."""
+
+    def __init__(self, version, poems, authors):
+        self.version = version
+        self.poems = poems
+        self.authors = authors
+
+
+def _poem_rows(qs):
+    rows = qs.order_by('id').values_list('id', 'title', 'text', 'views').iterator(chunk_size=2000)
+    for pk, title, text, views in rows:
+        yield pk, {'title': title, 'text': text}, views
+
+
+def _author_rows(qs):
+    rows = qs.order_by('id').values_list('id', 'full_name', 'popularity').iterator(chunk_size=2000)
+    for pk, full_name, popularity in rows:
+        yield pk, {'name': full_name}, popularity
+
+
+def build_index():
+    # Read the version first: writes that land during the build are replayed afterwards.
+    version = get_content_version()
+    poems = DocumentIndex.build(POEM_WEIGHTS, _poem_rows(Poem.public.all()))
+    authors = DocumentIndex.build(AUTHOR_WEIGHTS, _author_rows(Author.public.with_stats()))
+    return SearchIndex(version, poems, authors)
+
+
+def load_changes(author_ids, poem_ids):
+    """Read the given authors and poems (and the poems of those authors) for ``apply_changes``.
+
+    Returns ``(public_poems, hidden_poem_ids, public_authors, hidden_author_ids)``.
+    """
+    poem_filter = Q(id__in=poem_ids) | Q(author_id__in=author_ids)
+    public_poems = {pk: (texts, views) for pk, texts, views in _poem_rows(Poem.public.filter(poem_filter))}
+    hidden_poems = set(poem_ids) | set(Poem.objects.filter(poem_filter).values_list('id', flat=True))
+    public_authors = {
+        pk: (texts, popularity)
+        for pk, texts, popularity in _author_rows(Author.public.with_stats().filter(id__in=author_ids))
+    }
+    return public_poems, hidden_poems - public_poems.keys(), public_authors, set(author_ids) - public_authors.keys()
+
+
+def apply_changes(index, changes):
+    """Write rows read by ``load_changes`` into ``index``; runs no queries."""
+    public_poems, hidden_poems, public_authors, hidden_authors = changes
+    for pk in hidden_poems:
+        index.poems.remove(pk)
+    for pk, (texts, views) in public_poems.items():
+        index.poems.add(pk, texts, views)
+    for pk in hidden_authors:
+        index.authors.remove(pk)
+    for pk, (texts, popularity) in public_authors.items():
+        index.authors.add(pk, texts, popularity)
+
+
+def load_snapshot(path):
+    with open(path, 'rb') as handle:
+        index = pickle.load(handle)
+    if not isinstance(index, SearchIndex):
+        raise ValueError(f'{path} does not contain a search index')
+    return index
+
+
+def save_snapshot(index, path):
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as handle:
+        pickle.dump(index, handle, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+class MemorySearchEngine(LiveIndex):
+    """Full-text index behind ``SEARCH_BACKEND = 'memory'``, loaded from a snapshot when available."""
+
+    name = 'search-index'
+
+    def build(self):
+        # The snapshot only seeds the first index; later rebuilds follow the database.
+        path = settings.SEARCH_INDEX_SNAPSHOT
+        if self._index is None and path and os.path.exists(path):
+            try:
+                return load_snapshot(path)
+            except Exception:
+                logger.exception('Failed to load search index snapshot %s', path)
+        return build_index()
+
+    def load(self, author_ids, poem_ids):
+        return load_changes(author_ids, poem_ids)
+
+    def apply(self, index, changes):
+        apply_changes(index, changes)
+
+    def search(self, q, offset, limit, kinds=('authors', 'poems')):
+        """Return ``{kind: (total, ids)}`` for the requested ``kinds``, or None while no index is loaded.
+
+        A missing index is loaded (from the snapshot when there is one) in the background.
+        """
+        if self._index is None:
+            self.schedule_rebuild()
+            return None
+        self.catch_up(get_content_version())
+        tokens = tokenize(q)
+        found = {}
+        with self._lock.reading():
+            index = self._index
+            for kind in kinds:
+                total, ids = getattr(index, kind).search(tokens, offset + limit)
+                found[kind] = (total, ids[offset:])
+        return found
+
+
+engine = MemorySearchEngine()
@@ -0,0 +1,15 @@
+from django.db import models
+
+
+class PopularQuery(models.Model):
+    """Running hit count per canonical search query, fed by ``apps.search.popular``."""
+
+    query = models.CharField(max_length=255, unique=True)
+    hits = models.PositiveBigIntegerField(default=0)
+    last_seen_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['-hits'], name='search_popular_hits_idx')]
+
+    def __str__(self):
+        return f'{self.query} ({self.hits})'
@@ -0,0 +1,88 @@
+import logging
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+
+from .models import PopularQuery
+
+
+logger = logging.getLogger(__name__)
+
+FLUSH_SQL = """
+INSERT INTO search_popularquery (query, hits, last_seen_at)
+SELECT query, hits, now()
+FROM unnest(%s::text[], %s::bigint[]) AS batch(query, hits)
+ON CONFLICT (query) DO UPDATE
+SET hits = search_popularquery.hits + EXCLUDED.hits,
+    last_seen_at = EXCLUDED.last_seen_at
+"""
+
+# Distinct queries held before the flusher is woken early, whatever the interval.
+MAX_BUFFERED_QUERIES = 1000
+
+_lock = threading.Lock()
+_buffer = Counter()
+_wake = threading.Event()
+_flusher_lock = threading.Lock()
+_flusher_thread = None
+
+
+def record_query(canonical):
+    """Count one search for ``canonical``; a background thread writes the per-process buffer out."""
+    if not canonical or len(canonical) > PopularQuery._meta.get_field('query').max_length:
+        return
+    with _lock:
+        _buffer[canonical] += 1
+        full = len(_buffer) >= MAX_BUFFERED_QUERIES
+    ensure_flusher()
+    if full:
+        _wake.set()
+
+
+def flush_queries(batch):
+    if not batch:
+        return 0
+    queries = sorted(batch)
+    with connection.cursor() as cursor:
+        cursor.execute(FLUSH_SQL, [queries, [batch[query] for query in queries]])
+    return len(queries)
+
+
+def flush_buffer():
+    with _lock:
+        batch = dict(_buffer)
+        _buffer.clear()
+    return flush_queries(batch)
+
+
+def _flusher_loop(interval):
+    while True:
+        _wake.wait(interval)
+        _wake.clear()
+        close_old_connections()
+        try:
+            flush_buffer()
+        except Exception:
+            logger.exception('Failed to flush search query counts')
+
+
+def ensure_flusher():
+    global _flusher_thread
+    if _flusher_thread is not None and _flusher_thread.is_alive():
+        return
+    with _flusher_lock:
+        if _flusher_thread is not None and _flusher_thread.is_alive():
+            return
+        _flusher_thread = threading.Thread(
+            target=_flusher_loop,
+            args=(settings.SEARCH_POPULAR_FLUSH_INTERVAL,),
+            name='search-popular-flusher',
+            daemon=True,
+        )
+        _flusher_thread.start()
+
+
+def top_queries(limit):
+    return list(PopularQuery.objects.order_by('-hits').values_list('query', flat=True)[:limit])
@@ -0,0 +1,91 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+from django.db.models import Exists, F, FloatField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from apps.authors.models import Author
+from apps.poems.models import Poem, PoemLine
+from .text import folded, tokenize
+
+
+def prefix_query(q):
+    """Every token of ``q`` as a prefix match."""
+    return SearchQuery(' & '.join(f'{token}:*' for token in tokenize(q)), search_type='raw', config='simple')
+
+
+def phrase_query(q):
+    """The tokens of ``q`` adjacent and in order."""
+    return SearchQuery(q, search_type='phrase', config='simple')
+
+
+def matching_lines(q, phrase=False):
+    """Poem lines matching ``q``, annotated with their ``rank``.
+
+    Lines have their own ``search_vector`` and folded-text trigram indexes, so a phrase
+    must occur within one line and a substring may not run across a line break.
+    """
+    query = phrase_query(q) if phrase else prefix_query(q)
+    matches = Q(search_vector=query)
+    if not phrase:
+        matches |= Q(folded_text__ilike_contains=q)
+    return PoemLine.objects.alias(
+        folded_text=folded('text'),
+    ).annotate(
+        rank=SearchRank(F('search_vector'), query),
+    ).filter(matches)
+
+
+def build_search_querysets(q, phrase=False):
+    """Return ``(authors_qs, poems_qs)`` ranked for the canonical query ``q``.
+
+    Every filter branch is an operator that a GIN index serves (``@@`` on ``search_vector``,
+    ``ILIKE``/``%`` on the folded-text ``gin_trgm_ops`` indexes), so the planner
+    can combine them with a BitmapOr instead of scanning the table. Similarity is only
+    computed on titles and names; the per-row ``text`` similarity needed the full text of
+    every candidate row and dominated the query.
+
+    With ``phrase`` the tokens must appear together: in a name or title, or within one
+    poem line, and poems rank by their best matching line.
+    """
+    query = phrase_query(q) if phrase else prefix_query(q)
+
+    author_filter = Q(search_vector=query) | Q(folded_name__ilike_contains=q)
+    if not phrase:
+        author_filter |= Q(folded_name__trigram_similar=q)
+    authors_qs = Author.public.with_stats().alias(
+        folded_name=folded('full_name'),
+    ).annotate(
+        rank=SearchRank(F('search_vector'), query),
+        similarity=TrigramSimilarity('folded_name', q),
+    ).filter(author_filter).order_by('-rank', '-similarity', '-popularity')
+
+    if phrase:
+        lines = matching_lines(q, phrase=True).filter(poem=OuterRef('pk'))
+        poems_qs = Poem.public.alias(
+            folded_title=folded('title'),
+        ).annotate(
+            rank=Coalesce(
+                Subquery(lines.order_by('-rank').values('rank')[:1]),
+                Value(0.0),
+                output_field=FloatField(),
+            ),
+            similarity=TrigramSimilarity('folded_title', q),
+        ).filter(
+            Q(Exists(lines))
+            | Q(folded_title__ilike_contains=q)
+        ).order_by('-rank', '-similarity', '-views')
+        return authors_qs, poems_qs
+
+    poems_qs = Poem.public.alias(
+        folded_title=folded('title'),
+        folded_text=folded('text'),
+    ).annotate(
+        rank=SearchRank(F('search_vector'), query),
+        similarity=TrigramSimilarity('folded_title', q),
+    ).filter(
+        Q(search_vector=query)
+        | Q(folded_title__ilike_contains=q)
+        | Q(folded_text__ilike_contains=q)
+        | Q(folded_title__trigram_similar=q)
+    ).order_by('-rank', '-similarity', '-views')
+
+    return authors_qs, poems_qs
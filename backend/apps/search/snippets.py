@@ -0,0 +1,35 @@
+from django.db.models import Q
+
+from apps.poems.models import PoemLine
+from .queries import matching_lines
+
+
+SNIPPET_CONTEXT = 1
+
+
+def line_snippets(poem_ids, q, phrase=False, context=SNIPPET_CONTEXT):
+    """Return ``{poem_id: {'line': number, 'lines': [...]}}`` for poems with a line matching ``q``.
+
+    ``line`` is the best matching line and ``lines`` holds it with up to ``context`` lines
+    on either side. Two indexed queries serve a whole page; the poem text is never read.
+    """
+    if not poem_ids:
+        return {}
+    best = dict(
+        matching_lines(q, phrase)
+        .filter(poem_id__in=poem_ids)
+        .order_by('poem_id', '-rank', 'number')
+        .distinct('poem_id')
+        .values_list('poem_id', 'number')
+    )
+    if not best:
+        return {}
+
+    window = Q()
+    for poem_id, number in best.items():
+        window |= Q(poem_id=poem_id, number__range=(max(number - context, 1), number + context))
+    snippets = {poem_id: {'line': number, 'lines': []} for poem_id, number in best.items()}
+    rows = PoemLine.objects.filter(window).order_by('poem_id', 'number').values_list('poem_id', 'number', 'text')
+    for poem_id, number, text in rows:
+        snippets[poem_id]['lines'].append({'number': number, 'text': text})
+    return snippets
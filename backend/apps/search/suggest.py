@@ -0,0 +1,177 @@
+import heapq
+import re
+from bisect import bisect_left, insort
+from itertools import chain
+
+from django.db.models import Q
+
+from config.utils import slugify_fallback
+from apps.authors.models import Author
+from apps.poems.models import Poem
+from apps.poems.signals import get_content_version
+from .live_index import LiveIndex
+from .text import canonical_query, folded, tokenize
+
+
+SUGGEST_LIMIT = 5
+SUGGEST_MAX_LIMIT = 10
+
+# Answers for prefixes up to this length scan many keys, so they are memoized until the next change.
+MEMO_PREFIX_LENGTH = 2
+
+
+def _keys(label):
+    """Every word-suffix of ``label`` so a prefix can start at any word."""
+    words = tokenize(label)
+    return {' '.join(words[position:]) for position in range(len(words))}
+
+
+class SuggestIndex:
+    """Sorted ``(key, kind, id)`` tuples over author names and poem titles, ranked by popularity."""
+
+    def __init__(self, version):
+        self.version = version
+        self.keys = []
+        self.entries = {}
+        self._memo = {}
+
+    @classmethod
+    def build(cls, version, rows):
+        """Build from ``(kind, id, label, score, data)`` rows."""
+        index = cls(version)
+        for kind, pk, label, score, data in rows:
+            keys = _keys(label)
+            index.entries[(kind, pk)] = (score, data, keys)
+            index.keys.extend((key, kind, pk) for key in keys)
+        index.keys.sort()
+        return index
+
+    def add(self, kind, pk, label, score, data):
+        self.remove(kind, pk)
+        keys = _keys(label)
+        for key in keys:
+            insort(self.keys, (key, kind, pk))
+        self.entries[(kind, pk)] = (score, data, keys)
+        self._memo.clear()
+
+    def remove(self, kind, pk):
+        entry = self.entries.pop((kind, pk), None)
+        if entry is None:
+            return
+        for key in entry[2]:
+            position = bisect_left(self.keys, (key, kind, pk))
+            if position < len(self.keys) and self.keys[position] == (key, kind, pk):
+                del self.keys[position]
+        self._memo.clear()
+
+    def suggest(self, prefix, limit):
+        """Top ``limit`` author and poem entries with a key starting with ``prefix``."""
+        memo_key = (prefix, limit)
+        if memo_key in self._memo:
+            return self._memo[memo_key]
+
+        matched = {'authors': set(), 'poems': set()}
+        for position in range(bisect_left(self.keys, (prefix,)), len(self.keys)):
+            key, kind, pk = self.keys[position]
+            if not key.startswith(prefix):
+                break
+            matched[kind].add(pk)
+
+        entries = self.entries
+        result = {
+            kind: [
+                entries[(kind, pk)][1]
+                for pk in heapq.nlargest(limit, pks, key=lambda pk: (entries[(kind, pk)][0], -pk))
+            ]
+            for kind, pks in matched.items()
+        }
+        if len(prefix) <= MEMO_PREFIX_LENGTH:
+            self._memo[memo_key] = result
+        return result
+
+
+def _author_rows(qs):
+    for pk, full_name, popularity in qs.values_list('id', 'full_name', 'popularity').iterator(chunk_size=2000):
+        data = {'id': pk, 'full_name': full_name, 'slug': slugify_fallback(full_name, 'author')}
+        yield 'authors', pk, full_name, popularity, data
+
+
+def _poem_rows(qs):
+    rows = qs.values_list('id', 'title', 'views', 'author_id', 'author__full_name').iterator(chunk_size=2000)
+    for pk, title, views, author_id, author_name in rows:
+        data = {
+            'id': pk,
+            'title': title,
+            'url_slug': f"{pk}-{slugify_fallback(title, 'poem')}",
+            'author': {'id': author_id, 'full_name': author_name},
+        }
+        yield 'poems', pk, title, views, data
+
+
+def build_suggest_index():
+    version = get_content_version()
+    rows = chain(_author_rows(Author.public.with_stats()), _poem_rows(Poem.public.all()))
+    return SuggestIndex.build(version, rows)
+
+
+def query_suggestions(prefix, limit):
+    """Answer ``prefix`` from the database, as ``SuggestIndex.suggest`` would, while no index is loaded."""
+    pattern = r'\m' + r'\W+'.join(re.escape(word) for word in prefix.split(' '))
+    authors = Author.public.with_stats().alias(folded_name=folded('full_name')).filter(folded_name__iregex=pattern)
+    poems = Poem.public.alias(folded_title=folded('title')).filter(folded_title__iregex=pattern)
+    return {
+        'authors': [row[4] for row in _author_rows(authors.order_by('-popularity', 'id')[:limit])],
+        'poems': [row[4] for row in _poem_rows(poems.order_by('-views', 'id')[:limit])],
+    }
+
+
+def load_suggest_changes(author_ids, poem_ids):
+    """Read the given authors and poems (and the poems of those authors) for ``apply_suggest_changes``.
+
+    Returns the public rows and the ``(kind, id)`` pairs to drop.
+    """
+    poem_filter = Q(id__in=poem_ids) | Q(author_id__in=author_ids)
+    poems = {row[1]: row for row in _poem_rows(Poem.public.filter(poem_filter))}
+    stale = set(poem_ids) | set(Poem.objects.filter(poem_filter).values_list('id', flat=True))
+    authors = {row[1]: row for row in _author_rows(Author.public.with_stats().filter(id__in=author_ids))}
+    hidden = [('poems', pk) for pk in stale - poems.keys()]
+    hidden += [('authors', pk) for pk in set(author_ids) - authors.keys()]
+    return [*poems.values(), *authors.values()], hidden
+
+
+def apply_suggest_changes(index, changes):
+    """Write rows read by ``load_suggest_changes`` into ``index``; runs no queries."""
+    rows, hidden = changes
+    for kind, pk in hidden:
+        index.remove(kind, pk)
+    for row in rows:
+        index.add(*row)
+
+
+class SuggestEngine(LiveIndex):
+    """Prefix index behind ``/search/suggest``; the database answers while it is built in the background."""
+
+    name = 'suggest-index'
+
+    def build(self):
+        return build_suggest_index()
+
+    def load(self, author_ids, poem_ids):
+        return load_suggest_changes(author_ids, poem_ids)
+
+    def apply(self, index, changes):
+        apply_suggest_changes(index, changes)
+
+    def suggest(self, q, limit=SUGGEST_LIMIT):
+        prefix = canonical_query(q)
+        if not prefix:
+            return {'authors': [], 'poems': []}
+        if self._index is None:
+            self.schedule_rebuild()
+            return query_suggestions(prefix, limit)
+        self.catch_up(get_content_version())
+        with self._lock.reading():
+            return self._index.suggest(prefix, limit)
+
+
+suggest_engine = SuggestEngine()
@@ -1,16 +1,40 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+from datetime import date
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
 from rest_framework.test import APIClient
 
-from apps.authors.models import Author
-from apps.poems.models import Poem
+from apps.authors.models import Author, AuthorStats
+from apps.poems.models import Poem, PoemLine, PoemMonthlyVisit
+from apps.poems.signals import CONTENT_VERSION_KEY, get_content_version
+from apps.search.memory_index import build_index, engine, save_snapshot
+from apps.search.models import PopularQuery
+from apps.search import popular
+from apps.search.popular import top_queries
+from apps.search.suggest import suggest_engine
+
+
+def isolate_query_counts(test):
+    """Count searches into a per-test buffer that no flusher thread writes out."""
+    for patcher in (mock.patch.dict(popular._buffer, clear=True), mock.patch.object(popular, 'ensure_flusher')):
+        patcher.start()
+        test.addCleanup(patcher.stop)
 
 
 class SearchTests(TestCase):
     def setUp(self):
+        cache.clear()
         self.client = APIClient()
         self.author = Author.objects.create(full_name='Рудаки')
         self.author2 = Author.objects.create(full_name='Мирзо Турсунзода')
         self.poem = Poem.objects.create(author=self.author, title='Весна', text='Весна пришла')
+        isolate_query_counts(self)
 
     def test_search_returns_authors_and_poems(self):
         res = self.client.get('/api/v1/search', {'q': 'Рудаки'})
@@ -29,3 +53,427 @@ class SearchTests(TestCase):
         res2 = self.client.get('/api/v1/search', {'q': 'Вес'})
         self.assertEqual(res2.status_code, 200)
         self.assertGreaterEqual(res2.data['poems']['count'], 1)
+
+    def test_search_matches_substring_inside_text(self):
+        res = self.client.get('/api/v1/search', {'q': 'ишл'})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual([row['id'] for row in res.data['poems']['results']], [self.poem.id])
+
+    def test_ilike_contains_escapes_wildcards(self):
+        Poem.objects.create(author=self.author, title='100% ишқ', text='—')
+        self.assertEqual(Poem.public.filter(title__ilike_contains='0%').count(), 1)
+        self.assertEqual(Poem.public.filter(title__ilike_contains='_').count(), 0)
+
+
+class SearchVectorTriggerTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        isolate_query_counts(self)
+        self.author = Author.objects.create(full_name='Рудаки')
+
+    def test_bulk_created_and_updated_rows_are_searchable(self):
+        Poem.objects.bulk_create([
+            Poem(author=self.author, title='Зимистон', text='Барф меборад', is_public=True),
+        ])
+        res = self.client.get('/api/v1/search', {'q': 'Зимистон'})
+        self.assertEqual(res.data['poems']['count'], 1)
+
+        Poem.objects.filter(title='Зимистон').update(title='Тирамоҳ')
+        res = self.client.get('/api/v1/search', {'q': 'Тирамоҳ'})
+        self.assertEqual(res.data['poems']['count'], 1)
+
+    def test_title_match_ranks_above_text_match(self):
+        in_text = Poem.objects.create(author=self.author, title='Шаб', text='Баҳор омад')
+        in_title = Poem.objects.create(author=self.author, title='Баҳор', text='Гул шукуфт')
+        res = self.client.get('/api/v1/search', {'q': 'Баҳор'})
+        ids = [row['id'] for row in res.data['poems']['results']]
+        self.assertEqual(ids, [in_title.id, in_text.id])
+
+    def test_partial_save_keeps_vector(self):
+        poem = Poem.objects.create(author=self.author, title='Дарё', text='Об')
+        poem.is_published = False
+        poem.save(update_fields=['is_published'])
+        poem.is_published = True
+        poem.save(update_fields=['is_published'])
+        res = self.client.get('/api/v1/search', {'q': 'Дарё'})
+        self.assertEqual([row['id'] for row in res.data['poems']['results']], [poem.id])
+
+
+@override_settings(SEARCH_BACKEND='memory')
+class MemorySearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.author = Author.objects.create(full_name='Мирзо Турсунзода')
+        self.spring = Poem.objects.create(author=self.author, title='Баҳор', text='Гул шукуфт')
+        self.night = Poem.objects.create(author=self.author, title='Шаб', text='Баҳор омад')
+        self.addCleanup(engine.invalidate)
+        isolate_query_counts(self)
+
+    def test_same_shape_as_postgres_backend(self):
+        engine.rebuild()
+        res = self.client.get('/api/v1/search', {'q': 'Баҳор', 'page_size': 1})
+        with override_settings(SEARCH_BACKEND='postgres'):
+            expected = self.client.get('/api/v1/search', {'q': 'Баҳор', 'page_size': 1})
+        self.assertEqual(res.data, expected.data)
+        self.assertEqual(res.data['poems']['count'], 2)
+        self.assertEqual([row['id'] for row in res.data['poems']['results']], [self.spring.id])
+
+    def test_prefix_and_tajik_letter_folding(self):
+        engine.rebuild()
+        res = self.client.get('/api/v1/search', {'q': 'турсунзо'})
+        self.assertEqual([row['id'] for row in res.data['authors']['results']], [self.author.id])
+        res = self.client.get('/api/v1/search', {'q': 'бахор шук'})
+        self.assertEqual([row['id'] for row in res.data['poems']['results']], [self.spring.id])
+
+    def test_falls_back_to_postgres_until_index_is_built(self):
+        with mock.patch.object(engine, 'schedule_rebuild') as build:
+            res = self.client.get('/api/v1/search', {'q': 'Шаб'})
+        build.assert_called_once()
+        self.assertEqual([row['id'] for row in res.data['poems']['results']], [self.night.id])
+
+    def test_content_changes_update_the_index_in_place(self):
+        engine.rebuild()
+        with mock.patch.object(engine, 'schedule_rebuild') as build:
+            with self.captureOnCommitCallbacks(execute=True):
+                added = Poem.objects.create(author=self.author, title='Тирамоҳ', text='Барг рехт')
+            with self.captureOnCommitCallbacks(execute=True):
+                self.spring.is_published = False
+                self.spring.save(update_fields=['is_published'])
+            added_res = self.client.get('/api/v1/search', {'q': 'тирамох'})
+            hidden_res = self.client.get('/api/v1/search', {'q': 'гул'})
+        build.assert_not_called()
+        self.assertEqual([row['id'] for row in added_res.data['poems']['results']], [added.id])
+        self.assertEqual(hidden_res.data['poems']['count'], 0)
+
+    def test_searches_share_the_index_lock(self):
+        engine.rebuild()
+        with engine._lock.reading():
+            res = self.client.get('/api/v1/search', {'q': 'бахор'})
+        self.assertEqual(res.data['poems']['count'], 2)
+
+    def test_snapshot_is_loaded_in_the_background(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'index.pickle')
+        save_snapshot(build_index(), path)
+
+        with override_settings(SEARCH_INDEX_SNAPSHOT=path):
+            with mock.patch('apps.search.live_index._build_in_background') as background:
+                self.assertIsNone(engine.search('бахор', 0, 10))
+            background.assert_called_once()
+            engine._finish_build()
+            with mock.patch('apps.search.memory_index.build_index') as from_database:
+                engine.rebuild()
+            from_database.assert_not_called()
+        self.assertEqual(engine.search('бахор', 0, 10)['poems'][0], 2)
+
+    def test_reset_content_version_rebuilds_the_index(self):
+        engine.rebuild()
+        cache.delete(CONTENT_VERSION_KEY)
+        self.assertGreater(get_content_version(), engine._index.version)
+        engine._index.version = get_content_version() + 1
+        with mock.patch.object(engine, 'schedule_rebuild') as build:
+            engine.catch_up(get_content_version())
+        build.assert_called_once()
+
+    def test_change_not_yet_logged_is_left_for_later(self):
+        engine.rebuild()
+        version = engine._index.version
+        cache.set(CONTENT_VERSION_KEY, version + 1, None)
+        with mock.patch.object(engine, 'schedule_rebuild') as build:
+            engine.catch_up(version + 1)
+        build.assert_not_called()
+        self.assertEqual(engine._index.version, version)
+
+    def test_replay_reads_rows_without_blocking_readers(self):
+        engine.rebuild()
+        load = engine.load
+
+        def unlocked_load(author_ids, poem_ids):
+            self.assertFalse(engine._lock.busy())
+            return load(author_ids, poem_ids)
+
+        with mock.patch.object(engine, 'load', side_effect=unlocked_load) as replay:
+            with self.captureOnCommitCallbacks(execute=True):
+                Poem.objects.create(author=self.author, title='Баҳори нав', text='Гул')
+        replay.assert_called_once()
+        res = self.client.get('/api/v1/search', {'q': 'бахор', 'page_size': 2})
+        self.assertEqual(res.data['poems']['count'], 3)
+        self.assertEqual(len(res.data['poems']['results']), 2)
+
+
+class SuggestTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.author = Author.objects.create(full_name='Мирзо Турсунзода')
+        self.quiet = Poem.objects.create(author=self.author, title='Баҳор', text='—', views=5)
+        self.popular = Poem.objects.create(author=self.author, title='Баҳори дил', text='—', views=50)
+        self.addCleanup(suggest_engine.invalidate)
+        schedule = mock.patch.object(suggest_engine, 'schedule_rebuild')
+        self.schedule_rebuild = schedule.start()
+        self.addCleanup(schedule.stop)
+
+    def suggest(self, q, **params):
+        res = self.client.get('/api/v1/search/suggest', {'q': q, **params})
+        self.assertEqual(res.status_code, 200)
+        return res.data
+
+    def test_prefix_of_any_word_ranked_by_popularity(self):
+        suggest_engine.rebuild()
+        data = self.suggest('бах')
+        self.assertEqual([row['id'] for row in data['poems']], [self.popular.id, self.quiet.id])
+        self.assertEqual(data['poems'][0]['url_slug'].split('-')[0], str(self.popular.id))
+        self.assertEqual([row['id'] for row in self.suggest('турсун')['authors']], [self.author.id])
+        self.assertEqual([row['id'] for row in self.suggest('бах', limit=1)['poems']], [self.popular.id])
+        self.assertEqual(self.suggest('  '), {'q': '  ', 'authors': [], 'poems': []})
+        self.assertEqual(len(self.suggest('бах', limit='²')['poems']), 2)
+
+    def test_cold_index_answers_from_the_database(self):
+        Author.objects.create(full_name='Баҳор Мирзо')
+        prefixes = ('бах', 'БАҲ', 'бахори д', 'турсун', 'т', 'мирзо т', 'хор')
+        cold = {q: self.suggest(q, limit=1 if q == 'т' else 5) for q in prefixes}
+        self.schedule_rebuild.assert_called()
+        self.assertFalse(suggest_engine.ready)
+
+        suggest_engine.rebuild()
+        for q in prefixes:
+            self.assertEqual(self.suggest(q, limit=1 if q == 'т' else 5), cold[q])
+        self.assertEqual([row['id'] for row in cold['бах']['poems']], [self.popular.id, self.quiet.id])
+
+    def test_rename_and_unpublish_update_the_index(self):
+        suggest_engine.rebuild()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.quiet.title = 'Тирамоҳ'
+            self.quiet.save()
+        self.assertEqual([row['id'] for row in self.suggest('тирамох')['poems']], [self.quiet.id])
+        self.assertEqual([row['id'] for row in self.suggest('бах')['poems']], [self.popular.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.author.is_published = False
+            self.author.save()
+            Poem.objects.filter(author=self.author).sync_is_public()
+        data = self.suggest('т')
+        self.assertEqual((data['authors'], data['poems']), ([], []))
+
+
+class SearchCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.author = Author.objects.create(full_name='Абулқосим Фирдавсӣ')
+        self.poem = Poem.objects.create(author=self.author, title='Баҳор', text='Гул шукуфт')
+        isolate_query_counts(self)
+
+    def test_query_variants_share_one_cached_page(self):
+        first = self.client.get('/api/v1/search', {'q': 'Фирдавсӣ'})
+        self.assertEqual([row['id'] for row in first.data['authors']['results']], [self.author.id])
+        with self.assertNumQueries(0):
+            for variant in ('фирдавси', '  ФИРДАВСӢ ', 'Фирдавси!'):
+                res = self.client.get('/api/v1/search', {'q': variant})
+                self.assertEqual(res.data, first.data)
+
+    def test_content_write_retires_cached_pages(self):
+        self.assertEqual(self.client.get('/api/v1/search', {'q': 'бахор'}).data['poems']['count'], 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            Poem.objects.create(author=self.author, title='Баҳори дил', text='—')
+        self.assertEqual(self.client.get('/api/v1/search', {'q': 'Баҳор'}).data['poems']['count'], 2)
+
+    def test_popular_queries_are_counted_and_warmed(self):
+        for q in ('Баҳор', 'бахор', 'Фирдавсӣ', 'баҳор'):
+            self.client.get('/api/v1/search', {'q': q})
+        self.client.get('/api/v1/search', {'q': 'Фирдавсӣ', 'page': 2})
+        self.assertFalse(PopularQuery.objects.exists())
+        popular.flush_buffer()
+        self.assertEqual(PopularQuery.objects.get(query='бахор').hits, 3)
+        self.assertEqual(top_queries(2), ['бахор', 'фирдавси'])
+
+        cache.clear()
+        call_command('warm_search_cache', hosts=['testserver'], stdout=StringIO())
+        with self.assertNumQueries(0):
+            self.client.get('/api/v1/search', {'q': 'Баҳор'})
+
+    @override_settings(PUBLIC_BASE_URL='')
+    def test_warmed_pages_are_kept_per_scheme(self):
+        Author.objects.filter(pk=self.author.pk).update(photo='authors/f.jpg')
+        PopularQuery.objects.create(query='фирдавси', hits=1)
+        call_command('warm_search_cache', hosts=['testserver'], schemes=['http'], stdout=StringIO())
+        res = self.client.get('/api/v1/search', {'q': 'Фирдавсӣ'}, secure=True)
+        self.assertEqual(res.data['authors']['results'][0]['photo_url'], 'https://testserver/media/authors/f.jpg')
+
+    def test_full_buffer_wakes_the_flusher_instead_of_writing_in_the_request(self):
+        self.addCleanup(popular._wake.clear)
+        with mock.patch.object(popular, 'MAX_BUFFERED_QUERIES', 2):
+            self.client.get('/api/v1/search', {'q': 'Баҳор'})
+            self.assertFalse(popular._wake.is_set())
+            self.client.get('/api/v1/search', {'q': 'Фирдавсӣ'})
+        self.assertTrue(popular._wake.is_set())
+        popular.ensure_flusher.assert_called()
+        self.assertFalse(PopularQuery.objects.exists())
+
+
+class SearchCountTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        author = Author.objects.create(full_name='Мирзо Турсунзода')
+        for number in range(5):
+            Poem.objects.create(author=author, title=f'Баҳор {number}', text='—')
+        isolate_query_counts(self)
+
+    def test_short_result_is_counted_from_the_page(self):
+        poems = self.client.get('/api/v1/search', {'q': 'бахор', 'page_size': 10}).data['poems']
+        self.assertEqual((poems['count'], poems['count_exact'], poems['has_more']), (5, True, False))
+
+    @override_settings(SEARCH_COUNT_CAP=3)
+    def test_capped_count_reports_a_lower_bound(self):
+        poems = self.client.get('/api/v1/search', {'q': 'бахор', 'page_size': 2}).data['poems']
+        self.assertEqual((poems['count'], poems['count_exact'], poems['has_more']), (3, False, True))
+        self.assertEqual(len(poems['results']), 2)
+
+        poems = self.client.get('/api/v1/search', {'q': 'бахор', 'page_size': 2, 'count': 'exact'}).data['poems']
+        self.assertEqual((poems['count'], poems['count_exact']), (5, True))
+
+    def test_estimated_count_is_never_below_the_page(self):
+        with mock.patch('apps.search.views.planner_estimate', return_value=1):
+            params = {'q': 'бахор', 'page': 2, 'page_size': 2, 'count': 'estimate'}
+            poems = self.client.get('/api/v1/search', params).data['poems']
+        self.assertEqual((poems['count'], poems['count_exact'], poems['has_more']), (5, False, True))
+
+    def test_unknown_count_mode_is_rejected(self):
+        self.assertEqual(self.client.get('/api/v1/search', {'q': 'бахор', 'count': 'all'}).status_code, 400)
+
+
+class PoemLineSearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.author = Author.objects.create(full_name='Лоиқ Шералӣ')
+        isolate_query_counts(self)
+
+    def _lines(self, poem):
+        return list(PoemLine.objects.filter(poem=poem).values_list('number', 'text'))
+
+    def test_lines_follow_poem_text(self):
+        poem = Poem.objects.create(author=self.author, title='Шаб', text='Якум\n\nДуюм\r\nСеюм  ')
+        self.assertEqual(self._lines(poem), [(1, 'Якум'), (2, 'Дуюм'), (3, 'Сеюм')])
+
+        Poem.objects.filter(pk=poem.pk).update(text='Нав')
+        self.assertEqual(self._lines(poem), [(1, 'Нав')])
+
+    def test_results_carry_matching_line_with_neighbours(self):
+        text = 'Якум\nДуюм\nБаҳори дил\nЧорум\nПанҷум'
+        poem = Poem.objects.create(author=self.author, title='Шаб', text=text)
+        result = self.client.get('/api/v1/search', {'q': 'бахори'}).data['poems']['results'][0]
+        self.assertEqual(result['id'], poem.id)
+        self.assertEqual(result['snippet'], {
+            'line': 3,
+            'lines': [
+                {'number': 2, 'text': 'Дуюм'},
+                {'number': 3, 'text': 'Баҳори дил'},
+                {'number': 4, 'text': 'Чорум'},
+            ],
+        })
+
+    def test_phrase_must_occur_within_one_line(self):
+        together = Poem.objects.create(author=self.author, title='Якум', text='Гули сурх\nДар боғ')
+        apart = Poem.objects.create(author=self.author, title='Дуюм', text='Гули зард\nСурх аст')
+        res = self.client.get('/api/v1/search', {'q': 'гули сурх'})
+        self.assertEqual({row['id'] for row in res.data['poems']['results']}, {together.id, apart.id})
+
+        res = self.client.get('/api/v1/search', {'q': 'гули сурх', 'phrase': '1'})
+        self.assertEqual([row['id'] for row in res.data['poems']['results']], [together.id])
+        self.assertEqual(res.data['poems']['results'][0]['snippet']['line'], 1)
+
+
+class SearchTypesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.author = Author.objects.create(full_name='Баҳор Мирзо')
+        self.poem = Poem.objects.create(author=self.author, title='Баҳор', text='Гул шукуфт')
+        isolate_query_counts(self)
+
+    def test_single_type_endpoints_query_only_their_section(self):
+        with mock.patch('apps.search.views.serialize_authors') as serialize_authors:
+            res = self.client.get('/api/v1/search/poems', {'q': 'бахор', 'page_size': 5})
+        serialize_authors.assert_not_called()
+        self.assertEqual([row['id'] for row in res.data['results']], [self.poem.id])
+        self.assertEqual(res.data['page_size'], 5)
+
+        res = self.client.get('/api/v1/search/authors', {'q': 'бахор'})
+        self.assertEqual([row['id'] for row in res.data['results']], [self.author.id])
+
+    def test_paired_section_fetches_count_the_query_once(self):
+        with mock.patch('apps.search.views.record_query') as record:
+            self.client.get('/api/v1/search/authors', {'q': 'бахор', 'record': '1'})
+            self.client.get('/api/v1/search/poems', {'q': 'бахор'})
+            self.client.get('/api/v1/search/authors', {'q': 'бахор'})
+        record.assert_called_once()
+
+    def test_types_limits_combined_sections(self):
+        res = self.client.get('/api/v1/search', {'q': 'бахор', 'types': 'poems'})
+        self.assertEqual(set(res.data), {'poems'})
+        res = self.client.get('/api/v1/search', {'q': 'бахор', 'types': 'poems,users'})
+        self.assertEqual(res.status_code, 400)
+
+    def test_sections_share_cache_entries(self):
+        combined = self.client.get('/api/v1/search', {'q': 'бахор'}).data
+        with self.assertNumQueries(0):
+            res = self.client.get('/api/v1/search/poems', {'q': 'Баҳор'})
+        self.assertEqual(res.data, combined['poems'])
+
+    def test_cursor_pages_one_section(self):
+        res = self.client.get('/api/v1/search/poems', {'q': 'бахор', 'cursor': ''})
+        self.assertEqual([row['id'] for row in res.data['results']], [self.poem.id])
+        self.assertIsNone(res.data['next_cursor'])
+
+
+class SearchBenchmarkTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.labels = os.path.join(directory.name, 'labels.json')
+
+    def test_corpus_labels_point_at_planted_poems_and_named_authors(self):
+        call_command('generate_search_corpus', poems=60, authors=10, labels=self.labels, stdout=StringIO())
+        with open(self.labels, encoding='utf-8') as handle:
+            targets = json.load(handle)['targets']
+        self.assertEqual(Poem.objects.count(), 60)
+
+        for target, expected in targets.items():
+            if expected['section'] == 'authors':
+                names = Author.objects.filter(id__in=expected['ids']).values_list('full_name', flat=True)
+                self.assertEqual(list(names), [target])
+            else:
+                self.assertEqual(len(expected['ids']), 10)
+                self.assertFalse(Poem.objects.filter(id__in=expected['ids']).exclude(text__contains=target).exists())
+
+        out = StringIO()
+        call_command('benchmark_search', labels=self.labels, repeat=2, stdout=out)
+        self.assertIn("'муҳаб' [prefix]", out.getvalue())
+        self.assertIn('name: mean recall@10', out.getvalue())
+
+    def test_generated_corpus_reaches_a_ready_suggest_index(self):
+        suggest_engine.rebuild()
+        self.addCleanup(suggest_engine.invalidate)
+        with mock.patch.object(suggest_engine, 'schedule_rebuild', side_effect=suggest_engine.rebuild) as build:
+            with self.captureOnCommitCallbacks(execute=True):
+                call_command('generate_search_corpus', poems=20, authors=10, labels=self.labels, stdout=StringIO())
+            res = APIClient().get('/api/v1/search/suggest', {'q': 'турсунзода'})
+        build.assert_called_once()
+        self.assertEqual([row['full_name'] for row in res.data['authors']], ['Мирзо Турсунзода'])
+
+    def test_force_clears_the_corpus_without_per_row_work(self):
+        call_command('generate_search_corpus', poems=20, authors=5, labels=self.labels, stdout=StringIO())
+        poem = Poem.objects.first()
+        PoemMonthlyVisit.objects.create(poem=poem, month_start=date(2026, 10, 1), visits_count=1)
+        with mock.patch('apps.authors.stats.refresh_author_stats') as per_row_stats:
+            call_command('generate_search_corpus', poems=30, authors=6, labels=self.labels, force=True, stdout=StringIO())
+        per_row_stats.assert_not_called()
+        self.assertEqual((Author.objects.count(), Poem.objects.count()), (6, 30))
+        self.assertEqual(AuthorStats.objects.count(), 6)
+        self.assertFalse(PoemMonthlyVisit.objects.exists())
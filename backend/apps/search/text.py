@@ -0,0 +1,31 @@
+import re
+import unicodedata
+
+from django.db.models import F, Func, Value
+
+
+# Tajik letters that are routinely typed as their Russian-keyboard look-alikes.
+TAJIK_FOLD_FROM = 'ӢӮҲҚҒҶЁӣӯҳқғҷё'
+TAJIK_FOLD_TO = 'ИУХКГЧЕиухкгче'
+TAJIK_FOLD = str.maketrans(TAJIK_FOLD_FROM, TAJIK_FOLD_TO)
+
+WORD_RE = re.compile(r'\w+', flags=re.U)
+
+
+def normalize(text):
+    """Lowercase, NFC-compose and fold Tajik-specific letters to their plain Cyrillic forms."""
+    return unicodedata.normalize('NFC', text).lower().translate(TAJIK_FOLD)
+
+
+def tokenize(text):
+    return WORD_RE.findall(normalize(text))
+
+
+def canonical_query(q):
+    """Cache and statistics key of a query: its normalized tokens joined by single spaces."""
+    return ' '.join(tokenize(q))
+
+
+def folded(field):
+    """SQL counterpart of the Tajik letter folding in ``normalize`` for a column."""
+    return Func(F(field), Value(TAJIK_FOLD_FROM), Value(TAJIK_FOLD_TO), function='TRANSLATE')
@@ -1,7 +1,10 @@
 from django.urls import path
 
-from .views import SearchView
+from .views import SearchAuthorsView, SearchPoemsView, SearchView, SuggestView
 
 urlpatterns = [
     path('search', SearchView.as_view(), name='search'),
+    path('search/authors', SearchAuthorsView.as_view(), name='search-authors'),
+    path('search/poems', SearchPoemsView.as_view(), name='search-poems'),
+    path('search/suggest', SuggestView.as_view(), name='search-suggest'),
 ]
@@ -1,96 +1,281 @@
-import re
+import logging
 
-from django.db.models import Count, F, Q, Sum
-from django.db.models.functions import Coalesce, Greatest
-from django.contrib.postgres.search import SearchQuery, SearchRank
-from django.contrib.postgres.search import TrigramSimilarity
+from django.conf import settings
+from django.db.models import DecimalField
+from django.db.models.functions import Cast
+from django.utils.cache import patch_cache_control
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from config.throttling import SearchRateThrottle
+from config.pagination import capped_count, decode_cursor, encode_cursor, keyset_paginate, planner_estimate
+from config.throttling import SearchRateThrottle, SuggestRateThrottle
 from apps.authors.models import Author
-from apps.authors.serializers import AuthorSerializer
+from apps.authors.serializers import AUTHOR_VALUES, serialize_authors
 from apps.poems.models import Poem
-from apps.poems.serializers import PoemListSerializer
+from apps.poems.response_cache import GLOBAL, cached_data
+from apps.poems.serializers import POEM_LIST_VALUES, serialize_poem_list
+from . import memory_index
+from .popular import record_query
+from .queries import build_search_querysets
+from .snippets import line_snippets
+from .suggest import SUGGEST_LIMIT, SUGGEST_MAX_LIMIT, suggest_engine
+from .text import canonical_query
+
+
+logger = logging.getLogger(__name__)
+
+SEARCH_CACHE_MAX_QUERY_LENGTH = 100
+
+
+def _rows_in_order(qs, ids):
+    rows = {row['id']: row for row in qs.filter(id__in=ids)}
+    return [rows[pk] for pk in ids if pk in rows]
+
+
+COUNT_MODES = ('capped', 'estimate', 'exact')
+SEARCH_TYPES = ('authors', 'poems')
+
+
+def _section(count, page, page_size, results, count_exact=True, has_more=False):
+    return {
+        'count': count,
+        'count_exact': count_exact,
+        'has_more': has_more,
+        'page': page,
+        'page_size': page_size,
+        'results': results,
+    }
+
+
+def _poem_results(rows, q, phrase=False):
+    """Poem list entries plus the matching line and its neighbours as ``snippet``."""
+    results = serialize_poem_list(rows)
+    snippets = line_snippets([row['id'] for row in results], q, phrase)
+    for row in results:
+        row['snippet'] = snippets.get(row['id'])
+    return results
+
+
+def _memory_page(request, q, page, page_size, types):
+    """Serve a page from the in-process index, or None to fall back to PostgreSQL."""
+    offset = (page - 1) * page_size
+    try:
+        found = memory_index.engine.search(q, offset, page_size, kinds=types)
+    except Exception:
+        logger.exception('In-memory search failed, falling back to PostgreSQL')
+        return None
+    if found is None:
+        return None
+
+    payload = {}
+    if 'authors' in found:
+        total, ids = found['authors']
+        authors = _rows_in_order(Author.public.with_stats().values(*AUTHOR_VALUES), ids)
+        payload['authors'] = _section(
+            total, page, page_size, serialize_authors(authors, request),
+            has_more=offset + len(ids) < total,
+        )
+    if 'poems' in found:
+        total, ids = found['poems']
+        poems = _rows_in_order(Poem.public.values(*POEM_LIST_VALUES), ids)
+        payload['poems'] = _section(
+            total, page, page_size, _poem_results(poems, q),
+            has_more=offset + len(ids) < total,
+        )
+    return payload
+
+
+def _count(qs, count_mode, offset, fetched, has_more):
+    """Return ``(count, exact)`` for a page of ``fetched`` rows at ``offset``.
+
+    A short page already gives the exact total. Otherwise ``capped`` counts at most
+    ``SEARCH_COUNT_CAP + 1`` rows, ``estimate`` asks the planner and ``exact`` runs COUNT(*).
+    """
+    if count_mode == 'exact':
+        return qs.count(), True
+    if not has_more and (fetched or not offset):
+        return offset + fetched, True
+    if count_mode == 'estimate':
+        count, exact = planner_estimate(qs), False
+    else:
+        count, exact = capped_count(qs, settings.SEARCH_COUNT_CAP)
+    return max(count, offset + fetched + int(has_more)), exact
+
+
+def build_search_page(request, q, page, page_size, count_mode='capped', phrase=False, types=SEARCH_TYPES):
+    """Search results of the requested ``types`` for the canonical query ``q``.
+
+    Only the requested sections are queried. Phrase searches need line positions,
+    which only PostgreSQL has.
+    """
+    if settings.SEARCH_BACKEND == 'memory' and not phrase:
+        payload = _memory_page(request, q, page, page_size, types)
+        if payload is not None:
+            return payload
+
+    authors_qs, poems_qs = build_search_querysets(q, phrase)
+    offset = (page - 1) * page_size
+
+    def paginate(qs, serialize):
+        # One extra row tells whether another page exists without counting.
+        rows = list(qs[offset: offset + page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        count, exact = _count(qs, count_mode, offset, len(rows), has_more)
+        return _section(count, page, page_size, serialize(rows), count_exact=exact, has_more=has_more)
+
+    payload = {}
+    if 'authors' in types:
+        payload['authors'] = paginate(
+            authors_qs.values(*AUTHOR_VALUES), lambda rows: serialize_authors(rows, request),
+        )
+    if 'poems' in types:
+        payload['poems'] = paginate(
+            poems_qs.values(*POEM_LIST_VALUES), lambda rows: _poem_results(rows, q, phrase),
+        )
+    return payload
+
+
+def search_page(request, q, page, page_size, count_mode='capped', phrase=False, types=SEARCH_TYPES):
+    """``build_search_page`` behind a short-lived cache keyed by the canonical query.
+
+    Each section is cached on its own, so the combined and the single-type endpoints
+    share entries. Entries depend on the global content version, so any write retires
+    them; only the first pages of reasonably short queries are cached to bound the key space.
+    """
+    if page > settings.SEARCH_CACHE_MAX_PAGE or len(q) > SEARCH_CACHE_MAX_QUERY_LENGTH:
+        return build_search_page(request, q, page, page_size, count_mode, phrase, types)
+    mode = 'phrase' if phrase else 'words'
+
+    def build(name):
+        return build_search_page(request, q, page, page_size, count_mode, phrase, (name,))[name], ()
+
+    return {
+        name: cached_data(
+            request,
+            lambda: build(name),
+            deps=(GLOBAL,),
+            name=f'search:{settings.SEARCH_BACKEND}:{name}:{mode}:{count_mode}:{q}:{page}:{page_size}',
+            ttl=settings.SEARCH_CACHE_TTL,
+        )
+        for name in types
+    }
 
 
 class SearchView(APIView):
+    """Authors and poems matching ``q``; ``?types=`` limits the sections that are searched."""
+
     throttle_classes = [SearchRateThrottle]
+    # Set by the single-type endpoints, which answer with that section alone.
+    section = None
 
     def get(self, request):
-        q = request.query_params.get('q', '').strip()
+        q = canonical_query(request.query_params.get('q', ''))
         page = int(request.query_params.get('page', 1))
         page_size = int(request.query_params.get('page_size', 25))
+        count_mode = request.query_params.get('count', 'capped')
+        phrase = request.query_params.get('phrase') == '1'
+        if count_mode not in COUNT_MODES:
+            return Response({'detail': f"count must be one of: {', '.join(COUNT_MODES)}"}, status=400)
+        if self.section:
+            types = (self.section,)
+        else:
+            requested = {name for name in request.query_params.get('types', '').split(',') if name}
+            if requested - set(SEARCH_TYPES):
+                return Response({'detail': f"types must be a subset of: {', '.join(SEARCH_TYPES)}"}, status=400)
+            types = tuple(name for name in SEARCH_TYPES if name in requested) or SEARCH_TYPES
 
         if not q:
-            return Response({
-                'authors': {'count': 0, 'page': page, 'page_size': page_size, 'results': []},
-                'poems': {'count': 0, 'page': page, 'page_size': page_size, 'results': []},
-            })
-
-        tokens = re.findall(r"[\w']+", q, flags=re.U)
-        if not tokens:
-            return Response({
-                'authors': {'count': 0, 'page': page, 'page_size': page_size, 'results': []},
-                'poems': {'count': 0, 'page': page, 'page_size': page_size, 'results': []},
-            })
-
-        raw_query = ' & '.join([f'{token}:*' for token in tokens])
-        query = SearchQuery(raw_query, search_type='raw', config='simple')
-
-        authors_qs = Author.objects.filter(deleted_at__isnull=True, is_published=True).annotate(
-            rank=SearchRank(F('search_vector'), query),
-            similarity=TrigramSimilarity('full_name', q),
-            poems_count=Count(
-                'poems',
-                filter=Q(poems__deleted_at__isnull=True, poems__is_published=True),
-                distinct=True,
-            ),
-            popularity=Coalesce(
-                Sum('poems__views', filter=Q(poems__deleted_at__isnull=True, poems__is_published=True)),
-                0,
-            ),
-        ).filter(
-            Q(search_vector=query)
-            | Q(full_name__icontains=q)
-            | Q(full_name__trigram_similar=q)
-        ).order_by('-rank', '-similarity', '-popularity')
-
-        poems_qs = Poem.objects.filter(
-            deleted_at__isnull=True,
-            is_published=True,
-            author__deleted_at__isnull=True,
-            author__is_published=True,
-        ).select_related('author').annotate(
-            rank=SearchRank(F('search_vector'), query),
-            similarity=Greatest(TrigramSimilarity('title', q), TrigramSimilarity('text', q)),
-        ).filter(
-            Q(search_vector=query)
-            | Q(title__icontains=q)
-            | Q(text__icontains=q)
-            | Q(title__trigram_similar=q)
-        ).order_by('-rank', '-similarity', '-views')
-
-        def paginate(qs):
-            total = qs.count()
-            offset = (page - 1) * page_size
-            items = qs[offset: offset + page_size]
-            return items, total
-
-        authors_page, authors_total = paginate(authors_qs)
-        poems_page, poems_total = paginate(poems_qs)
-
-        return Response({
-            'authors': {
-                'count': authors_total,
-                'page': page,
-                'page_size': page_size,
-                'results': AuthorSerializer(authors_page, many=True, context={'request': request}).data,
-            },
-            'poems': {
-                'count': poems_total,
-                'page': page,
-                'page_size': page_size,
-                'results': PoemListSerializer(poems_page, many=True, context={'request': request}).data,
-            },
-        })
+            payload = {name: _section(0, page, page_size, []) for name in types}
+        elif 'cursor' in request.query_params:
+            payload = self._cursor_page(request, q, phrase, types, page_size)
+        else:
+            # The single-type endpoints are fetched in pairs, so only the one marked ``record``
+            # counts the query.
+            if page == 1 and (not self.section or request.query_params.get('record') == '1'):
+                record_query(q)
+            payload = search_page(request, q, page, page_size, count_mode, phrase, types)
+
+        if self.section:
+            section = payload[self.section]
+            if 'next_cursor' in payload:
+                section = {**section, 'next_cursor': payload['next_cursor']}
+            return Response(section)
+        return Response(payload)
+
+    def _cursor_page(self, request, q, phrase, types, page_size):
+        # ``rank``/``similarity`` are float4 and do not round-trip through JSON exactly,
+        # so seek on fixed-precision copies of them.
+        def seekable(qs, tiebreak, fields):
+            return qs.annotate(
+                rank_key=Cast('rank', DecimalField(max_digits=12, decimal_places=8)),
+                similarity_key=Cast('similarity', DecimalField(max_digits=12, decimal_places=8)),
+            ).order_by('-rank_key', '-similarity_key', tiebreak).values(*fields, 'rank_key', 'similarity_key')
+
+        token = request.query_params.get('cursor')
+        if token:
+            positions = decode_cursor(token)
+            if len(positions) != 2:
+                raise ValidationError('Invalid cursor.')
+        else:
+            positions = ['', '']
+        # Sections that were not asked for are never queried.
+        positions = [position if name in types else None for name, position in zip(SEARCH_TYPES, positions)]
+
+        def authors_data(rows):
+            return serialize_authors(rows, request)
+
+        def poems_data(rows):
+            return _poem_results(rows, q, phrase)
+
+        authors_qs, poems_qs = build_search_querysets(q, phrase)
+        sections = {}
+        next_positions = []
+        for name, qs, tiebreak, fields, serialize, position in (
+            ('authors', authors_qs, '-popularity', AUTHOR_VALUES, authors_data, positions[0]),
+            ('poems', poems_qs, '-views', POEM_LIST_VALUES, poems_data, positions[1]),
+        ):
+            if position is None:
+                items, next_cursor = [], None
+            else:
+                items, next_cursor = keyset_paginate(seekable(qs, tiebreak, fields), position, page_size)
+            if name in types:
+                sections[name] = {
+                    'page_size': page_size,
+                    'has_next': next_cursor is not None,
+                    'results': serialize(items),
+                }
+            next_positions.append(next_cursor)
+
+        has_next = any(next_positions)
+        return {
+            **sections,
+            'next_cursor': encode_cursor(next_positions) if has_next else None,
+            'has_next': has_next,
+        }
+
+
+class SearchAuthorsView(SearchView):
+    section = 'authors'
+
+
+class SearchPoemsView(SearchView):
+    section = 'poems'
+
+
+class SuggestView(APIView):
+    """Typeahead: top author names and poem titles starting with ``q``, served from memory."""
+
+    throttle_classes = [SuggestRateThrottle]
+
+    def get(self, request):
+        q = request.query_params.get('q', '')
+        try:
+            limit = int(request.query_params.get('limit', ''))
+        except ValueError:
+            limit = SUGGEST_LIMIT
+        limit = min(limit, SUGGEST_MAX_LIMIT) if limit > 0 else SUGGEST_LIMIT
+        response = Response({'q': q, **suggest_engine.suggest(q, limit)})
+        patch_cache_control(response, public=True, max_age=60)
+        return response
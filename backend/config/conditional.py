@@ -0,0 +1,36 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+
+def make_etag(*parts):
+    digest = hashlib.sha1(':'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+    return f'W/{quote_etag(digest[:32])}'
+
+
+def latest(*timestamps):
+    present = [value for value in timestamps if value is not None]
+    return max(present) if present else None
+
+
+def not_modified(request, etag, last_modified=None):
+    """Return a 304 response when the request's validators still match, otherwise None.
+
+    ``If-None-Match`` wins over ``If-Modified-Since``, so callers put everything that
+    changes the body (including counters without a timestamp) into ``etag``.
+    """
+    return get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+
+
+def with_validators(response, etag, last_modified=None, **cache_control):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    if cache_control:
+        patch_cache_control(response, **cache_control)
+    return response
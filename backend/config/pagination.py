@@ -0,0 +1,185 @@
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from django.db.models.constants import LOOKUP_SEP
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+
+
+def encode_cursor(values):
+    def default(value):
+        if isinstance(value, (date, datetime)):
+            return value.isoformat()
+        if isinstance(value, Decimal):
+            return str(value)
+        raise TypeError(f'Cannot encode {type(value).__name__} in a cursor')
+
+    raw = json.dumps(values, default=default, separators=(',', ':'), ensure_ascii=False)
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+    except (TypeError, ValueError, UnicodeError):
+        raise ValidationError('Invalid cursor.')
+    if not isinstance(values, list):
+        raise ValidationError('Invalid cursor.')
+    return values
+
+
+# Keyset ("seek") pagination: the cursor is the sort key of the last row served, so
+# every page is an index range scan from that position instead of OFFSET + COUNT(*).
+# Orderings must name fields or annotations; ``id`` is appended as a tiebreaker. NULL
+# sort keys follow PostgreSQL's default placement: last ascending, first descending.
+
+
+def keyset_ordering(qs):
+    """Ordering of ``qs`` with a trailing ``id`` tiebreaker so every row has a unique position."""
+    ordering = list(qs.query.order_by or qs.model._meta.ordering or [])
+    if not all(isinstance(field, str) and field != '?' for field in ordering):
+        raise ValidationError('Cursor pagination is not available for this ordering.')
+    if not any(field.lstrip('-') in ('id', 'pk') for field in ordering):
+        descending = bool(ordering) and ordering[0].startswith('-')
+        ordering.append('-id' if descending else 'id')
+    return ordering
+
+
+def _sort_field(qs, name):
+    """Return ``(field, nullable)`` for the field or annotation ``name`` of ``qs``."""
+    annotation = qs.query.annotations.get(name)
+    if annotation is not None:
+        target = getattr(annotation, 'target', None)
+        if target is not None:
+            return target, target.null
+        return annotation.output_field, False
+    model, nullable = qs.model, False
+    *relations, name = name.split(LOOKUP_SEP)
+    for part in relations:
+        relation = model._meta.get_field(part)
+        nullable = nullable or relation.null
+        model = relation.related_model
+    field = model._meta.pk if name == 'pk' else model._meta.get_field(name)
+    return field, nullable or field.null
+
+
+def _cursor_values(sort_fields, values):
+    """Convert decoded cursor values to the Python types of their sort fields."""
+    if len(values) != len(sort_fields):
+        raise ValidationError('Invalid cursor.')
+    converted = []
+    for (field, nullable), value in zip(sort_fields, values):
+        if value is None:
+            if not nullable:
+                raise ValidationError('Invalid cursor.')
+            converted.append(None)
+            continue
+        try:
+            converted.append(field.to_python(value))
+        except (DjangoValidationError, TypeError, ValueError):
+            raise ValidationError('Invalid cursor.')
+    return converted
+
+
+def _equal(name, value):
+    return Q(**{f'{name}__isnull': True}) if value is None else Q(**{name: value})
+
+
+def _after(ordering, values, nullable=frozenset()):
+    condition = Q()
+    for index, field in enumerate(ordering):
+        name = field.lstrip('-')
+        descending = field.startswith('-')
+        value = values[index]
+        if value is None:
+            # Nothing sorts after NULL ascending; descending, every non-NULL value does.
+            if not descending:
+                continue
+            step = Q(**{f'{name}__isnull': False})
+        else:
+            step = Q(**{f'{name}__{"lt" if descending else "gt"}': value})
+            if not descending and name in nullable:
+                step |= Q(**{f'{name}__isnull': True})
+        for prev_field, prev_value in zip(ordering[:index], values[:index]):
+            step &= _equal(prev_field.lstrip('-'), prev_value)
+        condition |= step
+    return condition
+
+
+def _position(obj, ordering):
+    if isinstance(obj, dict):
+        return [obj[field.lstrip('-')] for field in ordering]
+    values = []
+    for field in ordering:
+        value = obj
+        for part in field.lstrip('-').split('__'):
+            value = getattr(value, part)
+        values.append(value)
+    return values
+
+
+def cursor_payload(items, page_size, next_cursor):
+    return {
+        'page_size': page_size,
+        'next_cursor': next_cursor,
+        'has_next': next_cursor is not None,
+        'results': items,
+    }
+
+
+def keyset_paginate(qs, cursor, page_size):
+    """Return ``(items, next_cursor)`` for the page after ``cursor`` without running COUNT."""
+    ordering = keyset_ordering(qs)
+    qs = qs.order_by(*ordering)
+    if cursor:
+        sort_fields = [_sort_field(qs, field.lstrip('-')) for field in ordering]
+        values = _cursor_values(sort_fields, decode_cursor(cursor))
+        nullable = {field.lstrip('-') for field, (_, null) in zip(ordering, sort_fields) if null}
+        qs = qs.filter(_after(ordering, values, nullable))
+    items = list(qs[: page_size + 1])
+    if len(items) <= page_size:
+        return items, None
+    items = items[:page_size]
+    return items, encode_cursor(_position(items[-1], ordering))
+
+
+def capped_count(qs, cap):
+    """Return ``(count, exact)``, counting at most ``cap + 1`` rows of ``qs``."""
+    counted = qs.order_by().values('pk')[: cap + 1].count()
+    return (counted, True) if counted <= cap else (cap, False)
+
+
+def planner_estimate(qs):
+    """Row count the PostgreSQL planner expects ``qs`` to return; no rows are read."""
+    plan = json.loads(qs.order_by().explain(format='json'))
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class KeysetOrPageNumberPagination(PageNumberPagination):
+    """Page-number pagination that switches to keyset mode when ``?cursor=`` is present."""
+
+    cursor_query_param = 'cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.cursor_query_param in request.query_params
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+        self.request = request
+        self.page_size_value = self.get_page_size(request)
+        items, self.next_cursor = keyset_paginate(
+            queryset,
+            request.query_params.get(self.cursor_query_param),
+            self.page_size_value,
+        )
+        return items
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response(cursor_payload(data, self.page_size_value, self.next_cursor))
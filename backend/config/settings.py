@@ -122,7 +122,7 @@ CSRF_TRUSTED_ORIGINS = sorted(
 
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'config.pagination.KeysetOrPageNumberPagination',
     'PAGE_SIZE': 25,
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
@@ -133,6 +133,7 @@ REST_FRAMEWORK = {
         'reactions': '20/min',
         'views': '60/min',
         'search': '30/min',
+        'suggest': '300/min',
     },
 }
 
@@ -143,17 +144,52 @@ SPECTACULAR_SETTINGS = {
     'SERVE_INCLUDE_SCHEMA': False,
 }
 
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'shoieron-cache',
+CACHE_URL = os.environ.get('DJANGO_CACHE_URL', '')
+if CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+            'KEY_PREFIX': 'shoieron',
+        }
     }
-}
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'shoieron-cache',
+        }
+    }
+
+HOME_CACHE_TTL = int(os.environ.get('HOME_CACHE_TTL', '60'))
+HOME_CACHE_STALE_TTL = int(os.environ.get('HOME_CACHE_STALE_TTL', '86400'))
+HOME_CACHE_LOCK_TTL = 30
+HOME_CACHE_LOCK_WAIT = 2.0
+RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL', '300'))
+# How long each content change stays replayable by in-process indexes and pools.
+CONTENT_CHANGE_LOG_TTL = int(os.environ.get('CONTENT_CHANGE_LOG_TTL', '86400'))
+
+# 'postgres' or 'memory' (in-process inverted index, falling back to PostgreSQL until it is loaded).
+SEARCH_BACKEND = os.environ.get('SEARCH_BACKEND', 'postgres')
+SEARCH_INDEX_SNAPSHOT = os.environ.get('SEARCH_INDEX_SNAPSHOT', '')
+SEARCH_CACHE_TTL = int(os.environ.get('SEARCH_CACHE_TTL', '30'))
+SEARCH_CACHE_MAX_PAGE = 3
+SEARCH_COUNT_CAP = int(os.environ.get('SEARCH_COUNT_CAP', '1000'))
+SEARCH_POPULAR_FLUSH_INTERVAL = float(os.environ.get('SEARCH_POPULAR_FLUSH_INTERVAL', '10'))
 
 SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
 SESSION_COOKIE_SECURE = os.environ.get('DJANGO_SESSION_COOKIE_SECURE', '0') == '1'
 CSRF_COOKIE_SECURE = os.environ.get('DJANGO_CSRF_COOKIE_SECURE', '0') == '1'
 
+POEM_VIEWS_MODE = os.environ.get('POEM_VIEWS_MODE', 'sync')
+POEM_VIEWS_FLUSH_INTERVAL = float(os.environ.get('POEM_VIEWS_FLUSH_INTERVAL', '5'))
+POEM_VIEWS_FLUSH_BATCH = int(os.environ.get('POEM_VIEWS_FLUSH_BATCH', '5000'))
+# Poems with pending views before the flusher is woken early.
+POEM_VIEWS_MAX_PENDING = int(os.environ.get('POEM_VIEWS_MAX_PENDING', '10000'))
+
+RANDOM_NO_REPEAT_WINDOW = int(os.environ.get('RANDOM_NO_REPEAT_WINDOW', '0'))
+RANDOM_NO_REPEAT_TTL = int(os.environ.get('RANDOM_NO_REPEAT_TTL', '3600'))
+
 DASHBOARD_TEMP_PASSWORD_TTL_MINUTES = int(os.environ.get('DASHBOARD_TEMP_PASSWORD_TTL_MINUTES', '60'))
 
 EMAIL_BACKEND = os.environ.get('DJANGO_EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
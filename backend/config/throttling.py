@@ -21,6 +21,10 @@ class SearchRateThrottle(UserHashRateThrottle):
     scope = 'search'
 
 
+class SuggestRateThrottle(UserHashRateThrottle):
+    scope = 'suggest'
+
+
 class ViewRateThrottle(SimpleRateThrottle):
     scope = 'views'
 
@@ -1,4 +1,5 @@
 import hashlib
+from functools import lru_cache
 
 
 def get_client_ip(request):
@@ -19,6 +20,20 @@ def get_user_hash(request):
     return hashlib.sha256(raw.encode('utf-8')).hexdigest()
 
 
+def parse_ids(raw):
+    """Distinct positive integer ids from a comma-separated string, in order; other parts are skipped."""
+    ids = []
+    for part in raw.split(','):
+        try:
+            pk = int(part)
+        except ValueError:
+            continue
+        if pk > 0:
+            ids.append(pk)
+    return list(dict.fromkeys(ids))
+
+
+@lru_cache(maxsize=8192)
 def slugify_fallback(value, fallback):
     try:
         from django.utils.text import slugify
@@ -0,0 +1,29 @@
+import time
+
+from django.core.cache import cache
+
+
+def get_versions(keys):
+    """Current values of the given version keys in one round trip.
+
+    Missing counters are seeded with a clock value rather than a constant, so a counter
+    that was evicted never comes back with a value some cached entry already recorded.
+    """
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        seed = time.time_ns()
+        for key in missing:
+            cache.add(key, seed, None)
+        versions.update(cache.get_many(missing))
+    return versions
+
+
+def bump_version(key):
+    """Move the counter at ``key`` forward and return it, reseeding it from the clock when it was evicted."""
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = time.time_ns()
+        cache.set(key, version, None)
+        return version
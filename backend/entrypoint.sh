@@ -18,4 +18,13 @@ if [ -n "${DJANGO_SUPERUSER_USERNAME}" ] && [ -n "${DJANGO_SUPERUSER_PASSWORD}"
   python manage.py bootstrap_admin
 fi
 
+if [ "${POEM_VIEWS_MODE}" = "buffered" ]; then
+  python manage.py runserver 0.0.0.0:8000 &
+  server_pid=$!
+  trap 'kill -TERM "$server_pid" 2>/dev/null; wait "$server_pid"; python manage.py flush_poem_views; exit 0' TERM INT
+  wait "$server_pid"
+  python manage.py flush_poem_views
+  exit 0
+fi
+
 python manage.py runserver 0.0.0.0:8000
@@ -55,13 +55,11 @@ export default async function AuthorPage({
     notFound();
   }
 
-  const author = await apiFetch(`/api/v1/authors/${id}`, { revalidate: 60 });
-  const poemsPage = await apiFetch(`/api/v1/authors/${id}/poems?page=1&page_size=25`, {
-    cache: 'no-store',
-  });
-  const randomAuthors = await apiFetch(`/api/v1/authors/random?limit=5&exclude=${id}`, {
-    revalidate: 60,
-  });
+  const {
+    author,
+    poems: poemsPage,
+    other_authors: randomAuthors,
+  } = await apiFetch(`/api/v1/authors/${id}/page?page_size=25&others=5`, { cache: 'no-store' });
 
   const bioHtml = author.biography_md
     ? DOMPurify.sanitize(marked.parse(author.biography_md, { async: false }) as string)
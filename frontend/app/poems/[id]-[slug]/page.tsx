@@ -1,6 +1,7 @@
 import type { Metadata } from 'next';
 import Link from 'next/link';
 import { notFound } from 'next/navigation';
+import { cache } from 'react';
 
 import { NextRandomButton } from '../../../components/NextRandomButton';
 import { PoemViewTracker } from '../../../components/PoemViewTracker';
@@ -23,6 +24,9 @@ function parseId(params: Record<string, ParamValue>) {
   return Number.isNaN(id) ? null : id;
 }
 
+// Metadata and page share one bundle request per render.
+const getPoemPage = cache((id: number) => apiFetch(`/api/v1/poems/${id}/page`, { cache: 'no-store' }));
+
 export async function generateMetadata({
   params,
 }: {
@@ -35,7 +39,7 @@ export async function generateMetadata({
       description: 'Поэтическая страница портала Шоирон.',
     };
   }
-  const poem = await apiFetch(`/api/v1/poems/${id}`, { cache: 'no-store' });
+  const { poem } = await getPoemPage(id);
   const slug = withIdSlug(poem.id, poem.title, 'poem');
   return {
     title: `${poem.title} — ${poem.author.full_name}`,
@@ -55,16 +59,9 @@ export default async function PoemPage({
   if (!id) {
     notFound();
   }
-  const poem = await apiFetch(`/api/v1/poems/${id}`, { cache: 'no-store' });
+  const { poem, neighbors } = (await getPoemPage(id)) as { poem: any; neighbors: { prev: any; next: any } };
   const cameFromAuthor = searchParams.from === 'author' && searchParams.authorId;
 
-  let neighbors: { prev: any; next: any } | null = null;
-  if (cameFromAuthor) {
-    neighbors = await apiFetch(`/api/v1/poems/${id}/neighbors?author_id=${searchParams.authorId}`, {
-      cache: 'no-store',
-    });
-  }
-
   return (
     <div className="grid gap-8">
       <PoemViewTracker poemId={poem.id} />
@@ -13,14 +13,24 @@ export const metadata: Metadata = {
 export default async function SearchPage({
   searchParams,
 }: {
-  searchParams: { q?: string; page?: string };
+  searchParams: { q?: string; page?: string; authors_page?: string; poems_page?: string };
 }) {
   const q = searchParams.q || '';
-  const page = Number(searchParams.page || '1');
+  const authorsPage = Number(searchParams.authors_page || searchParams.page || '1');
+  const poemsPage = Number(searchParams.poems_page || searchParams.page || '1');
 
-  const data = await apiFetch(`/api/v1/search?q=${encodeURIComponent(q)}&page=${page}&page_size=25`, {
-    cache: 'no-store',
-  });
+  // Sections page independently; the one that did not move is usually a search cache hit.
+  // Only a fresh search (both sections on page 1) is counted towards popular queries.
+  const record = authorsPage === 1 && poemsPage === 1 ? '&record=1' : '';
+  const [authors, poems] = await Promise.all([
+    apiFetch(`/api/v1/search/authors?q=${encodeURIComponent(q)}&page=${authorsPage}&page_size=25${record}`, {
+      cache: 'no-store',
+    }),
+    apiFetch(`/api/v1/search/poems?q=${encodeURIComponent(q)}&page=${poemsPage}&page_size=25`, {
+      cache: 'no-store',
+    }),
+  ]);
+  const data = { authors, poems };
   const authorsPages = Math.ceil(data.authors.count / data.authors.page_size) || 1;
   const poemsPages = Math.ceil(data.poems.count / data.poems.page_size) || 1;
 
@@ -50,7 +60,13 @@ export default async function SearchPage({
               ))}
             </div>
           )}
-          <PaginationLinks basePath="/search" page={page} totalPages={authorsPages} query={{ q }} />
+          <PaginationLinks
+            basePath="/search"
+            page={authorsPage}
+            totalPages={authorsPages}
+            pageParam="authors_page"
+            query={{ q, poems_page: String(poemsPage) }}
+          />
         </section>
 
         <section className="card">
@@ -64,7 +80,13 @@ export default async function SearchPage({
               ))}
             </div>
           )}
-          <PaginationLinks basePath="/search" page={page} totalPages={poemsPages} query={{ q }} />
+          <PaginationLinks
+            basePath="/search"
+            page={poemsPage}
+            totalPages={poemsPages}
+            pageParam="poems_page"
+            query={{ q, authors_page: String(authorsPage) }}
+          />
         </section>
       </div>
 
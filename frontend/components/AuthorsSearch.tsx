@@ -1,12 +1,41 @@
 'use client';
 
 import { useRouter, useSearchParams } from 'next/navigation';
-import { useState } from 'react';
+import { useEffect, useState } from 'react';
+
+import { getApiBase } from '../lib/api-client';
+
+type AuthorSuggestion = { id: number; full_name: string };
 
 export function AuthorsSearch() {
   const router = useRouter();
   const params = useSearchParams();
   const [query, setQuery] = useState(params.get('q') || '');
+  const [suggestions, setSuggestions] = useState<AuthorSuggestion[]>([]);
+
+  useEffect(() => {
+    const prefix = query.trim();
+    if (!prefix) {
+      setSuggestions([]);
+      return;
+    }
+    const controller = new AbortController();
+    const load = async () => {
+      const res = await fetch(`${getApiBase()}/api/v1/search/suggest?q=${encodeURIComponent(prefix)}&limit=8`, {
+        signal: controller.signal,
+      });
+      if (!res.ok) return;
+      const payload = await res.json();
+      setSuggestions(payload.authors);
+    };
+    const timer = setTimeout(() => {
+      load().catch(() => undefined);
+    }, 150);
+    return () => {
+      clearTimeout(timer);
+      controller.abort();
+    };
+  }, [query]);
 
   return (
     <form
@@ -29,8 +58,15 @@ export function AuthorsSearch() {
         placeholder="Поиск автора по имени..."
         value={query}
         onChange={(event) => setQuery(event.target.value)}
+        list="authors-suggestions"
+        autoComplete="off"
         className="input-shell h-14 pl-10 text-base"
       />
+      <datalist id="authors-suggestions">
+        {suggestions.map((author) => (
+          <option key={author.id} value={author.full_name} />
+        ))}
+      </datalist>
     </form>
   );
 }
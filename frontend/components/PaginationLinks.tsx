@@ -5,11 +5,13 @@ export function PaginationLinks({
   totalPages,
   basePath,
   query,
+  pageParam = 'page',
 }: {
   page: number;
   totalPages: number;
   basePath: string;
   query: Record<string, string | undefined>;
+  pageParam?: string;
 }) {
   if (!Number.isFinite(totalPages) || totalPages <= 1) return null;
 
@@ -18,7 +20,7 @@ export function PaginationLinks({
     Object.entries(query).forEach(([key, value]) => {
       if (value) params.set(key, value);
     });
-    params.set('page', String(nextPage));
+    params.set(pageParam, String(nextPage));
     return `${basePath}?${params.toString()}`;
   };
 
@@ -9,6 +9,7 @@ export type PoemCardData = {
   views?: number;
   author: { id: number; full_name: string; slug?: string };
   url_slug?: string;
+  snippet?: { line: number; lines: { number: number; text: string }[] } | null;
 };
 
 export function PoemCard({ poem }: { poem: PoemCardData }) {
@@ -24,7 +25,15 @@ export function PoemCard({ poem }: { poem: PoemCardData }) {
       </h3>
       <p className="text-sm text-muted">{poem.author.full_name}</p>
 
-      {poem.preview && (
+      {poem.snippet ? (
+        <div className="text-sm italic leading-relaxed text-ink/85">
+          {poem.snippet.lines.map((line) => (
+            <p key={line.number} className={line.number === poem.snippet?.line ? 'font-semibold not-italic text-ink' : ''}>
+              {line.text}
+            </p>
+          ))}
+        </div>
+      ) : poem.preview && (
         <pre className="line-clamp-3 whitespace-pre-line text-sm italic leading-relaxed text-ink/85">
           {poem.preview}
         </pre>